@@ -10,14 +10,48 @@ import os
 import sys
 import yaml
 import json
+import gzip
+import glob
+import io
+import hashlib
+import html
+import base64
 import shutil
+import tempfile
+import threading
+import re
+import time
+import queue
+import random
+import signal
+import struct
+import zlib
+import posixpath
+import sqlite3
 import subprocess
+import contextlib
+import unicodedata
+import urllib.request
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Iterable, Callable
+from datetime import datetime, timezone
 import logging
 import argparse
 
+try:
+    import fcntl
+except ImportError:  # Windows: sin reflinks
+    fcntl = None
+
+try:
+    from PIL import Image
+except ImportError:  # Sin Pillow: se recomprime, pero no se generan variantes
+    Image = None
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,16 +59,2534 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# URL por defecto de los repositorios externos (config/external_repos.yml)
+EXTERNAL_URL_TEMPLATE = "https://github.com/{owner}/{repo}.git"
+
+# Límites por defecto de los subprocesos, en segundos
+GIT_TIMEOUT = 300
+BUILD_TIMEOUT = 1800
+PROJECT_DEADLINE = 600
+# Código de salida de un subproceso que agotó su tiempo (como timeout(1))
+TIMEOUT_EXIT_CODE = 124
+
+# Dirección por defecto del modo daemon (solo accesible desde la máquina local)
+DAEMON_ADDRESS = "127.0.0.1:8787"
+
+# Páginas listadas en proyectos/recientes.md
+RECENT_PAGES = 30
+
+# Exportación de etiquetas del plugin tags de Material y marcador de sus listados
+TAGS_EXPORT = "tags.json"
+TAGS_LISTING = re.compile(r'<!--\s*material/tags\b')
+
+# Búsqueda por fragmentos. La plantilla apunta la opción `search` de la
+# configuración de Material (la URL de su worker) a SEARCH_WORKER_JS, que
+# envuelve el worker de Material: el bundle solo descarga un
+# search_index.json sin documentos, y con cada consulta el worker descarga
+# los fragmentos cuyo filtro de prefijos (ver search_prefix_filter) contiene
+# algún término de la consulta y rehace el índice con los ya cargados. Los
+# fragmentos llevan su hash en el nombre y son cacheables.
+SEARCH_PREFIX = 3
+SEARCH_FILTER_HASHES = 7
+SEARCH_FILTER_BITS = 10
+
+SEARCH_WORKER_JS = """(function () {
+  var PREFIX = %(prefix)d, HASHES = %(hashes)d;
+  var params = new URL(self.location.href).searchParams;
+  var manifestUrl = params.get("manifest");
+  var nativePost = self.postMessage.bind(self);
+  var forwarding = false;
+  var settled = null;
+  var setupData = null;
+  var manifest = null;
+  var loaded = {};
+  var docs = [];
+  var queue = Promise.resolve();
+
+  // El READY de Material tras un SETUP propio no se reenvía a la página
+  self.postMessage = function (message) {
+    if (message && message.type === 1 && settled) {
+      var resolve = settled;
+      settled = null;
+      resolve();
+      return;
+    }
+    nativePost(message);
+  };
+
+  function forward(data) {
+    forwarding = true;
+    try {
+      self.dispatchEvent(new MessageEvent("message", { data: data }));
+    } finally {
+      forwarding = false;
+    }
+  }
+
+  function setup(data) {
+    return new Promise(function (resolve) {
+      settled = resolve;
+      forward({ type: 0, data: data });
+    });
+  }
+
+  function hash(bytes, seed) {
+    var value = seed;
+    for (var i = 0; i < bytes.length; i++) {
+      value ^= bytes[i];
+      value = Math.imul(value, 16777619);
+    }
+    return value >>> 0;
+  }
+
+  function contains(shard, key) {
+    var bytes = new TextEncoder().encode(key);
+    var h1 = hash(bytes, 0x811c9dc5), h2 = hash(bytes, 0x5bd1e995) | 1;
+    for (var i = 0; i < HASHES; i++) {
+      var bit = ((h1 + Math.imul(i, h2)) >>> 0) %% shard.bits;
+      if (!(shard.mask[bit >> 3] & (1 << (bit & 7)))) return false;
+    }
+    return true;
+  }
+
+  function prefixes(query) {
+    var text = String(query).toLowerCase().normalize("NFD").replace(/[\\u0300-\\u036f]/g, "");
+    return (text.match(/[\\p{L}\\p{N}]+/gu) || []).map(function (term) {
+      return Array.from(term).slice(0, PREFIX).join("");
+    });
+  }
+
+  function loadManifest() {
+    if (!manifest) {
+      manifest = fetch(manifestUrl).then(function (response) {
+        if (!response.ok) return null;
+        return response.json().then(function (data) {
+          data.shards.forEach(function (shard) {
+            var binary = atob(shard.filter);
+            shard.mask = new Uint8Array(binary.length);
+            for (var i = 0; i < binary.length; i++) shard.mask[i] = binary.charCodeAt(i);
+          });
+          return data;
+        });
+      }).catch(function () { return null; });
+    }
+    return manifest;
+  }
+
+  function loadShards(query) {
+    return loadManifest().then(function (data) {
+      // Sin manifiesto, el bundle ya envió el índice completo
+      if (!data) return;
+      var keys = prefixes(query);
+      var wanted = data.shards.filter(function (shard) {
+        return !loaded[shard.id] && keys.some(function (key) { return contains(shard, key); });
+      });
+      if (!wanted.length) return;
+      return Promise.all(wanted.map(function (shard) {
+        return fetch(new URL(shard.file, manifestUrl)).then(function (response) { return response.json(); });
+      })).then(function (parts) {
+        wanted.forEach(function (shard, i) {
+          loaded[shard.id] = true;
+          docs = docs.concat(parts[i].docs);
+        });
+        return setup(Object.assign({}, setupData, { docs: docs }));
+      });
+    });
+  }
+
+  function handle(message) {
+    if (message.type === 0) {
+      setupData = message.data;
+      return setup(setupData).then(function () { nativePost({ type: 1 }); });
+    }
+    if (message.type !== 2) {
+      forward(message);
+      return;
+    }
+    return loadShards(message.data).catch(function (error) {
+      console.warn(error);
+    }).then(function () {
+      forward(message);
+    });
+  }
+
+  addEventListener("message", function (event) {
+    if (forwarding) return;
+    event.stopImmediatePropagation();
+    var message = event.data;
+    queue = queue.then(function () { return handle(message); }).catch(function (error) {
+      console.warn(error);
+    });
+  });
+
+  importScripts(params.get("worker"));
+})();
+""" % {'prefix': SEARCH_PREFIX, 'hashes': SEARCH_FILTER_HASHES}
+
+SEARCH_LOADER_TEMPLATE = """{% extends "base.html" %}
+
+{% block config %}
+  {{ super() }}
+  <script>
+    (function () {
+      var element = document.getElementById("__config");
+      var config = JSON.parse(element.textContent);
+      var base = new URL(config.base, location.href);
+      var worker = new URL("{{ 'assets/javascripts/workers/search-shards.js' | url }}", location.href);
+      worker.searchParams.set("worker", new URL(config.search, location.href).href);
+      worker.searchParams.set("manifest", new URL("search/manifest.json", base).href);
+      config.search = worker.href;
+      element.textContent = JSON.stringify(config);
+    })();
+  </script>
+{% endblock %}
+"""
+
+# Ventana mínima entre importaciones según update_schedule (None: solo manual)
+UPDATE_SCHEDULES = {
+    'always': 0,
+    'daily': 24 * 3600,
+    'weekly': 7 * 24 * 3600,
+    'manual': None,
+}
+
+# Indicadores de estado de los proyectos en la navegación y en el índice
+STATUS_EMOJI = {
+    'production': '✅',
+    'beta': '🔵',
+    'development': '🟡',
+    'deprecated': '⚫'
+}
+STATUS_BADGES = {
+    'production': '![Production](https://img.shields.io/badge/Production-green)',
+    'beta': '![Beta](https://img.shields.io/badge/Beta-blue)',
+    'development': '![Development](https://img.shields.io/badge/Development-yellow)',
+    'deprecated': '![Deprecated](https://img.shields.io/badge/Deprecated-red)'
+}
+
+# Loader YAML en C (libyaml) cuando PyYAML se compiló con él
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Esquema de docs.yaml. Nodos: type, required, properties, items, enum, pattern;
+# las claves no declaradas en properties se rechazan
+RELATIVE_PATH = r'^(?!/)(?!.*(^|/)\.\.(/|$)).+$'
+DOCS_SCHEMA = {
+    'type': dict,
+    'required': ['project', 'documentation'],
+    'properties': {
+        'project': {
+            'type': dict,
+            'required': ['name', 'slug'],
+            'properties': {
+                'name': {'type': str},
+                'slug': {'type': str, 'pattern': r'^[A-Za-z0-9][A-Za-z0-9._-]*$'},
+                'description': {'type': str},
+                'status': {'type': str},
+                'version': {'type': (str, int, float)},
+                'repository': {'type': str},
+                'technologies': {
+                    'type': list,
+                    'items': {
+                        'type': (str, dict),
+                        'required': ['name'],
+                        'properties': {
+                            'name': {'type': str},
+                            'version': {'type': (str, int, float)},
+                        },
+                    },
+                },
+            },
+        },
+        'documentation': {
+            'type': dict,
+            'properties': {
+                'structure': {
+                    'type': list,
+                    'items': {
+                        'type': dict,
+                        'required': ['title', 'source'],
+                        'properties': {
+                            'title': {'type': str},
+                            'source': {'type': str, 'pattern': RELATIVE_PATH},
+                            'type': {'type': str, 'enum': ['file', 'directory']},
+                            'icon': {'type': str},
+                        },
+                    },
+                },
+                'assets': {'type': list, 'items': {'type': str, 'pattern': RELATIVE_PATH}},
+            },
+        },
+        'aggregator': {
+            'type': dict,
+            'properties': {
+                'category': {'type': str},
+                'priority': {'type': int},
+                'featured': {'type': bool},
+                'tags': {'type': list, 'items': {'type': (str, int, float)}},
+            },
+        },
+    },
+}
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any, str], List[str]]:
+    """Compilar un nodo del esquema en una función validador(valor, ruta) -> errores
+
+    Los tipos, patrones y validadores de los hijos se resuelven una sola vez,
+    así que validar muchas configuraciones solo recorre closures.
+    """
+    types = schema.get('type', object)
+    types = types if isinstance(types, tuple) else (types,)
+    type_names = " o ".join(t.__name__ for t in types)
+    enum = schema.get('enum')
+    pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+    required = schema.get('required', [])
+    properties = {key: compile_schema(node) for key, node in schema.get('properties', {}).items()}
+    items = compile_schema(schema['items']) if 'items' in schema else None
+
+    def validate(value: Any, path: str = '') -> List[str]:
+        where = path or 'docs.yaml'
+        # bool es subclase de int: solo se acepta donde el esquema lo pide
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            return [f"{where}: se esperaba {type_names}, se obtuvo {type(value).__name__}"]
+
+        errors = []
+        if enum is not None and value not in enum:
+            errors.append(f"{where}: valor '{value}' no permitido ({', '.join(enum)})")
+        if pattern is not None and not pattern.match(str(value)):
+            errors.append(f"{where}: valor '{value}' no válido")
+
+        if isinstance(value, dict) and (properties or required):
+            prefix = f"{path}." if path else ''
+            for key in required:
+                if key not in value:
+                    errors.append(f"{prefix}{key}: campo requerido faltante")
+            for key, child in value.items():
+                validator = properties.get(key)
+                if validator is None:
+                    errors.append(f"{prefix}{key}: campo desconocido")
+                else:
+                    errors.extend(validator(child, f"{prefix}{key}"))
+
+        if isinstance(value, list) and items is not None:
+            for position, child in enumerate(value):
+                errors.extend(items(child, f"{where}[{position}]"))
+
+        return errors
+
+    return validate
+
+
+validate_docs_config = compile_schema(DOCS_SCHEMA)
+
+# Versión del formato de configs.json; subirla cuando cambie lo que se guarda
+# por cada docs.yaml (además del esquema, que entra en la huella)
+CONFIG_CACHE_VERSION = 1
+
+
+def schema_fingerprint(schema: Dict[str, Any]) -> str:
+    """Huella de un esquema: las entradas de configs.json solo valen para el mismo esquema"""
+    serialized = json.dumps(schema, sort_keys=True, default=lambda value: value.__name__)
+    return hashlib.sha256(f"{CONFIG_CACHE_VERSION}:{serialized}".encode('utf-8')).hexdigest()
+
+
+DOCS_SCHEMA_FINGERPRINT = schema_fingerprint(DOCS_SCHEMA)
+
+
+class GitObjectReader:
+    """Lector de objetos Git a través de un único proceso `git cat-file --batch`
+
+    El proceso se mantiene abierto durante toda la ejecución, de modo que leer
+    un blob o un árbol no requiere lanzar un proceso nuevo. Los árboles se
+    cachean por SHA porque se consultan muchas veces al resolver rutas.
+    """
+
+    def __init__(self, repo_dir: Path):
+        self.repo_dir = repo_dir
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._trees: Dict[str, List[Tuple[str, str, str, str]]] = {}
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                cwd=self.repo_dir
+            )
+        return self._process
+
+    def read_object(self, spec: str) -> Optional[Tuple[str, str, bytes]]:
+        """Leer un objeto; devuelve (sha, tipo, contenido) o None si no existe"""
+        with self._lock:
+            process = self._ensure_process()
+            process.stdin.write(spec.encode('utf-8') + b"\n")
+            process.stdin.flush()
+
+            header = process.stdout.readline().decode('utf-8').split()
+            if len(header) != 3:
+                # "<spec> missing" o "<spec> ambiguous"
+                return None
+
+            sha, obj_type, size = header
+            data = process.stdout.read(int(size))
+            process.stdout.read(1)  # salto de línea final
+            return sha, obj_type, data
+
+    def read_tree(self, spec: str) -> Optional[List[Tuple[str, str, str, str]]]:
+        """Listar un árbol como tuplas (modo, tipo, sha, nombre)"""
+        if spec in self._trees:
+            return self._trees[spec]
+
+        obj = self.read_object(spec)
+        if obj is None or obj[1] != 'tree':
+            return None
+
+        sha, _, data = obj
+        raw_len = len(sha) // 2  # 20 bytes en SHA-1, 32 en SHA-256
+        entries = []
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = data[pos:space].decode('ascii')
+            name = data[space + 1:nul].decode('utf-8', errors='surrogateescape')
+            entry_sha = data[nul + 1:nul + 1 + raw_len].hex()
+            entry_type = {'40000': 'tree', '160000': 'commit'}.get(mode, 'blob')
+            entries.append((mode, entry_type, entry_sha, name))
+            pos = nul + 1 + raw_len
+
+        self._trees[spec] = entries
+        self._trees[sha] = entries
+        return entries
+
+    def close(self):
+        """Cerrar el proceso cat-file"""
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+
+class GitTreePath:
+    """Ruta dentro del árbol de una revisión, con la parte de la API de Path que usa el agregador"""
+
+    def __init__(self, reader: GitObjectReader, rev: str, path: str = ''):
+        self.reader = reader
+        self.rev = rev
+        self.path = posixpath.normpath(path) if path else ''
+        if self.path == '.':
+            self.path = ''
+
+    def __truediv__(self, other) -> 'GitTreePath':
+        return GitTreePath(self.reader, self.rev, posixpath.join(self.path, str(other)))
+
+    def __str__(self) -> str:
+        return f"{self.rev}:{self.path}"
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.path)
+
+    def _entry(self) -> Optional[Tuple[str, str]]:
+        """Resolver la ruta a (tipo, sha) recorriendo los árboles cacheados"""
+        if self.path.startswith('..'):
+            return None
+
+        obj_type, sha = 'tree', f"{self.rev}^{{tree}}"
+        for part in self.path.split('/') if self.path else []:
+            entries = self.reader.read_tree(sha) if obj_type == 'tree' else None
+            if not entries:
+                return None
+            match = next((e for e in entries if e[3] == part), None)
+            if match is None:
+                return None
+            obj_type, sha = match[1], match[2]
+
+        return obj_type, sha
+
+    def exists(self) -> bool:
+        return self._entry() is not None
+
+    def object_sha(self) -> Optional[str]:
+        """SHA del objeto al que apunta la ruta, si existe"""
+        entry = self._entry()
+        return entry[1] if entry else None
+
+    def is_dir(self) -> bool:
+        entry = self._entry()
+        return entry is not None and entry[0] == 'tree'
+
+    def is_file(self) -> bool:
+        entry = self._entry()
+        return entry is not None and entry[0] == 'blob'
+
+    def read_bytes(self) -> bytes:
+        entry = self._entry()
+        if entry is None or entry[0] != 'blob':
+            raise FileNotFoundError(str(self))
+        return self.reader.read_object(entry[1])[2]
+
+    def read_text(self, encoding: str = 'utf-8') -> str:
+        return self.read_bytes().decode(encoding)
+
+    def walk_files(self) -> Iterator[Tuple[str, str]]:
+        """Recorrer recursivamente los blobs del árbol: (ruta relativa, sha)"""
+        entry = self._entry()
+        if entry is None or entry[0] != 'tree':
+            return
+
+        pending = [('', entry[1])]
+        while pending:
+            prefix, tree_sha = pending.pop()
+            for mode, obj_type, sha, name in self.reader.read_tree(tree_sha) or []:
+                rel = f"{prefix}{name}"
+                if obj_type == 'tree':
+                    pending.append((rel + '/', sha))
+                elif obj_type == 'blob' and mode != '120000':
+                    # Los symlinks y submódulos no se materializan
+                    yield rel, sha
+
+
+def write_text_if_changed(path: Path, content: str) -> bool:
+    """Escribir un archivo generado solo si su contenido cambia (conserva el mtime)"""
+    data = content.encode('utf-8')
+    if path.is_file() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def git_blob_hash(path: Path, algorithm: str = 'sha1') -> str:
+    """Hash de un archivo en formato blob de Git, comparable con los SHA de los árboles"""
+    digest = hashlib.new(algorithm)
+    digest.update(f"blob {path.stat().st_size}\0".encode('ascii'))
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def search_terms(text: str) -> set:
+    """Términos de un texto para los filtros de búsqueda: minúsculas, sin tildes, letras y números
+
+    Debe coincidir con `prefixes` de SEARCH_WORKER_JS.
+    """
+    text = re.sub('[\u0300-\u036f]', '', unicodedata.normalize('NFD', text.lower()))
+    return set(re.findall(r'[^\W_]+', text))
+
+
+def search_filter_bits(key: str, bits: int) -> List[int]:
+    """Posiciones de un prefijo en un filtro de Bloom (FNV-1a con doble hash, como `contains` en JS)"""
+    hashes = []
+    for seed in (0x811c9dc5, 0x5bd1e995):
+        value = seed
+        for byte in key.encode('utf-8'):
+            value = ((value ^ byte) * 16777619) & 0xffffffff
+        hashes.append(value)
+    h1, h2 = hashes[0], hashes[1] | 1
+    return [((h1 + i * h2) & 0xffffffff) % bits for i in range(SEARCH_FILTER_HASHES)]
+
+
+def search_prefix_filter(docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Filtro de Bloom con los prefijos (hasta SEARCH_PREFIX caracteres) de los términos de unas entradas
+
+    Un término de consulta puede estar en el fragmento solo si su prefijo
+    está en el filtro; los falsos positivos cuestan una descarga de más.
+    """
+    keys = set()
+    for doc in docs:
+        text = " ".join([str(doc.get('title', '')), str(doc.get('text', ''))] + [str(tag) for tag in doc.get('tags') or []])
+        for term in search_terms(html.unescape(re.sub(r'<[^>]+>', ' ', text))):
+            keys.update(term[:length] for length in range(1, SEARCH_PREFIX + 1))
+
+    bits = max(64, len(keys) * SEARCH_FILTER_BITS)
+    bits += -bits % 8
+    mask = bytearray(bits // 8)
+    for key in keys:
+        for bit in search_filter_bits(key, bits):
+            mask[bit >> 3] |= 1 << (bit & 7)
+    return {'bits': bits, 'filter': base64.b64encode(bytes(mask)).decode('ascii')}
+
+
+def run_command(args: List[str], *, cwd: Optional[Path] = None, env: Optional[Dict[str, str]] = None,
+                input: Optional[str] = None, timeout: Optional[float] = None, retries: int = 0,
+                backoff: float = 2.0, deadline: Optional[float] = None,
+                before_retry: Optional[Callable[[], None]] = None) -> subprocess.CompletedProcess:
+    """Ejecutar un subproceso con límite de tiempo y reintentos con backoff exponencial
+
+    Un timeout no lanza excepción: se devuelve con código TIMEOUT_EXIT_CODE y
+    el motivo en stderr, igual que cualquier otro fallo. `deadline` (en
+    time.monotonic()) acota el tiempo total, reintentos incluidos. Al agotar
+    el tiempo se mata el grupo de procesos completo (git lanza subprocesos).
+    before_retry permite limpiar lo que dejó el intento fallido.
+    """
+    attempt = 0
+    while True:
+        limit = timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return subprocess.CompletedProcess(args, TIMEOUT_EXIT_CODE, '', 'plazo agotado antes de empezar')
+            limit = remaining if limit is None else min(limit, remaining)
+
+        with subprocess.Popen(
+            args,
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=hasattr(os, 'killpg')
+        ) as process:
+            try:
+                stdout, stderr = process.communicate(input, timeout=limit)
+                result = subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+            except subprocess.TimeoutExpired:
+                if hasattr(os, 'killpg'):
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+                process.communicate()
+                result = subprocess.CompletedProcess(
+                    args, TIMEOUT_EXIT_CODE, '', f"{' '.join(args[:2])}: sin respuesta tras {limit:.0f}s"
+                )
+
+        if result.returncode == 0 or attempt >= retries:
+            return result
+
+        delay = backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return result
+
+        attempt += 1
+        reason = (result.stderr.strip().splitlines() or [f"código {result.returncode}"])[-1]
+        logger.warning(f"{' '.join(args[:2])} falló ({reason}); reintento {attempt}/{retries} en {delay:.1f}s")
+        time.sleep(delay)
+        if before_retry is not None:
+            before_retry()
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Variantes redimensionadas de una imagen: <nombre>-<ancho>w.png
+IMAGE_VARIANT = re.compile(r'^(.+)-(\d+)w(\.png)$', re.IGNORECASE)
+
+
+def png_chunks(data: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    """Recorrer los chunks (tipo, datos) de un PNG"""
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[pos:pos + 8])
+        yield chunk_type, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def png_width(data: bytes) -> int:
+    """Ancho en píxeles según la cabecera IHDR (0 si no es un PNG)"""
+    if not data.startswith(PNG_SIGNATURE) or len(data) < 24:
+        return 0
+    return struct.unpack('>I', data[16:20])[0]
+
+
+def recompress_png(data: bytes) -> bytes:
+    """Recomprimir sin pérdida los datos IDAT de un PNG con zlib al máximo nivel
+
+    Los píxeles y el resto de chunks no cambian; los IDAT se reúnen en uno
+    solo y se descarta iDOT (de Apple), que apunta a sus posiciones. Si el
+    resultado no es más pequeño se devuelve el original.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+
+    chunks = list(png_chunks(data))
+    idat = b''.join(body for chunk_type, body in chunks if chunk_type == b'IDAT')
+    try:
+        raw = zlib.decompress(idat)
+    except zlib.error:
+        return data
+
+    candidates = []
+    for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+        candidates.append(compressor.compress(raw) + compressor.flush())
+    best = min(candidates, key=len)
+    if len(best) >= len(idat):
+        return data
+
+    output = [PNG_SIGNATURE]
+    written_idat = False
+    for chunk_type, body in chunks:
+        if chunk_type == b'iDOT':
+            continue
+        if chunk_type == b'IDAT':
+            if written_idat:
+                continue
+            body, written_idat = best, True
+        output.append(struct.pack('>I', len(body)) + chunk_type + body
+                      + struct.pack('>I', zlib.crc32(chunk_type + body)))
+    return b''.join(output)
+
+
+def optimize_image(data: bytes, widths: Tuple[int, ...]) -> Tuple[bytes, Dict[int, bytes]]:
+    """Recomprimir una imagen y generar sus variantes más estrechas (se ejecuta en el pool de procesos)"""
+    variants = {}
+    if Image is not None and widths and data.startswith(PNG_SIGNATURE):
+        with Image.open(io.BytesIO(data)) as image:
+            for width in widths:
+                if width >= image.width:
+                    continue
+                height = max(1, round(image.height * width / image.width))
+                buffer = io.BytesIO()
+                image.resize((width, height), Image.LANCZOS).save(buffer, format='PNG', optimize=True)
+                variants[width] = recompress_png(buffer.getvalue())
+    return recompress_png(data), variants
+
+
+class FileSynchronizer:
+    """Sincronización de archivos por hash de contenido
+
+    Solo escribe los archivos cuyo contenido difiere del destino y elimina los
+    que ya no existen en el origen, de modo que los archivos sin cambios
+    conservan su mtime. Los archivos grandes se enlazan (reflink o hardlink)
+    cuando el sistema de archivos lo permite.
+    """
+
+    # Tamaño a partir del cual se intenta enlazar en lugar de copiar
+    LINK_THRESHOLD = 1024 * 1024
+    # ioctl FICLONE de Linux (copia copy-on-write en btrfs, XFS, ...)
+    FICLONE = 0x40049409
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {'written': 0, 'unchanged': 0, 'removed': 0, 'bytes_written': 0}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+        if key == 'bytes_written':
+            self._local.bytes_written = self.thread_bytes() + amount
+
+    def thread_bytes(self) -> int:
+        """Bytes escritos por el hilo actual (para atribuirlos al proyecto que copia)"""
+        return getattr(self._local, 'bytes_written', 0)
+
+    def sync_file(self, source, dest: Path, transform: Optional[Callable[[Path, bytes], bytes]] = None) -> List[Path]:
+        """Sincronizar un archivo desde disco o desde un árbol Git
+
+        Si se indica transform(dest, datos) y acepta el archivo (ver
+        transforms_file), se escribe su resultado en lugar del contenido original.
+        """
+        if dest.is_dir():
+            shutil.rmtree(dest)
+
+        if transform is not None and self.transforms_file(transform, dest):
+            self._sync_transformed(source, dest, transform)
+        elif isinstance(source, GitTreePath):
+            self._sync_blob(source.reader, source.object_sha(), dest)
+        else:
+            self._sync_path(source, dest)
+        return [dest]
+
+    def sync_dir(self, source, dest_dir: Path, transform: Optional[Callable[[Path, bytes], bytes]] = None,
+                 skip: Optional[Callable[[Path], bool]] = None) -> List[Path]:
+        """Sincronizar un directorio completo y eliminar lo que sobra en el destino
+
+        skip(dest) permite omitir archivos, que también se eliminan del destino.
+        """
+        if dest_dir.is_file():
+            dest_dir.unlink()
+
+        synced = []
+        if isinstance(source, GitTreePath):
+            entries = ((dest_dir / rel, source / rel, sha) for rel, sha in source.walk_files())
+        else:
+            entries = (
+                (dest_dir / path.relative_to(source), path, None)
+                for path in sorted(source.rglob('*')) if path.is_file()
+            )
+
+        for dest, path, sha in entries:
+            if skip is not None and skip(dest):
+                continue
+            if transform is not None and self.transforms_file(transform, dest):
+                self._sync_transformed(path, dest, transform, sha)
+            elif sha is not None:
+                self._sync_blob(source.reader, sha, dest)
+            else:
+                self._sync_path(path, dest)
+            synced.append(dest)
+
+        self.remove_extra(dest_dir, set(synced))
+        return synced
+
+    @staticmethod
+    def transforms_file(transform, dest: Path) -> bool:
+        """Un transform declara con el atributo `suffixes` qué archivos procesa"""
+        return dest.suffix.lower() in getattr(transform, 'suffixes', ())
+
+    def _sync_transformed(self, source, dest: Path, transform: Callable[[Path, bytes], bytes],
+                          sha: Optional[str] = None):
+        """Escribir la salida del transform; con transform.cache, solo si cambió su entrada
+
+        Un transform con caché define además `fingerprint` (huella de su
+        contexto), page_meta(dest) y restore(dest, meta) para conservar lo
+        que haya recogido de las páginas que no se reprocesan.
+        """
+        cache = getattr(transform, 'cache', None)
+        key = None
+        if cache is not None:
+            if sha is None:
+                sha = source.object_sha() if isinstance(source, GitTreePath) else git_blob_hash(source)
+            key = hashlib.sha256(f"{sha}:{transform.fingerprint}".encode('ascii')).hexdigest()
+            meta = cache.lookup(dest, key)
+            if meta is not None:
+                transform.restore(dest, meta)
+                self._count('unchanged')
+                return
+
+        data = transform(dest, source.read_bytes())
+        if dest.is_file() and dest.stat().st_size == len(data) and dest.read_bytes() == data:
+            self._count('unchanged')
+        else:
+            tmp_path = self._prepare(dest)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, dest)
+            self._count('written')
+            self._count('bytes_written', len(data))
+
+        if cache is not None:
+            cache.record(dest, key, transform.page_meta(dest))
+
+    def remove_extra(self, dest_dir: Path, keep: set):
+        """Eliminar archivos de dest_dir que no están en keep, y los directorios vacíos"""
+        if not dest_dir.is_dir():
+            return
+
+        for path in sorted(dest_dir.rglob('*'), reverse=True):
+            if path.is_dir():
+                if not any(path.iterdir()):
+                    path.rmdir()
+            elif path not in keep:
+                path.unlink()
+                self._count('removed')
+
+    def _prepare(self, dest: Path):
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        return dest.with_name(f".{dest.name}.sync-tmp")
+
+    def _sync_blob(self, reader: GitObjectReader, sha: str, dest: Path):
+        # El SHA del blob ya es un hash de contenido: basta con hashear el destino
+        algorithm = 'sha256' if len(sha) == 64 else 'sha1'
+        if dest.is_file() and git_blob_hash(dest, algorithm) == sha:
+            self._count('unchanged')
+            return
+
+        data = reader.read_object(sha)[2]
+        tmp_path = self._prepare(dest)
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, dest)
+        self._count('written')
+        self._count('bytes_written', len(data))
+
+    def _sync_path(self, source: Path, dest: Path):
+        size = source.stat().st_size
+        if dest.is_file() and dest.stat().st_size == size:
+            if os.path.samefile(source, dest) or git_blob_hash(source) == git_blob_hash(dest):
+                self._count('unchanged')
+                return
+
+        tmp_path = self._prepare(dest)
+        if size < self.LINK_THRESHOLD or not self._link(source, tmp_path):
+            shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, dest)
+        self._count('written')
+        self._count('bytes_written', size)
+
+    def _link(self, source: Path, tmp_path: Path) -> bool:
+        """Intentar reflink y después hardlink; False si ninguno es posible"""
+        if fcntl is not None:
+            try:
+                with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), self.FICLONE, src.fileno())
+                shutil.copystat(source, tmp_path)
+                return True
+            except OSError:
+                tmp_path.unlink(missing_ok=True)
+
+        try:
+            os.link(source, tmp_path)
+            return True
+        except OSError:
+            return False
+
+
+class Tracer:
+    """Traza de ejecución en formato Chrome Trace Event (chrome://tracing, Perfetto)
+
+    Registra un span por fase de run() y por etapa de cada proyecto, y
+    acumula el tiempo y los bytes copiados por proyecto para el resumen
+    final. Sin ruta de salida, span() no registra nada.
+    """
+
+    # Proyectos listados en el resumen de la ejecución
+    SUMMARY_SIZE = 10
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.enabled = path is not None
+        self.events: List[Dict[str, Any]] = []
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self.threads: Dict[int, Tuple[int, str]] = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter_ns()
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = 'phase', project: Optional[str] = None, **args):
+        """Medir un bloque; con project, su duración se suma a las estadísticas del proyecto"""
+        if not self.enabled:
+            yield args
+            return
+
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter_ns()
+            if project is not None:
+                args['project'] = project
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start - self._start) / 1000,
+                'dur': (end - start) / 1000,
+                'pid': os.getpid(),
+                'tid': self._thread_id(),
+                'args': args,
+            }
+            with self._lock:
+                self.events.append(event)
+                if project is not None:
+                    stats = self.projects.setdefault(project, {'seconds': 0.0, 'bytes': 0})
+                    stats['seconds'] += (end - start) / 1e9
+                    stats['bytes'] += args.get('bytes', 0)
+
+    def _thread_id(self) -> int:
+        ident = threading.get_ident()
+        with self._lock:
+            if ident not in self.threads:
+                self.threads[ident] = (len(self.threads) + 1, threading.current_thread().name)
+            return self.threads[ident][0]
+
+    def slowest_projects(self) -> List[Tuple[str, Dict[str, Any]]]:
+        return sorted(self.projects.items(), key=lambda item: -item[1]['seconds'])[:self.SUMMARY_SIZE]
+
+    def finish(self):
+        """Registrar el resumen y escribir el archivo de traza"""
+        if not self.enabled:
+            return
+
+        total_bytes = sum(stats['bytes'] for stats in self.projects.values())
+        logger.info(f"Proyectos más lentos ({total_bytes} bytes copiados en total):")
+        for project, stats in self.slowest_projects():
+            logger.info(f"  {stats['seconds']:8.3f}s  {stats['bytes']:>12} bytes  {project}")
+
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+            for tid, name in self.threads.values()
+        ]
+        trace = {
+            'traceEvents': metadata + sorted(self.events, key=lambda event: event['ts']),
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'bytes_copied': total_bytes,
+                'slowest_projects': [
+                    {'project': project, **stats} for project, stats in self.slowest_projects()
+                ],
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(trace), encoding='utf-8')
+        logger.info(f"Traza guardada en {self.path}")
+
+    def reset(self):
+        """Descartar lo registrado y empezar una traza nueva
+
+        En los modos daemon y watch cada lote escribe su traza con finish() y
+        la reinicia, así la memoria no crece con los lotes; el archivo
+        contiene siempre el último lote.
+        """
+        with self._lock:
+            self.events = []
+            self.projects = {}
+            self.threads = {}
+            self._start = time.perf_counter_ns()
+
+
+class AssetStore:
+    """Almacén de assets direccionado por contenido, compartido por todos los proyectos
+
+    Cada blob se guarda una sola vez como <xx>/<hash><ext> bajo docs/_assets,
+    con el SHA de blob de Git como clave (el de los árboles Git no requiere
+    leer el archivo). Las páginas de los proyectos apuntan al almacén en lugar
+    de a su copia del asset, de modo que el tamaño del sitio depende de los
+    bytes únicos y no del número de proyectos.
+    """
+
+    def __init__(self, root: Path, synchronizer: 'FileSynchronizer'):
+        self.root = root
+        self.synchronizer = synchronizer
+        self._lock = threading.Lock()
+        self._known: set = set()
+        self.stats = {'stored': 0, 'deduplicated': 0}
+
+    @staticmethod
+    def name_for(source) -> str:
+        """Nombre en el almacén de un archivo (ruta o GitTreePath), sin copiarlo"""
+        sha = source.object_sha() if isinstance(source, GitTreePath) else git_blob_hash(source)
+        return f"{sha[:2]}/{sha}{Path(source.name).suffix.lower()}"
+
+    def put(self, source, name: Optional[str] = None) -> str:
+        """Guardar un archivo (ruta o GitTreePath) y devolver su nombre en el almacén"""
+        name = name or self.name_for(source)
+
+        with self._lock:
+            if name in self._known:
+                self.stats['deduplicated'] += 1
+                return name
+            self._known.add(name)
+
+        path = self.root / name
+        if path.is_file():
+            with self._lock:
+                self.stats['deduplicated'] += 1
+        else:
+            self.synchronizer.sync_file(source, path)
+            with self._lock:
+                self.stats['stored'] += 1
+        return name
+
+    def collect_garbage(self, keep: set) -> int:
+        """Eliminar los blobs que ningún proyecto referencia"""
+        removed = 0
+        if not self.root.is_dir():
+            return removed
+
+        for path in sorted(self.root.rglob('*'), reverse=True):
+            if path.is_dir():
+                if not any(path.iterdir()):
+                    path.rmdir()
+            else:
+                # Las variantes de imagen (<hash>-<ancho>w.png) siguen a su original
+                name = path.relative_to(self.root).as_posix()
+                variant = IMAGE_VARIANT.match(name)
+                if variant:
+                    name = variant.group(1) + variant.group(3)
+                if name not in keep:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+
+class ImageOptimizer:
+    """Optimización de las imágenes PNG publicadas, con caché por hash de entrada
+
+    Cada imagen se recomprime sin pérdida y, con Pillow instalado, se generan
+    variantes de los anchos pedidos junto a ella (<nombre>-<ancho>w.png). El
+    trabajo se reparte en un pool de procesos y los resultados se guardan en
+    la caché por el hash del original: las imágenes repetidas o ya vistas en
+    ejecuciones anteriores solo se copian desde la caché.
+    """
+
+    def __init__(self, cache_dir: Path, widths: Iterable[int] = (), jobs: int = 1):
+        self.cache_dir = cache_dir
+        self.index_path = cache_dir / "index.json"
+        self.widths = tuple(sorted(set(widths)))
+        self.jobs = max(1, jobs)
+        self.stats = {'images': 0, 'processed': 0, 'cached': 0, 'bytes_saved': 0}
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if self.index_path.exists():
+            try:
+                self.index = json.loads(self.index_path.read_text(encoding='utf-8'))
+            except ValueError:
+                self.index = {}
+
+        if self.widths and Image is None:
+            logger.warning("Pillow no está instalado: las imágenes se recomprimen pero no se generan variantes")
+            self.widths = ()
+
+    def optimize(self, roots: Iterable[Path]):
+        """Optimizar en su sitio las imágenes PNG bajo los directorios indicados"""
+        images = sorted(
+            path for root in roots if root.is_dir()
+            for path in root.rglob('*') if path.suffix.lower() == '.png' and path.is_file()
+        )
+        variant_paths = {self.variant_path(path, width) for path in images for width in self.widths}
+        images = [path for path in images if path not in variant_paths]
+
+        # Un optimizado previo se reconoce por su hash de salida
+        outputs = {entry['output']: sha for sha, entry in self.index.items()}
+        sources: Dict[Path, str] = {}
+        pending: Dict[str, Path] = {}
+        for path in images:
+            sha = git_blob_hash(path)
+            sha = outputs.get(sha, sha)
+            sources[path] = sha
+            if sha not in pending and self._missing(sha):
+                pending[sha] = path
+
+        if pending:
+            self._process(pending)
+
+        used = {}
+        for path, sha in sources.items():
+            entry = self.index.get(sha)
+            if entry is None:
+                continue
+            used[sha] = entry
+            self.stats['images'] += 1
+            self.stats['bytes_saved'] += entry['saved']
+            if sha not in pending:
+                self.stats['cached'] += 1
+            self._apply(path, sha, entry)
+
+        # Solo se conservan en la caché las imágenes publicadas en esta ejecución
+        for sha in set(self.index) - set(used):
+            for cached in self.cache_dir.glob(f"{sha}*.png"):
+                cached.unlink()
+        self.index = used
+        self.save()
+
+    @staticmethod
+    def variant_path(path: Path, width: int) -> Path:
+        return path.with_name(f"{path.stem}-{width}w{path.suffix}")
+
+    def _missing(self, sha: str) -> bool:
+        entry = self.index.get(sha)
+        if entry is None or not (self.cache_dir / f"{sha}.png").is_file():
+            return True
+        wanted = [width for width in self.widths if width < entry['width']]
+        return any(str(width) not in entry['variants'] for width in wanted)
+
+    def _process(self, pending: Dict[str, Path]):
+        shas = sorted(pending)
+        inputs = {sha: pending[sha].read_bytes() for sha in shas}
+        results = {}
+
+        if self.jobs > 1 and len(shas) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(shas))) as executor:
+                futures = {sha: executor.submit(optimize_image, inputs[sha], self.widths) for sha in shas}
+                for sha, future in futures.items():
+                    try:
+                        results[sha] = future.result()
+                    except Exception as e:
+                        logger.warning(f"No se pudo optimizar {pending[sha]}: {e}")
+        else:
+            for sha in shas:
+                try:
+                    results[sha] = optimize_image(inputs[sha], self.widths)
+                except Exception as e:
+                    logger.warning(f"No se pudo optimizar {pending[sha]}: {e}")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for sha, (optimized, variants) in results.items():
+            data = inputs[sha]
+            (self.cache_dir / f"{sha}.png").write_bytes(optimized)
+            for width, variant in variants.items():
+                (self.cache_dir / f"{sha}-{width}w.png").write_bytes(variant)
+            saved = len(data) - len(optimized)
+            previous = self.index.get(sha)
+            if previous is not None and previous['output'] != sha and git_blob_hash(pending[sha]) == previous['output']:
+                # Se reprocesa la versión ya optimizada (p. ej. para añadir variantes)
+                saved += previous['saved']
+            self.index[sha] = {
+                'output': hashlib.sha1(f"blob {len(optimized)}\0".encode('ascii') + optimized).hexdigest(),
+                'saved': saved,
+                'width': png_width(data),
+                'variants': {str(width): len(variant) for width, variant in variants.items()},
+            }
+            self.stats['processed'] += 1
+
+    def _apply(self, path: Path, sha: str, entry: Dict[str, Any]):
+        """Sustituir la imagen por su versión optimizada y colocar sus variantes"""
+        targets = [(path, self.cache_dir / f"{sha}.png")]
+        targets += [
+            (self.variant_path(path, int(width)), self.cache_dir / f"{sha}-{width}w.png")
+            for width in entry['variants']
+        ]
+        for dest, cached in targets:
+            if dest.is_file() and dest.stat().st_size == cached.stat().st_size \
+                    and dest.read_bytes() == cached.read_bytes():
+                continue
+            # Nunca se escribe sobre el archivo: puede ser un enlace al original
+            tmp_path = dest.with_name(f".{dest.name}.opt-tmp")
+            shutil.copyfile(cached, tmp_path)
+            os.replace(tmp_path, dest)
+
+    def save(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path.write_text(json.dumps(self.index, indent=2, sort_keys=True), encoding='utf-8')
+
+
+class StagePipeline:
+    """Pipeline de etapas en streaming conectadas por colas acotadas
+
+    Cada etapa tiene su propio grupo de hilos y un elemento pasa a la etapa
+    siguiente en cuanto termina la anterior, de modo que la E/S de un proyecto
+    se solapa con el trabajo de otro. Las colas acotadas limitan cuántos
+    elementos hay en vuelo: una etapa lenta frena a las anteriores en lugar
+    de acumular trabajo en memoria.
+    """
+
+    _DONE = object()
+
+    def __init__(self, queue_size: int = 8):
+        self.queue_size = max(1, queue_size)
+        self.stages: List[Tuple[str, Callable, int]] = []
+
+    def add_stage(self, name: str, func: Callable, workers: int = 1) -> 'StagePipeline':
+        """Añadir una etapa; func devuelve el elemento para la siguiente o None para descartarlo"""
+        self.stages.append((name, func, max(1, workers)))
+        return self
+
+    def run(self, items: Iterable, on_error: Optional[Callable] = None) -> List[Any]:
+        """Alimentar el pipeline y devolver la salida de la última etapa (sin orden garantizado)"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: List[Any] = []
+        threads = []
+
+        for position, (name, func, workers) in enumerate(self.stages):
+            is_last = position == len(self.stages) - 1
+            stage = {
+                'name': name,
+                'func': func,
+                'input': queues[position],
+                'output': None if is_last else queues[position + 1],
+                'next_workers': 0 if is_last else self.stages[position + 1][2],
+                'remaining': workers,
+                'lock': threading.Lock(),
+            }
+            for _ in range(workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, results, on_error),
+                    name=f"pipeline-{name}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0][2]):
+                queues[0].put(self._DONE)
+
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _worker(self, stage: Dict[str, Any], results: List[Any], on_error: Optional[Callable]):
+        while True:
+            item = stage['input'].get()
+            if item is self._DONE:
+                break
+
+            try:
+                output = stage['func'](item)
+            except Exception as e:
+                output = None
+                if on_error is not None:
+                    on_error(stage['name'], item, e)
+                else:
+                    logger.error(f"Error en la etapa {stage['name']}: {e}")
+
+            if output is not None:
+                if stage['output'] is not None:
+                    stage['output'].put(output)
+                else:
+                    results.append(output)
+
+        # El último worker de la etapa cierra la siguiente
+        with stage['lock']:
+            stage['remaining'] -= 1
+            last = stage['remaining'] == 0
+        if last and stage['output'] is not None:
+            for _ in range(stage['next_workers']):
+                stage['output'].put(self._DONE)
+
+
+class MirrorCache:
+    """Caché persistente de mirrors bare para los repositorios externos
+
+    Cada build solo hace un `git fetch` incremental de la rama configurada;
+    los mirrors que ya no están configurados se desalojan por LRU cuando la
+    caché supera su tamaño máximo. El trabajo sobre un mismo mirror (varias
+    entradas con la misma URL importadas en paralelo) se serializa con
+    `lock(url)`.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, timeout: float = GIT_TIMEOUT, retries: int = 0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.retries = retries
+        self.index_path = cache_dir / "index.json"
+        self._lock = threading.Lock()
+        self._mirror_locks: Dict[str, threading.RLock] = {}
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if self.index_path.exists():
+            try:
+                self.index = json.loads(self.index_path.read_text(encoding='utf-8'))
+            except ValueError:
+                self.index = {}
+
+    def path_for(self, url: str) -> Path:
+        """Directorio del mirror de una URL"""
+        name = re.sub(r'[^A-Za-z0-9._-]+', '-', url.rstrip('/').split('/')[-1].removesuffix('.git'))
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / f"{name}-{digest}.git"
+
+    def lock(self, url: str) -> threading.RLock:
+        """Cerrojo (reentrante) del mirror de una URL"""
+        with self._lock:
+            return self._mirror_locks.setdefault(self.path_for(url).name, threading.RLock())
+
+    def fetch(self, url: str, branch: str, deadline: Optional[float] = None) -> Optional[str]:
+        """Actualizar la rama del mirror; devuelve su commit o None si falla"""
+        with self.lock(url):
+            return self._fetch(url, branch, deadline)
+
+    def _fetch(self, url: str, branch: str, deadline: Optional[float]) -> Optional[str]:
+        mirror = self.path_for(url)
+        if not mirror.exists():
+            mirror.parent.mkdir(parents=True, exist_ok=True)
+            result = run_command(
+                ["git", "init", "--quiet", "--bare", str(mirror)],
+                timeout=self.timeout,
+                deadline=deadline
+            )
+            if result.returncode != 0:
+                logger.error(f"Error al crear el mirror de {url}: {result.stderr}")
+                shutil.rmtree(mirror, ignore_errors=True)
+                return None
+
+        result = run_command(
+            [
+                "git", "fetch",
+                "--quiet", "--no-tags", "--prune", "--depth", "1",
+                url,
+                f"+refs/heads/{branch}:refs/heads/{branch}"
+            ],
+            cwd=mirror,
+            timeout=self.timeout,
+            retries=self.retries,
+            deadline=deadline
+        )
+        if result.returncode != 0:
+            logger.error(f"Error al actualizar el mirror de {url}: {result.stderr}")
+            return None
+
+        sha = run_command(
+            ["git", "rev-parse", f"refs/heads/{branch}"],
+            cwd=mirror,
+            timeout=self.timeout
+        ).stdout.strip()
+
+        with self._lock:
+            self.index[mirror.name] = {'url': url, 'last_used': time.time()}
+        return sha
+
+    def evict(self, configured_urls: List[str]):
+        """Desalojar mirrors no configurados (LRU) hasta quedar bajo el tamaño máximo"""
+        if not self.cache_dir.exists():
+            return
+
+        sizes = {
+            mirror.name: sum(f.stat().st_size for f in mirror.rglob('*') if f.is_file())
+            for mirror in self.cache_dir.glob('*.git')
+        }
+        total = sum(sizes.values())
+        configured = {self.path_for(url).name for url in configured_urls}
+
+        candidates = sorted(
+            (name for name in sizes if name not in configured),
+            key=lambda name: self.index.get(name, {}).get('last_used', 0)
+        )
+        for name in candidates:
+            if total <= self.max_bytes:
+                break
+            logger.info(f"Desalojando mirror no configurado: {name}")
+            shutil.rmtree(self.cache_dir / name, ignore_errors=True)
+            self.index.pop(name, None)
+            total -= sizes[name]
+
+        if total > self.max_bytes:
+            logger.warning(
+                f"La caché de mirrors ocupa {total // (1024 * 1024)} MB, "
+                f"por encima del límite de {self.max_bytes // (1024 * 1024)} MB"
+            )
+
+    def save(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path.write_text(json.dumps(self.index, indent=2, sort_keys=True), encoding='utf-8')
+
+
+class LinkChecker:
+    """Comprobación de enlaces, imágenes, anclas y navegación antes del build
+
+    Indexa en memoria todas las páginas y anclas de docs/ (leyendo cada
+    página una sola vez, en paralelo) y resuelve contra ese índice los
+    enlaces Markdown/HTML y las entradas de la navegación generada. Los
+    destinos inexistentes son errores, igual que en `mkdocs build --strict`;
+    las anclas que no existen y los directorios sin índice se notifican como
+    avisos.
+    """
+
+    FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+    INLINE_CODE = re.compile(r'(`+).+?\1')
+    HEADING = re.compile(r'^ {0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+    SETEXT = re.compile(r'^ {0,3}(=+|-+)\s*$')
+    EXPLICIT_ID = re.compile(r'\{[^}]*#([\w-]+)[^}]*\}\s*$')
+    HTML_ID = re.compile(r'<[^>]+\s(?:id|name)\s*=\s*["\']([^"\']+)["\']')
+    INLINE_LINK = re.compile(r'!?\[(?:[^\]\\]|\\.)*\]\(\s*<?([^)\s>]*)>?(?:\s+["\'(][^)]*)?\)')
+    REFERENCE = re.compile(r'^ {0,3}\[[^\]]+\]:\s*<?(\S+?)>?(?:\s|$)')
+    HTML_LINK = re.compile(r'<(?:a|img|source)\s[^>]*?(?:href|src)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+    EXTERNAL = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*:|//)')
+
+    def __init__(self, docs_dir: Path, jobs: int = 1):
+        self.docs_dir = docs_dir
+        self.jobs = max(1, jobs)
+        self.files: set = set()
+        self.dirs: set = set()
+        self.anchors: Dict[str, set] = {}
+        self.links: Dict[str, List[Tuple[int, str]]] = {}
+
+    def check(self, nav: Optional[List] = None) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Devolver (errores, avisos) agrupados por proyecto"""
+        self._index()
+
+        errors: Dict[str, List[str]] = {}
+        warnings: Dict[str, List[str]] = {}
+        for page in sorted(self.links):
+            for line, target in self.links[page]:
+                problem = self._resolve(page, target)
+                if problem is not None:
+                    severity, message = problem
+                    bucket = errors if severity == 'error' else warnings
+                    bucket.setdefault(self.group(page), []).append(f"{page}:{line}: {message}")
+
+        for title, target in self._nav_targets(nav or []):
+            if not self.EXTERNAL.match(target) and target not in self.files:
+                errors.setdefault(self.group(target), []).append(
+                    f"navegación '{title}': la página {target} no existe"
+                )
+
+        return errors, warnings
+
+    @staticmethod
+    def group(page: str) -> str:
+        """Proyecto al que pertenece una página (proyectos/<slug>, proyectos-externos/<slug>)"""
+        parts = page.split('/')
+        if parts[0] in ('proyectos', 'proyectos-externos') and len(parts) > 2:
+            return '/'.join(parts[:2])
+        return parts[0] if len(parts) > 1 else 'raíz'
+
+    def _index(self):
+        pages = []
+        for path in self.docs_dir.rglob('*'):
+            rel = path.relative_to(self.docs_dir).as_posix()
+            if any(part.startswith('.') for part in rel.split('/')):
+                continue
+            if path.is_dir():
+                self.dirs.add(rel)
+            else:
+                self.files.add(rel)
+                if rel.endswith('.md'):
+                    pages.append(rel)
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for page, anchors, links in executor.map(self._scan_page, pages):
+                self.anchors[page] = anchors
+                self.links[page] = links
+
+    def _scan_page(self, page: str) -> Tuple[str, set, List[Tuple[int, str]]]:
+        """Extraer las anclas y los enlaces de una página, ignorando los bloques de código"""
+        text = (self.docs_dir / page).read_text(encoding='utf-8', errors='replace')
+        anchors: set = set()
+        links: List[Tuple[int, str]] = []
+        fence = None
+        previous = ''
+
+        # El front matter no es contenido: se salta conservando la numeración de líneas
+        front_matter = MarkdownTransformer.FRONT_MATTER.match(text)
+        skip = text[:front_matter.end()].count('\n') if front_matter else 0
+
+        for number, line in enumerate(text.splitlines(), 1):
+            if number <= skip:
+                continue
+            match = self.FENCE.match(line)
+            if fence is not None:
+                if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                    fence = None
+                continue
+            if match:
+                fence = match.group(1)
+                continue
+
+            heading = self.HEADING.match(line)
+            if heading:
+                self._add_heading(anchors, heading.group(2))
+            elif self.SETEXT.match(line) and previous.strip() and not previous.lstrip().startswith(('-', '*', '|')):
+                self._add_heading(anchors, previous.strip())
+            anchors.update(self.HTML_ID.findall(line))
+
+            code_free = self.INLINE_CODE.sub('', line)
+            for pattern in (self.INLINE_LINK, self.REFERENCE, self.HTML_LINK):
+                for target in pattern.findall(code_free):
+                    links.append((number, target))
+            previous = line
+
+        return page, anchors, links
+
+    def _add_heading(self, anchors: set, heading: str):
+        explicit = self.EXPLICIT_ID.search(heading)
+        if explicit:
+            anchors.add(explicit.group(1))
+            return
+
+        anchor = self.slugify(heading)
+        # Las cabeceras repetidas reciben _1, _2, ... como en la extensión toc
+        candidate, counter = anchor, 1
+        while candidate in anchors:
+            candidate = f"{anchor}_{counter}"
+            counter += 1
+        anchors.add(candidate)
+
+    @staticmethod
+    def slugify(heading: str) -> str:
+        """Ancla de una cabecera con el slugify por defecto de la extensión toc de Markdown"""
+        text = re.sub(r'!?\[([^\]]*)\]\([^)]*\)', r'\1', heading)
+        text = re.sub(r'<[^>]+>', '', text)
+        text = re.sub(r'[*_`]', '', text)
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+        text = re.sub(r'[^\w\s-]', '', text).strip().lower()
+        return re.sub(r'[-\s]+', '-', text)
+
+    def _resolve(self, page: str, target: str) -> Optional[Tuple[str, str]]:
+        """Comprobar un enlace de una página; devuelve (gravedad, mensaje) si falla"""
+        if not target or self.EXTERNAL.match(target) or target.startswith('/'):
+            return None
+
+        path, _, anchor = target.partition('#')
+        path = unquote(path.split('?', 1)[0])
+
+        if not path:
+            destination = page
+        else:
+            destination = posixpath.normpath(posixpath.join(posixpath.dirname(page), path))
+            if destination == '..' or destination.startswith('../'):
+                return 'error', f"el enlace {target} apunta fuera de la documentación"
+
+        if destination in self.files:
+            if anchor and destination.endswith('.md') and anchor not in self.anchors.get(destination, set()):
+                return 'warning', f"el ancla #{anchor} no existe en {destination}"
+            return None
+
+        if destination in self.dirs or destination == '.':
+            prefix = '' if destination == '.' else f"{destination}/"
+            if f"{prefix}index.md" in self.files or f"{prefix}README.md" in self.files:
+                return None
+            return 'warning', f"el enlace {target} apunta a un directorio sin index.md"
+
+        return 'error', f"enlace roto {target}"
+
+    def _nav_targets(self, nav: List, trail: str = '') -> Iterator[Tuple[str, str]]:
+        for entry in nav:
+            items = entry.items() if isinstance(entry, dict) else [(trail, entry)]
+            for title, value in items:
+                if isinstance(value, list):
+                    yield from self._nav_targets(value, title)
+                elif isinstance(value, str):
+                    yield title, value
+
+
+class SitePublisher:
+    """Publicación incremental del sitio construido
+
+    Mantiene un manifiesto con el hash (formato blob de Git) de cada archivo
+    de site/ y publica solo los archivos añadidos, modificados o eliminados
+    respecto a lo último publicado en cada destino.
+    """
+
+    def __init__(self, site_dir: Path, state_dir: Path):
+        self.site_dir = site_dir
+        self.state_dir = state_dir
+        self.manifest_path = state_dir / "site-manifest.json"
+
+    def build_manifest(self) -> Dict[str, str]:
+        """Calcular {ruta: hash} de site/, reutilizando hashes de archivos sin cambios"""
+        cache = self._load_json(self.manifest_path)
+        entries = {}
+
+        for path in sorted(self.site_dir.rglob('*')):
+            if not path.is_file():
+                continue
+            rel = path.relative_to(self.site_dir).as_posix()
+            stat = path.stat()
+            cached = cache.get(rel)
+            if cached and cached[1] == stat.st_size and cached[2] == stat.st_mtime_ns:
+                entries[rel] = cached
+            else:
+                entries[rel] = [git_blob_hash(path), stat.st_size, stat.st_mtime_ns]
+
+        self._save_json(self.manifest_path, entries)
+        return {rel: entry[0] for rel, entry in entries.items()}
+
+    @staticmethod
+    def diff(previous: Dict[str, str], current: Dict[str, str]) -> Tuple[List[str], List[str], List[str]]:
+        """Comparar dos manifiestos: (añadidos, modificados, eliminados)"""
+        added = sorted(set(current) - set(previous))
+        removed = sorted(set(previous) - set(current))
+        changed = sorted(rel for rel in set(current) & set(previous) if current[rel] != previous[rel])
+        return added, changed, removed
+
+    def publish_to_dir(self, target: Path) -> bool:
+        """Sincronizar site/ con un directorio local"""
+        manifest = self.build_manifest()
+        key = hashlib.sha256(str(target.resolve()).encode('utf-8')).hexdigest()[:16]
+        published_path = self.state_dir / "publish" / f"dir-{key}.json"
+        previous = self._load_json(published_path)
+
+        if not previous or not target.is_dir():
+            # Primera publicación en este destino: sincronización completa por hash
+            logger.info(f"Publicación inicial en {target}")
+            FileSynchronizer().sync_dir(self.site_dir, target)
+            self._save_json(published_path, manifest)
+            return True
+
+        added, changed, removed = self.diff(previous, manifest)
+        logger.info(f"Publicando en {target}: +{len(added)} ~{len(changed)} -{len(removed)}")
+
+        for rel in added + changed:
+            dest = target / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = dest.with_name(f".{dest.name}.publish-tmp")
+            shutil.copy2(self.site_dir / rel, tmp_path)
+            os.replace(tmp_path, dest)
+
+        for rel in removed:
+            path = target / rel
+            path.unlink(missing_ok=True)
+            parent = path.parent
+            while parent != target and parent.exists() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+
+        self._save_json(published_path, manifest)
+        return True
+
+    def publish_to_branch(self, repo_dir: Path, branch: str, message: str) -> bool:
+        """Publicar site/ como commit en una rama Git, sin checkout de un working tree
+
+        El árbol de la rama actúa como manifiesto anterior: sus SHA de blob se
+        comparan directamente con los hashes del sitio, así que solo los
+        archivos nuevos o modificados se escriben en la base de objetos.
+        """
+        manifest = self.build_manifest()
+        parent = self._resolve_branch(repo_dir, branch)
+
+        previous = {}
+        if parent:
+            listing = self._git(repo_dir, ["ls-tree", "-r", "-z", parent])
+            for record in listing.split('\0'):
+                if record:
+                    meta, _, rel = record.partition('\t')
+                    previous[rel] = meta.split()[2]
+
+        added, changed, removed = self.diff(previous, manifest)
+        if not (added or changed or removed):
+            logger.info(f"La rama {branch} ya contiene el sitio actual, nada que publicar")
+            return True
+
+        logger.info(f"Publicando en la rama {branch}: +{len(added)} ~{len(changed)} -{len(removed)}")
+
+        with tempfile.TemporaryDirectory(prefix="docs-publish-") as tmp:
+            env = dict(os.environ, GIT_INDEX_FILE=str(Path(tmp) / "index"))
+            self._git(repo_dir, ["read-tree", parent] if parent else ["read-tree", "--empty"], env=env)
+
+            # Escribir solo los blobs nuevos o modificados
+            to_write = added + changed
+            shas = self._git(
+                repo_dir,
+                ["hash-object", "-w", "--stdin-paths", "--no-filters"],
+                input="\n".join(str(self.site_dir.resolve() / rel) for rel in to_write) + "\n"
+            ).split() if to_write else []
+
+            index_info = [f"100644 {sha}\t{rel}" for rel, sha in zip(to_write, shas)]
+            index_info += [f"0 {'0' * 40}\t{rel}" for rel in removed]
+            self._git(repo_dir, ["update-index", "--index-info"], env=env, input="\n".join(index_info) + "\n")
+
+            tree = self._git(repo_dir, ["write-tree"], env=env).strip()
+
+        commit_args = ["commit-tree", tree, "-m", message]
+        if parent:
+            commit_args += ["-p", parent]
+        commit = self._git(repo_dir, commit_args).strip()
+        self._git(repo_dir, ["update-ref", f"refs/heads/{branch}", commit])
+        logger.info(f"Rama {branch} actualizada a {commit[:8]}")
+        return True
+
+    def _resolve_branch(self, repo_dir: Path, branch: str) -> Optional[str]:
+        """Commit actual de la rama (local o, si no existe, origin/<rama>)"""
+        for ref in (f"refs/heads/{branch}", f"refs/remotes/origin/{branch}"):
+            result = run_command(
+                ["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"],
+                cwd=repo_dir,
+                timeout=GIT_TIMEOUT
+            )
+            if result.returncode == 0:
+                return result.stdout.strip()
+        return None
+
+    @staticmethod
+    def _git(repo_dir: Path, args: List[str], env: Optional[Dict[str, str]] = None, input: Optional[str] = None) -> str:
+        result = run_command(["git"] + args, cwd=repo_dir, env=env, input=input, timeout=GIT_TIMEOUT)
+        if result.returncode != 0:
+            raise RuntimeError(f"git {args[0]} falló: {result.stderr.strip()}")
+        return result.stdout
+
+    @staticmethod
+    def _load_json(path: Path) -> Dict:
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except ValueError:
+            return {}
+
+    @staticmethod
+    def _save_json(path: Path, data: Dict):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=1, sort_keys=True), encoding='utf-8')
+
+
+class TransformCache:
+    """Caché de los archivos escritos por un transform, por hash de entrada
+
+    Para cada destino se guarda la clave (hash del blob de origen + huella
+    del transform), el tamaño y mtime del archivo escrito y los metadatos
+    que el transform necesite recuperar sin reprocesarlo. Si la clave y el
+    archivo coinciden, el origen ni siquiera se lee.
+    """
+
+    def __init__(self, path: Path, root: Path):
+        self.path = path
+        self.root = root
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding='utf-8'))
+            except ValueError:
+                self.entries = {}
+
+    def lookup(self, dest: Path, key: str) -> Optional[Dict[str, Any]]:
+        """Metadatos del destino si sigue siendo la salida de esa clave"""
+        with self._lock:
+            entry = self.entries.get(dest.relative_to(self.root).as_posix())
+        if entry is None or entry['key'] != key:
+            return None
+        try:
+            stat = dest.stat()
+        except OSError:
+            return None
+        if stat.st_size != entry['size'] or stat.st_mtime_ns != entry['mtime_ns']:
+            return None
+        return entry['meta']
+
+    def record(self, dest: Path, key: str, meta: Dict[str, Any]):
+        stat = dest.stat()
+        with self._lock:
+            self.entries[dest.relative_to(self.root).as_posix()] = {
+                'key': key, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'meta': meta
+            }
+
+    def save(self):
+        """Guardar solo las entradas cuyo destino sigue existiendo"""
+        with self._lock:
+            self.entries = {rel: entry for rel, entry in self.entries.items() if (self.root / rel).is_file()}
+            data = json.dumps(self.entries, sort_keys=True, ensure_ascii=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(data, encoding='utf-8')
+
+
+class MarkdownTransformer:
+    """Transform de FileSynchronizer que adapta cada página de un proyecto en una sola pasada
+
+    - Los enlaces relativos escritos según la estructura del repositorio del
+      proyecto (p. ej. ../../CHANGELOG.md desde docs/guide/) se reescriben a
+      la ruta que tiene su destino dentro de proyectos/<slug>/. Los que ya
+      son válidos en el destino no se tocan.
+    - Las referencias a assets del proyecto apuntan al almacén compartido;
+      `referenced` recoge los assets usados.
+    - Se inyecta el front matter del proyecto (project, project_name y las
+      etiquetas de aggregator.tags), respetando el que ya tenga la página.
+
+    Los bloques y fragmentos de código no se tocan. Con `cache`, las páginas
+    cuyo origen y contexto no cambiaron no se vuelven a procesar.
+    """
+
+    suffixes = ('.md',)
+    VERSION = 1
+    FRONT_MATTER = re.compile(r'\A---[ \t]*\r?\n(.*?\r?\n)?(?:---|\.\.\.)[ \t]*(?:\r?\n|\Z)', re.DOTALL)
+
+    def __init__(self, project_dest: Path, docs_dir: Path, store_root: Path, assets: Dict[str, str],
+                 paths: List[Tuple[str, str]], front_matter: Dict[str, Any],
+                 cache: Optional[TransformCache] = None):
+        self.project_dest = project_dest
+        self.project_rel = project_dest.relative_to(docs_dir).as_posix()
+        self.store_rel = store_root.relative_to(docs_dir).as_posix()
+        self.assets = assets
+        self.paths = paths
+        self.front_matter = front_matter
+        self.cache = cache
+        self.referenced: set = set()
+        self.stats = {'transformed': 0, 'cached': 0}
+        self._page_assets: Dict[Path, set] = {}
+        self._lock = threading.Lock()
+        self.fingerprint = hashlib.sha256(json.dumps(
+            [self.VERSION, self.project_rel, self.store_rel, assets, paths, front_matter],
+            sort_keys=True, ensure_ascii=False, default=str
+        ).encode('utf-8')).hexdigest()
+
+    def __call__(self, dest: Path, data: bytes) -> bytes:
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            return data
+
+        page = dest.relative_to(self.project_dest).as_posix()
+        source = self._to_source(page)
+        referenced: set = set()
+        body_start, text = self._inject_front_matter(text)
+
+        lines = text[body_start:].splitlines(keepends=True)
+        fence = None
+        for number, line in enumerate(lines):
+            match = LinkChecker.FENCE.match(line)
+            if fence is not None:
+                if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                    fence = None
+                continue
+            if match:
+                fence = match.group(1)
+                continue
+            lines[number] = self._rewrite_line(page, source, line, referenced)
+
+        with self._lock:
+            self.referenced.update(referenced)
+            self._page_assets[dest] = referenced
+            self.stats['transformed'] += 1
+        return (text[:body_start] + ''.join(lines)).encode('utf-8')
+
+    def page_meta(self, dest: Path) -> Dict[str, Any]:
+        """Metadatos para la caché: los assets que referencia la página"""
+        with self._lock:
+            return {'assets': sorted(self._page_assets.pop(dest, set()))}
+
+    def restore(self, dest: Path, meta: Dict[str, Any]):
+        """Recuperar de la caché lo que habría producido el transform"""
+        with self._lock:
+            self.referenced.update(meta.get('assets', []))
+            self.stats['cached'] += 1
+
+    def _inject_front_matter(self, text: str) -> Tuple[int, str]:
+        """Añadir el front matter del proyecto; devuelve (inicio del cuerpo, texto)"""
+        if not self.front_matter:
+            return 0, text
+
+        existing: Dict[str, Any] = {}
+        body = text
+        match = self.FRONT_MATTER.match(text)
+        if match:
+            try:
+                existing = yaml.load(match.group(1) or '', Loader=YAML_LOADER) or {}
+            except yaml.YAMLError:
+                existing = None
+            if not isinstance(existing, dict):
+                # Front matter que MkDocs tampoco entendería: se deja como está
+                return match.end(), text
+            body = text[match.end():]
+
+        meta = dict(existing)
+        for key, value in self.front_matter.items():
+            if key == 'tags':
+                page_tags = meta.get('tags') or []
+                page_tags = page_tags if isinstance(page_tags, list) else [page_tags]
+                meta['tags'] = page_tags + [tag for tag in value if tag not in page_tags]
+            else:
+                meta.setdefault(key, value)
+
+        header = "---\n" + yaml.safe_dump(meta, allow_unicode=True, sort_keys=False, width=1000) + "---\n"
+        return len(header), header + body
+
+    def _rewrite_line(self, page: str, source: Optional[str], line: str, referenced: set) -> str:
+        code = [match.span() for match in LinkChecker.INLINE_CODE.finditer(line)]
+        replacements: Dict[int, Tuple[int, str]] = {}
+        for pattern in (LinkChecker.INLINE_LINK, LinkChecker.REFERENCE, LinkChecker.HTML_LINK):
+            for match in pattern.finditer(line):
+                start, end = match.span(1)
+                if start in replacements or any(a <= start < b for a, b in code):
+                    continue
+                target = self._rewrite_target(page, source, match.group(1), referenced)
+                if target is not None:
+                    replacements[start] = (end, target)
+
+        for start in sorted(replacements, reverse=True):
+            end, target = replacements[start]
+            line = line[:start] + target + line[end:]
+        return line
+
+    def _rewrite_target(self, page: str, source: Optional[str], target: str, referenced: set) -> Optional[str]:
+        """Nuevo destino de un enlace relativo, o None si no hay que cambiarlo"""
+        if not target or LinkChecker.EXTERNAL.match(target) or target.startswith(('/', '#')):
+            return None
+
+        path, sep, fragment = target.partition('#')
+        path, query_sep, query = path.partition('?')
+        if not path:
+            return None
+        decoded = unquote(path)
+
+        # Primero según la estructura del repositorio de origen; si no, tal cual en el destino
+        dest = None
+        if source is not None:
+            dest = self._to_dest(posixpath.normpath(posixpath.join(posixpath.dirname(source), decoded)))
+        in_place = posixpath.normpath(posixpath.join(posixpath.dirname(page), decoded))
+        if dest is None:
+            dest = in_place
+
+        name = self.assets.get(dest)
+        if name is not None:
+            referenced.add(dest)
+            page_dir = posixpath.dirname(f"{self.project_rel}/{page}")
+            new_path = posixpath.relpath(f"{self.store_rel}/{name}", page_dir)
+        elif dest != in_place:
+            new_path = posixpath.relpath(dest, posixpath.dirname(page) or '.')
+            if path.endswith('/'):
+                new_path += '/'
+        else:
+            return None
+
+        return new_path + query_sep + query + sep + fragment
+
+    def _to_dest(self, source_rel: str) -> Optional[str]:
+        """Ruta en el destino de una ruta del repositorio de origen (None si no se copia)"""
+        for source, dest in self.paths:
+            if source_rel == source:
+                return dest
+            if source_rel.startswith(f"{source}/"):
+                return f"{dest}/{source_rel[len(source) + 1:]}"
+        return None
+
+    def _to_source(self, dest_rel: str) -> Optional[str]:
+        for source, dest in self.paths:
+            if dest_rel == dest:
+                return source
+            if dest_rel.startswith(f"{dest}/"):
+                return f"{source}/{dest_rel[len(dest) + 1:]}"
+        return None
+
+
+class PageIndex:
+    """Índice SQLite con los metadatos de todas las páginas agregadas
+
+    Por página se guarda el front matter, el título, las cabeceras, las
+    etiquetas, el número de palabras, el commit de origen y el hash del
+    contenido. La actualización es incremental: los archivos con el mismo
+    tamaño y mtime no se leen, y solo se reescriben las filas cuyo contenido
+    cambió. Las páginas de etiquetas, cambios recientes y estadísticas se
+    generan a partir de consultas sobre este índice.
+    """
+
+    VERSION = 1
+    ROOTS = ('proyectos', 'proyectos-externos')
+    WORD = re.compile(r'\w+')
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            path TEXT PRIMARY KEY,
+            project TEXT NOT NULL,
+            title TEXT NOT NULL,
+            front_matter TEXT NOT NULL,
+            headings TEXT NOT NULL,
+            word_count INTEGER NOT NULL,
+            source_sha TEXT,
+            content_hash TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            changed_at INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tags (
+            path TEXT NOT NULL REFERENCES pages (path) ON DELETE CASCADE,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (path, tag)
+        );
+        CREATE INDEX IF NOT EXISTS pages_by_project ON pages (project);
+        CREATE INDEX IF NOT EXISTS pages_by_change ON pages (changed_at);
+        CREATE INDEX IF NOT EXISTS tags_by_tag ON tags (tag);
+    """
+
+    def __init__(self, path: Path, docs_dir: Path):
+        self.path = path
+        self.docs_dir = docs_dir
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("PRAGMA foreign_keys = ON")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != self.VERSION:
+            self.db.executescript("DROP TABLE IF EXISTS tags; DROP TABLE IF EXISTS pages;")
+            self.db.execute(f"PRAGMA user_version = {self.VERSION}")
+        self.db.executescript(self.SCHEMA)
+        self.stats = {'unchanged': 0, 'touched': 0, 'updated': 0, 'removed': 0}
+
+    def update(self, sources: Dict[str, Tuple[Optional[str], Optional[int]]], now: int,
+               follow_sources: bool = False) -> Dict[str, int]:
+        """Sincronizar el índice con las páginas de docs/
+
+        `sources` asocia cada proyecto ('proyectos/<slug>') con el commit de
+        origen y su fecha; las páginas modificadas toman esa fecha (o `now`).
+        Con `follow_sources` (modo reproducible), todas las páginas de un
+        proyecto toman la fecha de su commit actual aunque no cambien, como
+        en una ejecución sin índice previo.
+        """
+        self.stats = dict.fromkeys(self.stats, 0)
+        known = {
+            path: (size, mtime_ns, content_hash, source_sha)
+            for path, size, mtime_ns, content_hash, source_sha in self.db.execute(
+                "SELECT path, size, mtime_ns, content_hash, source_sha FROM pages"
+            )
+        }
+        seen = set()
+
+        with self.db:
+            for root in self.ROOTS:
+                for page in sorted((self.docs_dir / root).glob('*/**/*.md')):
+                    rel = page.relative_to(self.docs_dir).as_posix()
+                    seen.add(rel)
+                    stat = page.stat()
+                    previous = known.get(rel)
+                    project = '/'.join(rel.split('/')[:2])
+                    source_sha, source_date = sources.get(project, (None, None))
+                    if (follow_sources and previous is not None and source_sha is not None
+                            and previous[3] != source_sha):
+                        self.db.execute(
+                            "UPDATE pages SET source_sha = ?, changed_at = ? WHERE path = ?",
+                            (source_sha, source_date or now, rel)
+                        )
+
+                    if previous is not None and previous[:2] == (stat.st_size, stat.st_mtime_ns):
+                        self.stats['unchanged'] += 1
+                        continue
+
+                    data = page.read_bytes()
+                    content_hash = hashlib.sha256(data).hexdigest()
+                    if previous is not None and previous[2] == content_hash:
+                        # Reescrito con el mismo contenido: solo cambia la firma del archivo
+                        self.db.execute(
+                            "UPDATE pages SET size = ?, mtime_ns = ? WHERE path = ?",
+                            (stat.st_size, stat.st_mtime_ns, rel)
+                        )
+                        self.stats['touched'] += 1
+                        continue
+
+                    meta = self.parse_page(data.decode('utf-8', errors='replace'), page.stem)
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            rel, project, meta['title'],
+                            json.dumps(meta['front_matter'], sort_keys=True, ensure_ascii=False, default=str),
+                            json.dumps(meta['headings'], ensure_ascii=False),
+                            meta['word_count'], source_sha, content_hash,
+                            stat.st_size, stat.st_mtime_ns, source_date or now
+                        )
+                    )
+                    self.db.execute("DELETE FROM tags WHERE path = ?", (rel,))
+                    self.db.executemany(
+                        "INSERT OR IGNORE INTO tags VALUES (?, ?)", [(rel, tag) for tag in meta['tags']]
+                    )
+                    self.stats['updated'] += 1
+
+            removed = sorted(set(known) - seen)
+            self.db.executemany("DELETE FROM pages WHERE path = ?", [(rel,) for rel in removed])
+            self.stats['removed'] = len(removed)
+
+        return self.stats
+
+    @classmethod
+    def parse_page(cls, text: str, fallback_title: str) -> Dict[str, Any]:
+        """Front matter, título, cabeceras, etiquetas y palabras de una página"""
+        front_matter: Dict[str, Any] = {}
+        match = MarkdownTransformer.FRONT_MATTER.match(text)
+        if match:
+            try:
+                loaded = yaml.load(match.group(1) or '', Loader=YAML_LOADER)
+            except yaml.YAMLError:
+                loaded = None
+            if isinstance(loaded, dict):
+                front_matter = loaded
+            text = text[match.end():]
+
+        headings: List[Tuple[int, str]] = []
+        words = 0
+        fence = None
+        for line in text.splitlines():
+            fence_match = LinkChecker.FENCE.match(line)
+            if fence is not None:
+                if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence):
+                    fence = None
+                continue
+            if fence_match:
+                fence = fence_match.group(1)
+                continue
+
+            heading = LinkChecker.HEADING.match(line)
+            if heading:
+                headings.append((len(heading.group(1)), heading.group(2)))
+            words += len(cls.WORD.findall(LinkChecker.INLINE_CODE.sub('', line)))
+
+        title = front_matter.get('title')
+        if not title:
+            title = next((heading for level, heading in headings if level == 1), fallback_title)
+
+        tags = front_matter.get('tags') or []
+        if not isinstance(tags, list):
+            tags = [tags]
+
+        return {
+            'front_matter': front_matter,
+            'title': str(title),
+            'headings': headings,
+            'tags': sorted({str(tag) for tag in tags if tag is not None}),
+            'word_count': words,
+        }
+
+    def project_stats(self) -> Dict[str, Tuple[int, int]]:
+        """Páginas y palabras de cada proyecto"""
+        return {
+            project: (pages, words or 0)
+            for project, pages, words in self.db.execute(
+                "SELECT project, COUNT(*), SUM(word_count) FROM pages GROUP BY project"
+            )
+        }
+
+    def pages_by_tag(self) -> Dict[str, List[Tuple[str, str, str]]]:
+        """(ruta, título, proyecto) de las páginas de cada etiqueta"""
+        tagged: Dict[str, List[Tuple[str, str, str]]] = {}
+        for tag, path, title, project in self.db.execute(
+            "SELECT tags.tag, pages.path, pages.title, pages.project FROM tags"
+            " JOIN pages USING (path) ORDER BY tags.tag COLLATE NOCASE, tags.tag, pages.project, pages.path"
+        ):
+            tagged.setdefault(tag, []).append((path, title, project))
+        return tagged
+
+    def recent(self, limit: int) -> List[Tuple[str, str, str, int]]:
+        """(ruta, título, proyecto, fecha) de las páginas modificadas más recientemente"""
+        return self.db.execute(
+            "SELECT path, title, project, changed_at FROM pages ORDER BY changed_at DESC, path LIMIT ?",
+            (limit,)
+        ).fetchall()
+
+    def close(self):
+        self.db.close()
+
+
+@dataclass(frozen=True)
+class CatalogSection:
+    """Sección de documentación de un proyecto (un elemento de documentation.structure)"""
+    title: str
+    source: str
+    type: str = 'file'
+    icon: str = '📄'
+
+    @property
+    def name(self) -> str:
+        return Path(self.source).name
+
+    @property
+    def nav_target(self) -> str:
+        """Página de la sección relativa al directorio del proyecto"""
+        return f"{self.name}/index.md" if self.type == 'directory' else self.name
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Datos de un proyecto ya normalizados, con los valores por defecto aplicados"""
+    slug: str
+    name: str
+    description: Optional[str] = None
+    status: str = 'development'
+    version: str = '0.0.0'
+    repository: Optional[str] = None
+    category: str = 'General'
+    priority: int = 50
+    featured: bool = False
+    tags: Tuple[str, ...] = ()
+    technologies: Tuple[Tuple[str, Optional[str]], ...] = ()
+    sections: Tuple[CatalogSection, ...] = ()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'CatalogEntry':
+        info = config['project']
+        aggregator = config.get('aggregator', {})
+        technologies = []
+        for tech in info.get('technologies', []):
+            if isinstance(tech, dict):
+                version = tech.get('version')
+                technologies.append((str(tech.get('name', 'Unknown')), None if version is None else str(version)))
+            else:
+                technologies.append((str(tech), None))
+
+        return cls(
+            slug=info['slug'],
+            name=info['name'],
+            description=info.get('description'),
+            status=info.get('status', 'development'),
+            version=str(info.get('version', '0.0.0')),
+            repository=info.get('repository'),
+            category=aggregator.get('category', 'General'),
+            priority=aggregator.get('priority', 50),
+            featured=bool(aggregator.get('featured', False)),
+            tags=tuple(str(tag) for tag in aggregator.get('tags', [])),
+            technologies=tuple(technologies),
+            sections=tuple(
+                CatalogSection(
+                    title=item['title'],
+                    source=item['source'],
+                    type=item.get('type', 'file'),
+                    icon=item.get('icon', '📄')
+                )
+                for item in config.get('documentation', {}).get('structure', [])
+            )
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CatalogEntry':
+        return cls(**dict(
+            data,
+            tags=tuple(data.get('tags', [])),
+            technologies=tuple(tuple(tech) for tech in data.get('technologies', [])),
+            sections=tuple(CatalogSection(**section) for section in data.get('sections', []))
+        ))
+
+    @property
+    def sort_key(self) -> Tuple:
+        """Orden estable de proyectos: prioridad, nombre y slug como desempate"""
+        return (-self.priority, self.name, self.slug)
+
+
+class ProjectCatalog:
+    """Catálogo de proyectos construido una vez tras la agregación
+
+    Mantiene las entradas en orden de prioridad y los índices por slug,
+    categoría, estado, etiqueta y destacados que usan la navegación, el
+    índice de proyectos y la validación. Se serializa a catalog.json para
+    otras etapas, ejecuciones posteriores y páginas del lado del cliente.
+    """
+
+    VERSION = 1
+
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        self.entries: List[CatalogEntry] = sorted(entries, key=lambda entry: entry.sort_key)
+        self.by_slug: Dict[str, CatalogEntry] = {}
+        self.by_category: Dict[str, List[CatalogEntry]] = {}
+        self.by_status: Dict[str, List[CatalogEntry]] = {}
+        self.by_tag: Dict[str, List[CatalogEntry]] = {}
+        self.featured: List[CatalogEntry] = []
+
+        # Al recorrer en orden de prioridad, cada índice queda ya ordenado
+        for entry in self.entries:
+            self.by_slug[entry.slug] = entry
+            self.by_category.setdefault(entry.category, []).append(entry)
+            self.by_status.setdefault(entry.status, []).append(entry)
+            for tag in entry.tags:
+                self.by_tag.setdefault(tag, []).append(entry)
+            if entry.featured:
+                self.featured.append(entry)
+
+    @classmethod
+    def from_projects(cls, projects: List[Dict[str, Any]]) -> 'ProjectCatalog':
+        return cls(CatalogEntry.from_config(project) for project in projects)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self.entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': self.VERSION,
+            'projects': [asdict(entry) for entry in self.entries],
+            'indexes': {
+                'category': {key: [e.slug for e in value] for key, value in sorted(self.by_category.items())},
+                'status': {key: [e.slug for e in value] for key, value in sorted(self.by_status.items())},
+                'tag': {key: [e.slug for e in value] for key, value in sorted(self.by_tag.items())},
+                'featured': [entry.slug for entry in self.featured],
+            },
+        }
+
+    def save(self, path: Path) -> bool:
+        content = json.dumps(self.to_dict(), ensure_ascii=False, indent=1, sort_keys=True)
+        return write_text_if_changed(path, content + "\n")
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['ProjectCatalog']:
+        """Leer un catalog.json; None si no existe o es de otra versión"""
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != cls.VERSION:
+            return None
+        return cls(CatalogEntry.from_dict(project) for project in data.get('projects', []))
+
+
+def event_key(payload: Any) -> Optional[str]:
+    """Clave de coalescencia de un evento: branch:<rama>, slug:<slug>, external:<slug> o all
+
+    Acepta también el payload de un push de GitHub (ref) y el de un
+    repository_dispatch (event_type, que fuerza una actualización completa).
+    """
+    if not isinstance(payload, dict):
+        return None
+
+    ref = str(payload.get('branch') or payload.get('ref') or '').removeprefix('refs/heads/')
+    if ref.startswith('docs/'):
+        return f"branch:{ref}"
+    if payload.get('slug'):
+        return f"slug:{payload['slug']}"
+    if payload.get('external'):
+        return f"external:{payload['external']}"
+    if payload.get('all') or payload.get('event_type'):
+        return 'all'
+    return None
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def send_event(address: str, event: str) -> bool:
+    """Enviar un evento al daemon: una rama docs/*, external:<slug>, all o un slug"""
+    if event.startswith('docs/'):
+        payload = {'branch': event}
+    elif event.startswith('external:'):
+        payload = {'external': event.split(':', 1)[1]}
+    elif event == 'all':
+        payload = {'all': True}
+    else:
+        payload = {'slug': event}
+
+    host, port = parse_address(address)
+    request = urllib.request.Request(
+        f"http://{host}:{port}/events",
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            logger.info(f"Evento aceptado: {response.read().decode('utf-8')}")
+            return True
+    except OSError as e:
+        logger.error(f"No se pudo enviar el evento a {address}: {e}")
+        return False
+
+
+class UpdateEvents:
+    """Eventos de actualización pendientes, agrupados por clave y con debounce
+
+    Los eventos repetidos de una misma clave se funden en uno. Una clave
+    está lista cuando pasan `debounce` segundos sin eventos nuevos para ella
+    o, como mucho, `max_delay` segundos desde el primero, para que una
+    ráfaga continua no la retrase indefinidamente.
+    """
+
+    def __init__(self, debounce: float, max_delay: float):
+        self.debounce = debounce
+        self.max_delay = max(debounce, max_delay)
+        self._pending: Dict[str, List[float]] = {}
+        self._condition = threading.Condition()
+        self.stats = {'received': 0, 'coalesced': 0, 'batches': 0}
+
+    def add(self, key: str):
+        now = time.monotonic()
+        with self._condition:
+            self.stats['received'] += 1
+            if key in self._pending:
+                self._pending[key][1] = now
+                self.stats['coalesced'] += 1
+            else:
+                self._pending[key] = [now, now]
+            self._condition.notify()
+
+    def take(self, timeout: float = 1.0) -> List[str]:
+        """Esperar como mucho `timeout` segundos y devolver las claves listas"""
+        with self._condition:
+            now = time.monotonic()
+            waits = []
+            for first, last in self._pending.values():
+                waits.append(min(self.debounce - (now - last), self.max_delay - (now - first)))
+            wait = min(waits + [timeout])
+            if wait > 0:
+                self._condition.wait(wait)
+
+            now = time.monotonic()
+            ready = sorted(
+                key for key, (first, last) in self._pending.items()
+                if now - last >= self.debounce or now - first >= self.max_delay
+            )
+            for key in ready:
+                del self._pending[key]
+            if ready:
+                self.stats['batches'] += 1
+            return ready
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._condition:
+            return dict(self.stats, pending=sorted(self._pending))
+
+
+class EventRequestHandler(BaseHTTPRequestHandler):
+    """Endpoint HTTP del modo daemon: POST /events encola un evento, GET /status informa"""
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/events':
+            self._reply(404, {'error': 'ruta desconocida'})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._reply(400, {'error': 'JSON inválido'})
+            return
+
+        key = event_key(payload)
+        if key is None:
+            self._reply(400, {'error': 'evento no reconocido'})
+            return
+        self.server.events.add(key)
+        self._reply(202, {'queued': key})
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/status':
+            self._reply(404, {'error': 'ruta desconocida'})
+            return
+        self._reply(200, dict(self.server.events.snapshot(), **self.server.status))
+
+    def _reply(self, code: int, body: Dict[str, Any]):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"daemon: {format % args}")
+
 
 class DocumentationAggregator:
     """Agregador principal de documentación multi-proyecto"""
 
-    def __init__(self, base_dir: Path, output_dir: Path):
+    def __init__(self, base_dir: Path, output_dir: Path, jobs: int = 1, reader: str = 'clone',
+                 force: bool = False, incremental: bool = False, reproducible: bool = False,
+                 external_config: Optional[Path] = None,
+                 external_url_template: str = EXTERNAL_URL_TEMPLATE,
+                 mirror_cache_dir: Optional[Path] = None,
+                 mirror_cache_size: int = 2048,
+                 trace_path: Optional[Path] = None,
+                 sharded_build: bool = False,
+                 optimize_images: bool = False,
+                 image_widths: Iterable[int] = (),
+                 git_timeout: float = GIT_TIMEOUT,
+                 build_timeout: float = BUILD_TIMEOUT,
+                 retries: int = 2,
+                 project_deadline: float = PROJECT_DEADLINE):
         self.base_dir = base_dir
         self.output_dir = output_dir
+        self.jobs = max(1, jobs)
+        self.reader = reader
+        self.object_reader: Optional[GitObjectReader] = None
         self.docs_dir = output_dir / "docs" / "docs"
         self.projects_dir = self.docs_dir / "proyectos"
         self.projects: List[Dict[str, Any]] = []
+        self.external_dir = self.docs_dir / "proyectos-externos"
+        self.external_config = external_config or base_dir / "config" / "external_repos.yml"
+        self.external_url_template = external_url_template
+        self.external_projects: List[Dict[str, Any]] = []
+        self.force = force
+        self.incremental = incremental
+        self.reproducible = reproducible
+        self.sharded_build = sharded_build
+        self.git_timeout = git_timeout
+        self.build_timeout = build_timeout
+        self.retries = max(0, retries)
+        self.project_deadline = project_deadline
+        self.site_dir = output_dir / "docs" / "site"
+
+        # Estado persistente entre ejecuciones (manifiesto de agregación)
+        self.state_dir = output_dir / ".docs-aggregator"
+        self.manifest_path = self.state_dir / "manifest.json"
+        self.build_state_path = self.state_dir / "build.json"
+        self.external_state_path = self.state_dir / "external.json"
+        self.search_state_path = self.state_dir / "search.json"
+        self.search_cache_dir = self.state_dir / "search-shards"
+        # Índice de búsqueda completo del último build (en site/ solo queda uno sin documentos)
+        self.search_index_path = self.state_dir / "search_index.json"
+        self.build_shards_dir = self.state_dir / "build-shards"
+        self.config_cache_path = self.state_dir / "configs.json"
+        self.mirrors = MirrorCache(
+            mirror_cache_dir or self.state_dir / "mirrors",
+            mirror_cache_size * 1024 * 1024,
+            timeout=git_timeout,
+            retries=self.retries
+        )
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self.branch_shas: Dict[str, str] = {}
+        self.branch_trees: Dict[str, str] = {}
+        self.branch_dates: Dict[str, int] = {}
+        self.source_dates: Dict[str, int] = {}
+        self.changed_slugs = set()
+        self.removed_slugs = set()
+        self.changed_external_slugs = set()
+        # Proyectos servidos con su última versión buena porque falló su actualización
+        self.stale_slugs: Dict[str, Dict[str, Any]] = {}
+        self.nav: List[Dict[str, Any]] = []
+        self.catalog: Optional[ProjectCatalog] = None
+        self.local_sources: Dict[str, Dict[str, Any]] = {}
+        self.synchronizer = FileSynchronizer()
+        self.asset_store = AssetStore(self.docs_dir / "_assets", self.synchronizer)
+        self.asset_refs: Dict[str, List[str]] = {}
+        self.markdown_cache = TransformCache(self.state_dir / "markdown.json", self.docs_dir)
+        self.page_index_path = self.state_dir / "pages.sqlite"
+        self.page_index: Optional[PageIndex] = None
+        self.tracer = Tracer(trace_path)
+        self.image_optimizer = None
+        if optimize_images:
+            self.image_optimizer = ImageOptimizer(self.state_dir / "images", image_widths, self.jobs)
+
+        # Configuraciones docs.yaml parseadas, por hash de blob
+        self.config_cache: Dict[str, Dict[str, Any]] = {}
+        self.used_configs: Dict[str, Dict[str, Any]] = {}
+        self._config_lock = threading.Lock()
 
     def setup_directories(self):
         """Crear estructura de directorios necesaria"""
@@ -45,89 +2597,222 @@ class DocumentationAggregator:
         """Encontrar todas las ramas de documentación de proyectos"""
         logger.info("Buscando ramas de documentación...")
 
-        # Obtener lista de ramas remotas
-        result = subprocess.run(
-            ["git", "branch", "-r"],
-            capture_output=True,
-            text=True,
-            cwd=self.base_dir
+        branches = self.resolve_project_refs()
+        for branch_name in branches:
+            logger.info(f"  Encontrada rama: {branch_name}")
+
+        return branches
+
+    def resolve_project_refs(self) -> List[str]:
+        """Resolver las ramas origin/docs/* con su commit, fecha y árbol en un solo for-each-ref"""
+        result = run_command(
+            [
+                "git", "for-each-ref",
+                "--format=%(objectname) %(tree) %(committerdate:unix) %(refname:short)",
+                "refs/remotes/origin/docs/"
+            ],
+            cwd=self.base_dir,
+            timeout=self.git_timeout
         )
+        if result.returncode != 0:
+            logger.error(f"Error al listar las ramas de documentación: {result.stderr}")
 
         branches = []
         for line in result.stdout.splitlines():
-            line = line.strip()
-            # Buscar ramas con formato: origin/docs/*
-            if "origin/docs/" in line:
-                branch_name = line.replace("origin/", "")
-                branches.append(branch_name)
-                logger.info(f"  Encontrada rama: {branch_name}")
+            sha, tree, date, ref = line.strip().split(" ", 3)
+            branch_name = ref.replace("origin/", "", 1)
+            branches.append(branch_name)
+            self.branch_shas[branch_name] = sha
+            self.branch_trees[branch_name] = tree
+            self.branch_dates[branch_name] = int(date)
 
         return branches
 
-    def checkout_branch(self, branch: str) -> Optional[Path]:
+    def checkout_branch(self, branch: str, deadline: Optional[float] = None) -> Optional[Path]:
         """Checkout de una rama específica en directorio temporal"""
-        temp_dir = Path(f"/tmp/docs-branch-{branch.replace('/', '-')}")
-
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+        # Directorio único por llamada: varios workers pueden clonar a la vez
+        temp_dir = Path(tempfile.mkdtemp(prefix=f"docs-branch-{branch.replace('/', '-')}-"))
 
         logger.info(f"Clonando rama {branch}...")
 
         # Clonar solo la rama específica
-        result = subprocess.run(
-            [
-                "git", "clone",
-                "--single-branch",
-                "--branch", branch,
-                "--depth", "1",
-                str(self.base_dir),
-                str(temp_dir)
-            ],
-            capture_output=True,
-            text=True
-        )
+        with self.tracer.span('git clone', 'git', branch=branch):
+            result = run_command(
+                [
+                    "git", "clone",
+                    "--single-branch",
+                    "--branch", branch,
+                    "--depth", "1",
+                    str(self.base_dir),
+                    str(temp_dir)
+                ],
+                timeout=self.git_timeout,
+                retries=self.retries,
+                deadline=deadline,
+                before_retry=lambda: shutil.rmtree(temp_dir, ignore_errors=True)
+            )
 
         if result.returncode != 0:
             logger.error(f"Error al clonar rama {branch}: {result.stderr}")
+            shutil.rmtree(temp_dir, ignore_errors=True)
             return None
 
         return temp_dir
 
+    def open_branch_tree(self, branch: str) -> Optional[GitTreePath]:
+        """Abrir el árbol de una rama directamente desde la base de objetos local"""
+        tree = GitTreePath(self.object_reader, f"origin/{branch}")
+
+        if not tree.exists():
+            logger.error(f"No se pudo resolver la rama origin/{branch}")
+            return None
+
+        logger.info(f"Leyendo rama {branch} desde la base de objetos...")
+        return tree
+
     def read_project_config(self, project_path: Path) -> Optional[Dict[str, Any]]:
-        """Leer configuración docs.yaml del proyecto"""
+        """Leer y validar la configuración docs.yaml del proyecto"""
+        config, config_hash, errors = self.load_project_config(project_path)
+        for error in errors:
+            logger.error(f"{project_path}/docs.yaml: {error}")
+        return config
+
+    def load_project_config(self, project_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[str], List[str]]:
+        """Parsear y validar docs.yaml con caché por hash de blob
+
+        Devuelve (configuración o None, hash del blob, errores). Un docs.yaml
+        idéntico a uno ya visto, en esta ejecución o en una anterior, no se
+        vuelve a parsear.
+        """
         config_path = project_path / "docs.yaml"
 
         if not config_path.exists():
             logger.warning(f"No se encontró docs.yaml en {project_path}")
-            return None
+            return None, None, []
 
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-
-            # Validar campos requeridos
-            required = ['project', 'documentation']
-            for field in required:
-                if field not in config:
-                    logger.error(f"Campo requerido '{field}' faltante en {config_path}")
-                    return None
+            # En un árbol Git el SHA del blob ya está disponible sin leerlo
+            if isinstance(config_path, GitTreePath):
+                config_hash = config_path.object_sha()
+            else:
+                config_hash = git_blob_hash(config_path)
+
+            with self._config_lock:
+                cached = self.config_cache.get(config_hash)
+
+            if cached is None:
+                try:
+                    config = yaml.load(config_path.read_text(encoding='utf-8'), Loader=YAML_LOADER)
+                except yaml.YAMLError as e:
+                    cached = {'config': None, 'errors': [f"YAML inválido: {e}"]}
+                else:
+                    errors = validate_docs_config(config)
+                    cached = {'config': None if errors else config, 'errors': errors}
+
+            with self._config_lock:
+                self.config_cache[config_hash] = cached
+                self.used_configs[config_hash] = cached
 
-            return config
+            return cached['config'], config_hash, cached['errors']
 
         except Exception as e:
             logger.error(f"Error al leer {config_path}: {e}")
-            return None
+            return None, None, []
 
-    def copy_project_docs(self, project_config: Dict, source_path: Path, project_slug: str):
-        """Copiar documentación del proyecto al sitio central"""
-        logger.info(f"Copiando documentación de {project_slug}...")
+    def validate_project_configs(self, items: List[Dict[str, Any]], sources: Dict[int, Any]) -> List[Dict[str, Any]]:
+        """Validar en bloque los docs.yaml de todos los proyectos antes de obtenerlos
+
+        Los proyectos con una configuración inválida se descartan aquí, antes
+        del clon o la copia, y se informan todos juntos.
+        """
+        invalid = []
+        with self.tracer.span('validate configs', projects=len(sources)):
+            for item in items:
+                source = sources.get(item['index'])
+                if source is None:
+                    continue
+
+                config, config_hash, errors = self.load_project_config(source)
+                if config is None:
+                    item['invalid'] = True
+                    if errors:
+                        invalid.append((item['label'], errors))
+                else:
+                    item['config'] = config
+                    item['config_hash'] = config_hash
+
+        if invalid:
+            logger.error(f"❌ {len(invalid)} proyectos con docs.yaml inválido, se omiten:")
+            for label, errors in invalid:
+                for error in errors:
+                    logger.error(f"  {label}: {error}")
 
+        return [item for item in items if not item.get('invalid')]
+
+    def load_config_cache(self):
+        # En modo daemon la caché ya está en memoria desde la primera agregación
+        if not self.config_cache:
+            data = self._load_json_state(self.config_cache_path)
+            # Los resultados de validación dependen del esquema: con otro esquema
+            # (u otro formato del archivo) se descartan
+            if data.get('schema') == DOCS_SCHEMA_FINGERPRINT:
+                self.config_cache = data.get('configs', {})
+            elif data:
+                logger.info("Esquema de docs.yaml distinto al de la caché de configuraciones, se descarta")
+
+    def save_config_cache(self):
+        """Guardar solo las configuraciones usadas en esta ejecución (la caché no crece sin límite)
+
+        Se guarda también la caché de páginas transformadas.
+        """
+        self._save_json_state(self.config_cache_path, {'schema': DOCS_SCHEMA_FINGERPRINT, 'configs': self.used_configs})
+        self.markdown_cache.save()
+
+    def copy_project_docs(self, project_config: Dict, source_path: Path, project_slug: str) -> List[str]:
+        """Copiar documentación del proyecto al sitio central
+
+        Devuelve las rutas escritas, relativas al directorio del proyecto.
+        """
         project_dest = self.projects_dir / project_slug
         project_dest.mkdir(parents=True, exist_ok=True)
 
         # Crear archivo índice del proyecto
         self.create_project_index(project_config, project_dest)
 
+        files = self.copy_project_files(project_config, source_path, project_slug)
+        return sorted(set(files) | {"index.md"})
+
+    def copy_project_files(self, project_config: Dict, source_path: Path, project_slug: str) -> List[str]:
+        """Copiar las secciones y assets de un proyecto (sin generar su índice)
+
+        Las páginas pasan por MarkdownTransformer al copiarse. Los assets se
+        guardan una sola vez en el almacén compartido y las páginas que los
+        referencian apuntan a él; solo los assets que ninguna página
+        referencia se copian en el directorio del proyecto.
+        """
+        logger.info(f"Copiando documentación de {project_slug}...")
+
+        project_dest = self.projects_dir / project_slug
+        project_dest.mkdir(parents=True, exist_ok=True)
+        written: List[Path] = []
+
+        # Nombre en el almacén de cada asset, por su ruta dentro del proyecto
+        assets: Dict[str, Tuple[Any, str]] = {}
+        for asset in project_config.get('documentation', {}).get('assets', []):
+            for source, rel in self._asset_files(source_path / asset, Path(asset).name):
+                assets[rel] = (source, AssetStore.name_for(source))
+
+        project_info = project_config['project']
+        front_matter = {'project': project_slug, 'project_name': project_info['name']}
+        tags = project_config.get('aggregator', {}).get('tags', [])
+        if tags:
+            front_matter['tags'] = [str(tag) for tag in tags]
+        rewriter = MarkdownTransformer(
+            project_dest, self.docs_dir, self.asset_store.root,
+            {rel: name for rel, (_, name) in assets.items()},
+            self._project_paths(project_config), front_matter, cache=self.markdown_cache
+        )
+
         # Procesar estructura de documentación
         doc_structure = project_config.get('documentation', {}).get('structure', [])
 
@@ -139,30 +2824,65 @@ class DocumentationAggregator:
             if item_type == 'directory' and source.is_dir():
                 # Copiar directorio completo
                 dest_dir = project_dest / Path(item['source']).name
-                if dest_dir.exists():
-                    shutil.rmtree(dest_dir)
-                shutil.copytree(source, dest_dir)
+                written.extend(self.synchronizer.sync_dir(source, dest_dir, transform=rewriter))
                 logger.info(f"  Copiado directorio: {item['source']}")
 
             elif source.is_file():
                 # Copiar archivo individual
                 dest_file = project_dest / Path(item['source']).name
-                shutil.copy2(source, dest_file)
+                written.extend(self.synchronizer.sync_file(source, dest_file, transform=rewriter))
                 logger.info(f"  Copiado archivo: {item['source']}")
 
-        # Copiar assets adicionales
-        assets = project_config.get('documentation', {}).get('assets', [])
-        for asset in assets:
+        logger.debug(
+            f"  Páginas transformadas: {rewriter.stats['transformed']}, "
+            f"sin cambios desde la caché: {rewriter.stats['cached']}"
+        )
+
+        # Assets referenciados al almacén; el resto, al directorio del proyecto
+        referenced = rewriter.referenced
+        for rel in sorted(referenced):
+            source, name = assets[rel]
+            self.asset_store.put(source, name)
+
+        def is_referenced(dest: Path) -> bool:
+            return dest.relative_to(project_dest).as_posix() in referenced
+
+        for asset in project_config.get('documentation', {}).get('assets', []):
             asset_path = source_path / asset
-            if asset_path.exists():
-                if asset_path.is_dir():
-                    dest_dir = project_dest / Path(asset).name
-                    if dest_dir.exists():
-                        shutil.rmtree(dest_dir)
-                    shutil.copytree(asset_path, dest_dir)
-                else:
-                    shutil.copy2(asset_path, project_dest / Path(asset).name)
-                logger.info(f"  Copiado asset: {asset}")
+            dest = project_dest / Path(asset).name
+            if asset_path.is_dir():
+                written.extend(self.synchronizer.sync_dir(asset_path, dest, skip=is_referenced))
+            elif not asset_path.is_file():
+                continue
+            elif is_referenced(dest):
+                dest.unlink(missing_ok=True)
+            else:
+                written.extend(self.synchronizer.sync_file(asset_path, dest))
+            logger.info(f"  Copiado asset: {asset}")
+
+        self.asset_refs[project_slug] = sorted({assets[rel][1] for rel in referenced})
+        return sorted({path.relative_to(project_dest).as_posix() for path in written})
+
+    @staticmethod
+    def _project_paths(config: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """Rutas copiadas de un proyecto: (origen relativo, destino relativo)"""
+        documentation = config.get('documentation', {}) if config else {}
+        paths = [(item['source'], Path(item['source']).name) for item in documentation.get('structure', [])]
+        paths += [(asset, Path(asset).name) for asset in documentation.get('assets', [])]
+        return [(posixpath.normpath(source), dest) for source, dest in paths]
+
+    @staticmethod
+    def _asset_files(source, dest_rel: str) -> Iterator[Tuple[Any, str]]:
+        """Archivos de un asset (archivo o directorio) con su ruta de destino en el proyecto"""
+        if source.is_file():
+            yield source, dest_rel
+        elif isinstance(source, GitTreePath):
+            for rel, _ in source.walk_files():
+                yield source / rel, f"{dest_rel}/{rel}"
+        elif source.is_dir():
+            for path in sorted(source.rglob('*')):
+                if path.is_file():
+                    yield path, f"{dest_rel}/{path.relative_to(source).as_posix()}"
 
     def create_project_index(self, config: Dict, dest_path: Path):
         """Crear archivo índice del proyecto"""
@@ -170,7 +2890,7 @@ class DocumentationAggregator:
 
         index_content = f"""# {project_info['name']}
 
-## 📋 Información del Proyecto
+{self._stale_notice(self.stale_slugs.get(project_info['slug']))}## 📋 Información del Proyecto
 
 **Descripción:** {project_info.get('description', 'Sin descripción')}
 
@@ -211,45 +2931,853 @@ class DocumentationAggregator:
 
 ---
 
-*Última actualización: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
+*Última actualización: {self._project_timestamp(project_info['slug'])}*
 """
 
         # Escribir archivo
         index_file = dest_path / "index.md"
-        index_file.write_text(index_content, encoding='utf-8')
+        write_text_if_changed(index_file, index_content)
+
+    def _project_timestamp(self, project_slug: str) -> str:
+        """Fecha de actualización de un proyecto
+
+        En modo reproducible se usa la fecha del commit de origen (o
+        SOURCE_DATE_EPOCH), de modo que la salida solo dependa de las entradas.
+        """
+        if not self.reproducible:
+            return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        timestamp = self.source_dates.get(project_slug)
+        if timestamp is None:
+            timestamp = int(os.environ.get('SOURCE_DATE_EPOCH', 0))
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+
+    def _local_source_date(self, project_dir: Path) -> Optional[int]:
+        """Fecha del último commit que tocó un proyecto local, si está en un repositorio Git"""
+        if 'SOURCE_DATE_EPOCH' in os.environ:
+            return int(os.environ['SOURCE_DATE_EPOCH'])
+
+        result = run_command(
+            ["git", "log", "-1", "--format=%ct", "--", "."],
+            cwd=project_dir,
+            timeout=self.git_timeout
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return int(result.stdout.strip())
+        return None
 
     def aggregate_from_local_projects(self, project_dirs: List[Path]):
         """Agregar documentación de proyectos locales (para desarrollo)"""
         logger.info("Agregando documentación de proyectos locales...")
 
-        for project_dir in project_dirs:
-            if not project_dir.exists():
-                logger.warning(f"Directorio no encontrado: {project_dir}")
+        self.load_config_cache()
+        items = [{'index': index, 'label': str(project_dir), 'dir': project_dir}
+                 for index, project_dir in enumerate(project_dirs)]
+        items = self.validate_project_configs(
+            items, {item['index']: item['dir'] for item in items if item['dir'].is_dir()}
+        )
+
+        results = self._run_project_pipeline(iter(items))
+        self.save_config_cache()
+
+        for item in results:
+            self.projects.append(item['config'])
+            self.changed_slugs.add(item['slug'])
+            self.local_sources[item['slug']] = {'dir': item['dir'], 'files': item['files']}
+
+        self.collect_assets(self.asset_refs.values())
+
+    def collect_assets(self, references: Iterable[List[str]]):
+        """Eliminar del almacén los blobs que ya no referencia ningún proyecto"""
+        keep = set()
+        for names in references:
+            keep.update(names)
+
+        removed = self.asset_store.collect_garbage(keep)
+        stats = self.asset_store.stats
+        logger.info(
+            f"Almacén de assets: {len(keep)} blobs en uso, {stats['stored']} nuevos, "
+            f"{stats['deduplicated']} deduplicados, {removed} eliminados"
+        )
+        self.asset_store.stats = {'stored': 0, 'deduplicated': 0}
+
+    def watch(self, interval: float = 0.2, debounce: float = 0.3):
+        """Observar los proyectos locales y actualizar el sitio al detectar cambios
+
+        Se sondean solo las rutas que se copian (docs.yaml, secciones y
+        assets). Los cambios se agrupan hasta que pasan `debounce` segundos sin
+        cambios nuevos; entonces se recopian los proyectos afectados (solo se
+        escriben los archivos modificados) y se reconstruye con `mkdocs build --dirty`. Si cambia un docs.yaml se
+        regeneran también el índice, la navegación y mkdocs.yml.
+        """
+        if not self.local_sources:
+            logger.warning("No hay proyectos locales que observar")
+            return
+
+        # El sitio deja de corresponder a un build completo registrado
+        self._save_build_state({'config_hash': None})
+        snapshots = {slug: self._watch_snapshot(slug) for slug in self.local_sources}
+        pending: Dict[str, set] = {}
+        last_change = 0.0
+
+        logger.info(f"Observando {len(snapshots)} proyectos locales (Ctrl+C para salir)...")
+        self.tracer.reset()
+        try:
+            while True:
+                time.sleep(interval)
+                for slug, previous in snapshots.items():
+                    current = self._watch_snapshot(slug)
+                    if current != previous:
+                        changed = {
+                            rel for rel in previous.keys() | current.keys()
+                            if previous.get(rel) != current.get(rel)
+                        }
+                        pending.setdefault(slug, set()).update(changed)
+                        snapshots[slug] = current
+                        last_change = time.monotonic()
+
+                if pending and time.monotonic() - last_change >= debounce:
+                    with self.tracer.span('update', projects=sorted(pending)):
+                        self._apply_watch_changes(pending)
+                    self.tracer.finish()
+                    self.tracer.reset()
+                    # Un docs.yaml nuevo puede cambiar las rutas observadas
+                    snapshots = {slug: self._watch_snapshot(slug) for slug in self.local_sources}
+                    pending = {}
+        except KeyboardInterrupt:
+            logger.info("Modo watch detenido")
+
+    def _watch_paths(self, slug: str) -> List[Tuple[str, str]]:
+        """Rutas copiadas de un proyecto local: (origen relativo, destino relativo)"""
+        return self._project_paths(self._local_config(slug))
+
+    def _local_config(self, slug: str) -> Optional[Dict[str, Any]]:
+        return next((p for p in self.projects if p['project']['slug'] == slug), None)
+
+    def _watch_snapshot(self, slug: str) -> Dict[str, Tuple[int, int]]:
+        """(mtime, tamaño) de docs.yaml y de cada archivo de las rutas copiadas"""
+        project_dir = self.local_sources[slug]['dir']
+        snapshot = {}
+        candidates = [project_dir / "docs.yaml"]
+        for source, _ in self._watch_paths(slug):
+            path = project_dir / source
+            candidates.extend(sorted(path.rglob('*')) if path.is_dir() else [path])
+
+        for path in candidates:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if not path.is_dir():
+                snapshot[path.relative_to(project_dir).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _apply_watch_changes(self, changes: Dict[str, set]):
+        """Recopiar los proyectos modificados, regenerar lo afectado y reconstruir"""
+        start = time.monotonic()
+        structural = False
+
+        for slug, rels in sorted(changes.items()):
+            source = self.local_sources[slug]
+
+            if 'docs.yaml' in rels:
+                config = self.read_project_config(source['dir'])
+                if config is None:
+                    logger.error(f"docs.yaml de {slug} no es válido: se mantiene la versión anterior")
+                    continue
+                if config['project']['slug'] != slug:
+                    logger.error(f"Cambiar el slug de {slug} requiere reiniciar el modo watch")
+                    continue
+
+                # Configuración nueva: copia completa del proyecto e índice, navegación y mkdocs.yml
+                self.projects = [config if p['project']['slug'] == slug else p for p in self.projects]
+                files = self.copy_project_docs(config, source['dir'], slug)
+                stale = set(source['files']) - set(files)
+                if stale:
+                    self.prune_project(slug, sorted(stale), remove_dir=False)
+                source['files'] = files
+                structural = True
+                logger.info(f"  {slug}: docs.yaml modificado, proyecto recopiado")
                 continue
 
-            config = self.read_project_config(project_dir)
-            if config:
-                project_slug = config['project']['slug']
-                self.copy_project_docs(config, project_dir, project_slug)
-                self.projects.append(config)
+            # Recopia del proyecto: la caché de páginas y la sincronización por hash
+            # limitan el trabajo a los archivos modificados
+            config = self._local_config(slug)
+            files = sorted(set(self.copy_project_files(config, source['dir'], slug)) | {"index.md"})
+            stale = set(source['files']) - set(files)
+            if stale:
+                self.prune_project(slug, sorted(stale), remove_dir=False)
+                structural = True
+            source['files'] = files
+            logger.info(f"  {slug}: {', '.join(sorted(rels))}")
+
+        self.collect_assets(self.asset_refs.values())
+        self.markdown_cache.save()
+
+        # El índice de páginas solo relee los archivos modificados
+        self.update_page_index()
+        if structural:
+            self.build_catalog()
+        self.generate_projects_index()
+        self.generate_page_reports()
+        if structural:
+            self.generate_mkdocs_config()
+
+        if self._watch_build(full=structural, changed={f"proyectos/{slug}" for slug in changes}):
+            logger.info(f"✅ Sitio actualizado en {time.monotonic() - start:.2f}s")
+
+    def _watch_build(self, full: bool, changed: set) -> bool:
+        """Build tras un cambio: --dirty si la navegación no cambió, completo si cambió"""
+        dirty = not full and self.search_index_path.exists()
+        previous_docs, previous_tags = [], None
+        if dirty:
+            previous_docs = json.loads(self.search_index_path.read_text(encoding='utf-8')).get('docs', [])
+            previous_tags = self._load_tag_mappings()
+
+        result = run_command(
+            ["mkdocs", "build", "--dirty"] if dirty else ["mkdocs", "build"],
+            cwd=self.output_dir / "docs",
+            timeout=self.build_timeout
+        )
+        if result.returncode != 0:
+            logger.error(f"Error al construir sitio: {result.stderr}")
+            return False
+
+        search_index_path = self.site_dir / "search" / "search_index.json"
+        if dirty:
+            self._merge_dirty_build(search_index_path, previous_docs, previous_tags, [])
+        self.build_search_shards(search_index_path, self._mkdocs_config_hash(), changed)
+        return True
+
+    def aggregate_from_branches(self, only: Optional[set] = None):
+        """Agregar documentación desde ramas de Git
 
-    def aggregate_from_branches(self):
-        """Agregar documentación desde ramas de Git"""
+        Con `only`, solo se obtienen esas ramas; el resto reutiliza su
+        entrada del manifiesto sin comprobar si cambió (modo daemon).
+        """
         logger.info("Agregando documentación desde ramas...")
 
+        previous_manifest = self.load_manifest()
         branches = self.find_project_branches()
 
-        for branch in branches:
-            temp_path = self.checkout_branch(branch)
-            if temp_path:
-                config = self.read_project_config(temp_path)
-                if config:
-                    project_slug = config['project']['slug']
-                    self.copy_project_docs(config, temp_path, project_slug)
-                    self.projects.append(config)
+        # El lector de objetos se usa siempre para validar docs.yaml sin clonar
+        self.object_reader = GitObjectReader(self.base_dir)
+        self.load_config_cache()
+
+        try:
+            if branches:
+                self._aggregate_branches(branches, previous_manifest, only)
+        finally:
+            self.object_reader.close()
+            self.object_reader = None
+        self.save_config_cache()
+
+        # Podar proyectos cuyas ramas ya no existen o que cambiaron de slug
+        produced = {entry.get('branch') for entry in self.manifest.values()}
+        for slug, entry in previous_manifest.items():
+            if slug in self.manifest:
+                continue
+            branch = entry.get('branch')
+            if branch in self.branch_shas and branch not in produced and self._serve_stale(slug, entry):
+                # La rama existe pero falló en esta ejecución: se sirve la última versión buena
+                continue
+            self.prune_project(slug, entry.get('files', []))
+
+        self.collect_assets(entry.get('assets', []) for entry in self.manifest.values())
+        self.save_manifest()
+
+    def _aggregate_branches(self, branches: List[str], previous_manifest: Dict[str, Dict[str, Any]],
+                            only: Optional[set] = None):
+        """Procesar las ramas indicadas con el pipeline de etapas"""
+        by_branch = {entry.get('branch'): entry for entry in previous_manifest.values()}
+
+        items = []
+        for index, branch in enumerate(branches):
+            item = {'index': index, 'label': branch, 'branch': branch}
+            entry = by_branch.get(branch)
+            if only is not None and branch not in only and entry is not None:
+                # Sin evento para esta rama: se mantiene tal cual
+                item['entry'] = entry
+                item['untouched'] = True
+            elif self._is_branch_unchanged(entry, self.branch_shas.get(branch), self.branch_trees.get(branch)):
+                # Mismo commit (o mismo árbol) que en la última ejecución: no se obtiene ni se copia
+                item['entry'] = dict(entry, sha=self.branch_shas[branch], tree=self.branch_trees[branch])
+                # Con otro commit, el índice del proyecto debe llevar su fecha
+                item['recommitted'] = entry['sha'] != self.branch_shas[branch]
+            items.append(item)
+
+        # Validar los docs.yaml de las ramas modificadas directamente desde la base de objetos
+        items = self.validate_project_configs(items, {
+            item['index']: GitTreePath(self.object_reader, f"origin/{item['branch']}")
+            for item in items if 'entry' not in item
+        })
+
+        for item in self._run_project_pipeline(iter(items)):
+            project_slug = item['slug']
+            self.projects.append(item['config'])
+
+            if 'entry' in item:
+                if not item.get('untouched'):
+                    logger.info(f"  Sin cambios: {item['branch']} ({item['entry']['sha'][:8]})")
+                self.manifest[project_slug] = item['entry']
+                if item.get('recommitted'):
+                    self.changed_slugs.add(project_slug)
+                continue
+
+            # Eliminar archivos que existían en la versión anterior del proyecto
+            previous = previous_manifest.get(project_slug, {})
+            stale = set(previous.get('files', [])) - set(item['files'])
+            if stale:
+                self.prune_project(project_slug, sorted(stale), remove_dir=False)
+
+            self.manifest[project_slug] = {
+                'branch': item['branch'],
+                'sha': self.branch_shas.get(item['branch']),
+                'tree': self.branch_trees.get(item['branch']),
+                'config_hash': item['config_hash'],
+                'files': item['files'],
+                'assets': self.asset_refs.get(project_slug, []),
+                'config': item['config']
+            }
+            self.changed_slugs.add(project_slug)
+
+    def _serve_stale(self, slug: str, entry: Dict[str, Any]) -> bool:
+        """Mantener la última versión agregada de un proyecto cuya actualización falló
+
+        El contenido anterior sigue en proyectos/<slug>; su índice se regenera
+        con un aviso de contenido desactualizado hasta la próxima actualización
+        correcta. Devuelve False si no hay una versión anterior completa.
+        """
+        project_dest = self.projects_dir / slug
+        if 'config' not in entry or not all((project_dest / rel).is_file() for rel in entry.get('files', [])):
+            logger.error(f"  {slug}: no hay una versión anterior completa que servir")
+            return False
+
+        logger.warning(f"  {slug}: se sirve la versión anterior ({entry['sha'][:8]}), marcada como desactualizada")
+        self.manifest[slug] = dict(entry, stale=True)
+        self.stale_slugs[slug] = entry
+        self.projects.append(entry['config'])
+        self.create_project_index(entry['config'], project_dest)
+        self.changed_slugs.add(slug)
+        return True
+
+    def _run_project_pipeline(self, items: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ejecutar fetch → parse → copy → páginas en streaming sobre los proyectos descubiertos
+
+        Devuelve los proyectos en el orden de descubrimiento, sin importar
+        qué worker termine antes. Si dos orígenes declaran el mismo slug,
+        gana el primero en ese orden.
+        """
+        self._slug_owners: Dict[str, int] = {}
+        self._slug_locks: Dict[str, threading.Lock] = {}
+        self._owners_lock = threading.Lock()
+
+        pipeline = (
+            StagePipeline(queue_size=2 * self.jobs)
+            .add_stage('fetch', self._stage_fetch, self.jobs)
+            .add_stage('parse', self._stage_parse, max(1, self.jobs // 2))
+            .add_stage('copy', self._stage_copy, self.jobs)
+            .add_stage('pages', self._stage_pages, 1)
+        )
+        results = sorted(pipeline.run(items, on_error=self._stage_error), key=lambda item: item['index'])
+
+        winners = []
+        for item in results:
+            owner = self._slug_owners.get(item['slug'])
+            if owner == item['index']:
+                winners.append(item)
+                continue
+
+            # Desplazado por un origen anterior con el mismo slug que terminó después
+            logger.warning(f"Slug '{item['slug']}' de {item['label']} ya definido por un origen anterior, se omite")
+            winner_files = next(
+                (w.get('files', []) for w in results if w['index'] == owner), []
+            )
+            extra = set(item.get('files', [])) - set(winner_files)
+            if extra:
+                self.prune_project(item['slug'], sorted(extra), remove_dir=False)
+
+        return winners
+
+    def _stage_fetch(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Etapa fetch: clonar la rama, abrir su árbol o comprobar el directorio local"""
+        if 'entry' in item:
+            return item
+
+        # El plazo del proyecto empieza al obtenerlo y cubre todos sus reintentos
+        item['deadline'] = time.monotonic() + self.project_deadline
+        with self.tracer.span('fetch', 'project', project=item['label']):
+            return self._fetch_source(item)
 
-                # Limpiar directorio temporal
-                shutil.rmtree(temp_path)
+    def _fetch_source(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if 'dir' in item:
+            if not item['dir'].exists():
+                logger.warning(f"Directorio no encontrado: {item['dir']}")
+                return None
+            item['source'] = item['dir']
+        elif self.reader == 'objects':
+            item['source'] = self.open_branch_tree(item['branch'])
+        else:
+            item['source'] = self.checkout_branch(item['branch'], deadline=item['deadline'])
+
+        return item if item['source'] is not None else None
+
+    def _stage_parse(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Etapa parse: leer y validar docs.yaml"""
+        if 'entry' in item:
+            item['config'] = item['entry']['config']
+            item['slug'] = item['config']['project']['slug']
+            return item
+
+        if 'config' not in item:
+            # Sin validación previa: parsear desde el origen ya obtenido
+            with self.tracer.span('parse', 'project', project=item['label']):
+                config, config_hash, errors = self.load_project_config(item['source'])
+            for error in errors:
+                logger.error(f"{item['label']}: {error}")
+            if config is None:
+                self._release_source(item)
+                return None
+            item['config'] = config
+            item['config_hash'] = config_hash
+
+        item['slug'] = item['config']['project']['slug']
+        return item
+
+    def _stage_copy(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Etapa copy: sincronizar secciones y assets en projects_dir"""
+        slug = item['slug']
+        if not self._claim_slug(slug, item['index']):
+            logger.warning(f"Slug '{slug}' de {item['label']} ya definido por un origen anterior, se omite")
+            self._release_source(item)
+            return None
+
+        if 'entry' in item:
+            return item
+
+        try:
+            # Un único escritor por slug a la vez
+            with self._slug_locks[slug]:
+                if self._slug_owners[slug] != item['index']:
+                    return None
+                with self.tracer.span('copy', 'project', project=item['label'], slug=slug) as span:
+                    written_before = self.synchronizer.thread_bytes()
+                    item['files'] = self.copy_project_files(item['config'], item['source'], slug)
+                    span['files'] = len(item['files'])
+                    span['bytes'] = self.synchronizer.thread_bytes() - written_before
+        finally:
+            self._release_source(item)
+        return item
+
+    def _stage_pages(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Etapa de páginas: generar el índice del proyecto"""
+        if 'entry' in item and not item.get('recommitted'):
+            return item
+
+        slug = item['slug']
+        if 'branch' in item:
+            self.source_dates[slug] = self.branch_dates.get(item['branch'])
+        elif self.reproducible:
+            self.source_dates[slug] = self._local_source_date(item['dir'])
+
+        with self._slug_locks[slug], self.tracer.span('pages', 'project', project=item['label']):
+            if self._slug_owners[slug] == item['index']:
+                self.create_project_index(item['config'], self.projects_dir / slug)
+        if 'entry' not in item:
+            item['files'] = sorted(set(item['files']) | {"index.md"})
+        return item
+
+    def _claim_slug(self, slug: str, index: int) -> bool:
+        """Reservar un slug para el origen con menor índice"""
+        with self._owners_lock:
+            owner = self._slug_owners.get(slug)
+            if owner is not None and owner < index:
+                return False
+            self._slug_owners[slug] = index
+            self._slug_locks.setdefault(slug, threading.Lock())
+            return True
+
+    def _stage_error(self, stage: str, item: Dict[str, Any], error: Exception):
+        logger.error(f"Error en la etapa {stage} de {item.get('label')}: {error}")
+        self._release_source(item)
+
+    def _is_branch_unchanged(self, entry: Optional[Dict[str, Any]], sha: Optional[str],
+                             tree: Optional[str] = None) -> bool:
+        """Comprobar si una rama sigue en el commit (o el árbol) registrado y su salida está intacta
+
+        Un commit nuevo con el mismo árbol (rebase, commit vacío) no cambia el contenido.
+        Los assets también cuentan como salida: si falta alguno en el almacén
+        (p. ej. una caché de CI sin docs/_assets), la rama se vuelve a agregar.
+        """
+        if self.force or entry is None or sha is None or entry.get('stale'):
+            return False
+        if entry.get('sha') != sha and (tree is None or entry.get('tree') != tree):
+            return False
+
+        project_dest = self.projects_dir / entry['config']['project']['slug']
+        return (
+            all((project_dest / rel).is_file() for rel in entry.get('files', []))
+            and all((self.asset_store.root / name).is_file() for name in entry.get('assets', []))
+        )
+
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Cargar el manifiesto de la ejecución anterior"""
+        if not self.manifest_path.exists():
+            return {}
+
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+            return data.get('projects', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifiesto ilegible, se reagregará todo: {e}")
+            return {}
+
+    def save_manifest(self):
+        """Guardar el manifiesto de forma atómica"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        data = {'version': 1, 'projects': self.manifest}
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(
+            json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False, default=str),
+            encoding='utf-8'
+        )
+        os.replace(tmp_path, self.manifest_path)
+
+    def prune_project(self, project_slug: str, files: List[str], remove_dir: bool = True,
+                      root: Optional[Path] = None):
+        """Eliminar archivos generados de un proyecto y los directorios que queden vacíos"""
+        project_dest = (root or self.projects_dir) / project_slug
+        if remove_dir:
+            logger.info(f"Podando proyecto eliminado: {project_slug}")
+            if root is None:
+                self.removed_slugs.add(project_slug)
+            else:
+                self.changed_external_slugs.add(project_slug)
+
+        for rel in files:
+            path = project_dest / rel
+            if path.is_file():
+                path.unlink()
+            if path.suffix.lower() == '.png':
+                for variant in path.parent.glob(f"{glob.escape(path.stem)}-*w{path.suffix}"):
+                    if IMAGE_VARIANT.match(variant.name):
+                        variant.unlink()
+
+            # Subir eliminando directorios vacíos hasta la raíz del proyecto
+            parent = path.parent
+            while parent != project_dest and parent.exists() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+
+        if remove_dir and project_dest.exists() and not any(project_dest.iterdir()):
+            project_dest.rmdir()
+
+    def _release_source(self, item: Dict[str, Any]):
+        """Limpiar el clon temporal de una rama (los árboles Git y los directorios locales se conservan)"""
+        source = item.pop('source', None)
+        if isinstance(source, Path) and 'branch' in item:
+            shutil.rmtree(source, ignore_errors=True)
+
+    def aggregate_from_external_repos(self, only: Optional[set] = None):
+        """Importar los repositorios de config/external_repos.yml en proyectos-externos/
+
+        Con `only`, solo se importan esos slugs (modo daemon), sin mirar update_schedule.
+        """
+        logger.info("Importando repositorios externos...")
+
+        repos = self.load_external_config()
+        previous_state = self._load_json_state(self.external_state_path)
+        state = {}
+        now = time.time()
+
+        due = []
+        for repo in repos:
+            slug = repo['slug']
+            entry = previous_state.get(slug)
+            if only is not None:
+                if slug in only:
+                    due.append(repo)
+            elif self._is_external_due(repo, entry, now):
+                due.append(repo)
+            else:
+                logger.info(f"  Sin importar (update_schedule={repo.get('update_schedule', 'always')}): {repo['name']}")
+
+        workers = max(1, min(self.jobs, len(due)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            imports = {repo['slug']: executor.submit(self._import_external_repo, repo, previous_state.get(repo['slug'])) for repo in due}
+
+            # Resultados en el orden del archivo de configuración
+            for repo in repos:
+                slug = repo['slug']
+                entry, changed = None, False
+                if slug in imports:
+                    try:
+                        entry, changed = imports[slug].result()
+                    except Exception as e:
+                        logger.error(f"Error al importar {repo['name']}: {e}")
+                if changed:
+                    self.changed_external_slugs.add(slug)
+                if entry is None:
+                    # No tocaba importar o la importación falló: se conserva lo anterior
+                    entry = previous_state.get(slug)
+                    if entry is None:
+                        continue
+                    if slug in imports:
+                        entry = self._serve_stale_external(entry)
+                state[slug] = entry
+                self.external_projects.append(entry)
+
+        for slug, entry in previous_state.items():
+            if slug not in state:
+                self.prune_project(slug, entry.get('files', []), root=self.external_dir)
+
+        self._save_json_state(self.external_state_path, state)
+        self.mirrors.evict([repo['url'] for repo in repos])
+        self.mirrors.save()
+
+    def _serve_stale_external(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Marcar como desactualizada la última importación de un repositorio externo que falló"""
+        dest = self.external_dir / entry['slug']
+        if not all((dest / rel).is_file() for rel in entry.get('files', [])):
+            return entry
+
+        logger.warning(f"  {entry['name']}: se sirve la importación anterior ({entry['sha'][:8]}), marcada como desactualizada")
+        entry = dict(entry, stale=True)
+        self.create_external_index(entry)
+        self.changed_external_slugs.add(entry['slug'])
+        return entry
+
+    def load_external_config(self) -> List[Dict[str, Any]]:
+        """Leer config/external_repos.yml y normalizar cada entrada"""
+        if not self.external_config.exists():
+            logger.warning(f"No se encontró {self.external_config}")
+            return []
+
+        data = yaml.load(self.external_config.read_text(encoding='utf-8'), Loader=YAML_LOADER) or {}
+        repos = []
+        for repo in data.get('repositories', []) or []:
+            if not all(key in repo for key in ('name', 'owner', 'repo')):
+                logger.error(f"Repositorio externo incompleto (name/owner/repo): {repo}")
+                continue
+            repo = dict(repo)
+            repo.setdefault('slug', re.sub(r'[^a-z0-9]+', '-', repo['name'].lower()).strip('-'))
+            repo.setdefault('branch', 'main')
+            repo.setdefault('url', self.external_url_template.format(owner=repo['owner'], repo=repo['repo']))
+            repos.append(repo)
+        return repos
+
+    def _is_external_due(self, repo: Dict[str, Any], entry: Optional[Dict[str, Any]], now: float) -> bool:
+        """Comprobar si la ventana de update_schedule del repositorio ha expirado"""
+        schedule = repo.get('update_schedule', 'always')
+        if schedule not in UPDATE_SCHEDULES:
+            logger.warning(f"update_schedule desconocido '{schedule}' en {repo['name']}, se usa 'always'")
+            schedule = 'always'
+
+        if self.force or entry is None:
+            return True
+
+        window = UPDATE_SCHEDULES[schedule]
+        if window is None:
+            return False
+        return now - entry.get('last_import', 0) >= window
+
+    def _import_external_repo(self, repo: Dict[str, Any],
+                              previous: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Actualizar el mirror de un repositorio externo e importar su documentación
+
+        Devuelve (entrada de estado, si cambió el contenido importado).
+        """
+        with self.tracer.span('external', 'project', project=repo['url']) as span:
+            written_before = self.synchronizer.thread_bytes()
+            try:
+                return self._update_external_repo(repo, previous)
+            finally:
+                span['bytes'] = self.synchronizer.thread_bytes() - written_before
+
+    def _update_external_repo(self, repo: Dict[str, Any],
+                              previous: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        logger.info(f"Actualizando {repo['name']} desde {repo['url']}...")
+
+        # Otra entrada con la misma URL no puede tocar el mirror hasta terminar la importación
+        with self.mirrors.lock(repo['url']):
+            return self._import_from_mirror(repo, previous)
+
+    def _import_from_mirror(self, repo: Dict[str, Any],
+                            previous: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        slug = repo['slug']
+        deadline = time.monotonic() + self.project_deadline
+        with self.tracer.span('git fetch', 'git', url=repo['url']):
+            sha = self.mirrors.fetch(repo['url'], repo['branch'], deadline=deadline)
+        if sha is None:
+            return None, False
+
+        dest = self.external_dir / slug
+        if (previous and previous.get('sha') == sha and not self.force and not previous.get('stale')
+                and all((dest / rel).is_file() for rel in previous.get('files', []))):
+            logger.info(f"  Sin cambios: {repo['name']} ({sha[:8]})")
+            return dict(previous, last_import=int(time.time())), False
+
+        # Extraer solo docs_dir/README/files directamente de la base de objetos del mirror
+        reader = GitObjectReader(self.mirrors.path_for(repo['url']))
+        try:
+            tree = GitTreePath(reader, f"refs/heads/{repo['branch']}")
+            return self._import_external_tree(repo, tree, sha, previous), True
+        finally:
+            reader.close()
+
+    def _import_external_tree(self, repo: Dict[str, Any], source, sha: str,
+                              previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Copiar al sitio las rutas que indica import_strategy y crear el índice del proyecto"""
+        slug = repo['slug']
+        dest = self.external_dir / slug
+        dest.mkdir(parents=True, exist_ok=True)
+
+        strategy = repo.get('import_strategy', 'full_docs')
+        if strategy == 'selective':
+            paths = list(repo.get('files', []))
+        elif strategy == 'full_docs' and (source / repo.get('docs_dir', 'docs')).is_dir():
+            paths = [repo.get('docs_dir', 'docs')]
+        else:
+            if strategy == 'full_docs':
+                logger.info(f"  {repo['name']} no tiene {repo.get('docs_dir', 'docs')}/, se importa el README")
+            paths = [name for name in ('README.md', 'readme.md', 'Readme.md') if (source / name).is_file()][:1]
+
+        written: List[Path] = []
+        for rel in paths:
+            item = source / rel
+            target = dest / Path(rel).name
+            if Path(rel).stem.upper() == 'README':
+                # MkDocs trata README.md como índice y chocaría con nuestro index.md
+                target = dest / "overview.md"
+            if item.is_dir():
+                written.extend(self.synchronizer.sync_dir(item, target))
+            elif item.is_file():
+                written.extend(self.synchronizer.sync_file(item, target))
+            else:
+                logger.warning(f"  Ruta no encontrada en {repo['name']}: {rel}")
+
+        pages = sorted(
+            path.relative_to(dest).as_posix() for path in written if path.suffix == '.md'
+        )
+        entry = {
+            'name': repo['name'],
+            'slug': slug,
+            'url': repo['url'],
+            'repository': f"https://github.com/{repo['owner']}/{repo['repo']}",
+            'branch': repo['branch'],
+            'sha': sha,
+            'last_import': int(time.time()),
+            'metadata': repo.get('metadata', {}),
+            'pages': pages,
+        }
+        self.create_external_index(entry)
+        entry['files'] = sorted({path.relative_to(dest).as_posix() for path in written} | {'index.md'})
+
+        # Eliminar lo que se importó la vez anterior y ya no existe
+        stale = set((previous or {}).get('files', [])) - set(entry['files'])
+        if stale:
+            self.prune_project(slug, sorted(stale), remove_dir=False, root=self.external_dir)
+
+        return entry
+
+    @staticmethod
+    def _stale_notice(entry: Optional[Dict[str, Any]]) -> str:
+        """Aviso para el índice de un proyecto servido con su última versión buena"""
+        if not entry:
+            return ""
+        return (
+            f"> ⚠️ **Contenido desactualizado:** la última actualización de este proyecto falló; "
+            f"se muestra la versión `{entry['sha'][:8]}`.\n\n"
+        )
+
+    def create_external_index(self, entry: Dict[str, Any]):
+        """Crear el índice de un proyecto externo"""
+        metadata = entry['metadata']
+        imported = datetime.fromtimestamp(entry['last_import'], tz=timezone.utc)
+
+        content = f"""# {entry['name']}
+
+{self._stale_notice(entry if entry.get('stale') else None)}**Descripción:** {metadata.get('description', 'Sin descripción')}
+
+**Estado:** {metadata.get('status', 'development')}
+
+**Repositorio:** [{entry['repository']}]({entry['repository']})
+
+"""
+        tags = metadata.get('tags', [])
+        if tags:
+            content += f"**Etiquetas:** {', '.join(str(tag) for tag in tags)}\n\n"
+
+        content += "## 📚 Documentación Importada\n\n"
+        for page in entry['pages']:
+            content += f"- [{page}](./{page})\n"
+
+        content += f"""
+
+---
+
+*Importado de `{entry['branch']}` ({entry['sha'][:8]}) el {imported.strftime('%Y-%m-%d %H:%M UTC')}*
+"""
+        write_text_if_changed(self.external_dir / entry['slug'] / "index.md", content)
+
+    def generate_external_index(self):
+        """Generar la página índice de proyectos externos"""
+        logger.info("Generando índice de proyectos externos...")
+
+        content = "# 🌐 Proyectos Externos\n\nDocumentación importada de otros repositorios.\n\n"
+        for category, entries in self._external_by_category().items():
+            content += f"## {category}\n\n"
+            for entry in entries:
+                description = entry['metadata'].get('description', 'Sin descripción')
+                content += f"- [{entry['name']}](./{entry['slug']}/index.md) — {description}\n"
+            content += "\n"
+
+        write_text_if_changed(self.external_dir / "index.md", content)
+
+    def generate_external_nav(self) -> List[Dict]:
+        """Generar navegación de proyectos externos"""
+        nav_items = [{'Índice': 'proyectos-externos/index.md'}]
+        for category, entries in self._external_by_category().items():
+            category_items = []
+            for entry in entries:
+                project_nav = [{'Resumen': f"proyectos-externos/{entry['slug']}/index.md"}]
+                for page in entry['pages']:
+                    # Páginas de primer nivel y el índice de cada directorio importado
+                    if '/' not in page:
+                        title = Path(page).stem.capitalize()
+                    elif page.count('/') == 1 and posixpath.basename(page) in ('index.md', 'README.md'):
+                        title = 'Documentación'
+                    else:
+                        continue
+                    project_nav.append({title: f"proyectos-externos/{entry['slug']}/{page}"})
+                category_items.append({entry['name']: project_nav})
+            nav_items.append({f"📁 {category}": category_items})
+        return nav_items
+
+    def _external_by_category(self) -> Dict[str, List[Dict[str, Any]]]:
+        categories = {}
+        for entry in sorted(self.external_projects, key=lambda e: (e['name'], e['slug'])):
+            categories.setdefault(entry['metadata'].get('category', 'General'), []).append(entry)
+        return dict(sorted(categories.items()))
+
+    @staticmethod
+    def _load_json_state(path: Path) -> Dict[str, Any]:
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except ValueError:
+            logger.warning(f"Estado ilegible en {path}, se ignora")
+            return {}
+
+    def _save_json_state(self, path: Path, data: Dict[str, Any]):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(
+            json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False, default=str),
+            encoding='utf-8'
+        )
+        os.replace(tmp_path, path)
 
     def generate_mkdocs_config(self):
         """Generar archivo mkdocs.yml actualizado"""
@@ -275,7 +3803,8 @@ class DocumentationAggregator:
                     'search.highlight',
                     'search.share'
                 ],
-                'language': 'es'
+                'language': 'es',
+                'custom_dir': 'overrides'
             },
             'plugins': [
                 'search',
@@ -289,77 +3818,196 @@ class DocumentationAggregator:
         }
 
         # Generar navegación
-        nav = [
-            {'🏠 Inicio': 'index.md'},
-            {'📚 Proyectos': self.generate_projects_nav()},
-            {'📖 Guías MkDocs': [
-                {'About MkDocs': 'about-mkdocs.md'}
-            ]}
-        ]
+        nav = [{'🏠 Inicio': 'index.md'}]
+        if self.projects:
+            nav.append({'📚 Proyectos': self.generate_projects_nav()})
+        if self.external_projects:
+            nav.append({'🌐 Proyectos Externos': self.generate_external_nav()})
+        nav.append({'📖 Guías MkDocs': [
+            {'About MkDocs': 'about-mkdocs.md'}
+        ]})
 
         mkdocs_config['nav'] = nav
+        self.nav = nav
+
+        # Worker de búsqueda por fragmentos (ver build_search_shards). Va junto a
+        # los workers de Material: el suyo carga lunr desde ../lunr
+        overrides_dir = self.output_dir / "docs" / "overrides"
+        overrides_dir.mkdir(parents=True, exist_ok=True)
+        write_text_if_changed(overrides_dir / "main.html", SEARCH_LOADER_TEMPLATE)
+        scripts_dir = self.docs_dir / "assets" / "javascripts"
+        (scripts_dir / "workers").mkdir(parents=True, exist_ok=True)
+        write_text_if_changed(scripts_dir / "workers" / "search-shards.js", SEARCH_WORKER_JS)
+        (scripts_dir / "search-shards.js").unlink(missing_ok=True)
 
         # Guardar configuración
         config_path = self.output_dir / "docs" / "mkdocs.yml"
-        with open(config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(mkdocs_config, f, allow_unicode=True, default_flow_style=False)
+        content = yaml.dump(
+            mkdocs_config,
+            allow_unicode=True,
+            default_flow_style=False,
+            sort_keys=True,
+            width=120
+        )
+        write_text_if_changed(config_path, content)
 
         logger.info(f"Configuración guardada en {config_path}")
 
-    def generate_projects_nav(self) -> List[Dict]:
-        """Generar navegación de proyectos"""
-        nav_items = [{'Índice de Proyectos': 'proyectos/index.md'}]
-
-        # Ordenar proyectos por prioridad y nombre
-        sorted_projects = sorted(
-            self.projects,
-            key=lambda p: (
-                -p.get('aggregator', {}).get('priority', 50),
-                p['project']['name']
-            )
+    def optimize_images(self):
+        """Recomprimir las imágenes de los proyectos y del almacén de assets"""
+        logger.info("Optimizando imágenes...")
+        optimizer = self.image_optimizer
+        optimizer.optimize([self.projects_dir, self.asset_store.root])
+
+        stats = optimizer.stats
+        logger.info(
+            f"Imágenes: {stats['images']} revisadas ({stats['processed']} procesadas, "
+            f"{stats['cached']} desde caché), {stats['bytes_saved']} bytes ahorrados"
         )
 
-        # Agrupar por categoría
-        categories = {}
-        for project in sorted_projects:
-            category = project.get('aggregator', {}).get('category', 'General')
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(project)
-
-        # Generar navegación por categoría
-        for category, projects in categories.items():
-            category_items = []
-            for project in projects:
-                project_info = project['project']
-                slug = project_info['slug']
-                name = project_info['name']
-                status_emoji = {
-                    'production': '✅',
-                    'beta': '🔵',
-                    'development': '🟡',
-                    'deprecated': '⚫'
-                }.get(project_info.get('status', 'development'), '⚪')
-
-                # Navegación del proyecto
-                project_nav = {
-                    f"{status_emoji} {name}": [
-                        {'Resumen': f'proyectos/{slug}/index.md'}
-                    ]
+    def serve(self, mode: str, address: str = DAEMON_ADDRESS, debounce: float = 5.0,
+              publish_dir: Optional[Path] = None, publish_branch: Optional[str] = None):
+        """Modo daemon: atender eventos de actualización tras la agregación inicial
+
+        Los eventos llegan por HTTP (ver EventRequestHandler y --send-event) y
+        se agrupan por proyecto con UpdateEvents. Cada lote obtiene solo las
+        ramas o repositorios afectados; el resto del sitio, las
+        configuraciones parseadas y el catálogo se mantienen en memoria, y el
+        build es incremental.
+        """
+        if mode == 'local':
+            logger.error("El modo daemon no está disponible con --mode local (usa --watch)")
+            return
+
+        events = UpdateEvents(debounce, max_delay=debounce * 10)
+        server = ThreadingHTTPServer(parse_address(address), EventRequestHandler)
+        server.daemon_threads = True
+        server.events = events
+        server.status = {'updates': 0, 'failures': 0, 'last_update': None}
+        threading.Thread(target=server.serve_forever, name='daemon-http', daemon=True).start()
+
+        # Tras la agregación inicial, cada lote solo reconstruye lo modificado
+        self.force = False
+        self.incremental = True
+        self.tracer.reset()
+        logger.info(f"Daemon escuchando en http://{address}/events (Ctrl+C para salir)...")
+        try:
+            while True:
+                keys = events.take()
+                if not keys:
+                    continue
+                start = time.monotonic()
+                try:
+                    with self.tracer.span('update', events=keys):
+                        self.process_events(keys, mode, publish_dir, publish_branch)
+                    server.status['updates'] += 1
+                except Exception as e:
+                    logger.exception(f"Error al procesar {', '.join(keys)}: {e}")
+                    server.status['failures'] += 1
+                finally:
+                    self.tracer.finish()
+                    self.tracer.reset()
+                server.status['last_update'] = {
+                    'events': keys,
+                    'seconds': round(time.monotonic() - start, 3),
+                    'finished': datetime.now(timezone.utc).isoformat(),
                 }
+        except KeyboardInterrupt:
+            logger.info("Daemon detenido")
+        finally:
+            server.shutdown()
+            server.server_close()
 
-                # Agregar secciones del proyecto
-                for item in project.get('documentation', {}).get('structure', []):
-                    if item.get('type') == 'directory':
-                        project_nav[f"{status_emoji} {name}"].append({
-                            item['title']: f"proyectos/{slug}/{Path(item['source']).name}/index.md"
-                        })
-                    else:
-                        project_nav[f"{status_emoji} {name}"].append({
-                            item['title']: f"proyectos/{slug}/{Path(item['source']).name}"
-                        })
+    def process_events(self, keys: List[str], mode: str,
+                       publish_dir: Optional[Path] = None, publish_branch: Optional[str] = None):
+        """Reagregar solo las ramas y repositorios externos de un lote de eventos y reconstruir"""
+        full = 'all' in keys
+        branches, externals = set(), set()
+        for key in keys:
+            kind, _, value = key.partition(':')
+            if kind == 'branch':
+                branches.add(value)
+            elif kind == 'slug':
+                entry = self.manifest.get(value)
+                if entry is None:
+                    logger.warning(f"Evento para un slug desconocido: {value}")
+                else:
+                    branches.add(entry['branch'])
+            elif kind == 'external':
+                externals.add(value)
+        logger.info(f"Procesando eventos: {', '.join(keys)}")
+
+        self.changed_slugs.clear()
+        self.removed_slugs.clear()
+        self.changed_external_slugs.clear()
+
+        if mode in ('branches', 'all') and (full or branches):
+            self.fetch_project_branches()
+            self.projects = []
+            self.manifest = {}
+            self.stale_slugs = {}
+            self.aggregate_from_branches(None if full else branches)
+
+        if mode in ('external', 'all') and (full or externals):
+            self.external_projects = []
+            self.aggregate_from_external_repos(None if full else externals)
+
+        if not (self.changed_slugs or self.removed_slugs or self.changed_external_slugs):
+            logger.info("Sin cambios que reconstruir")
+            return
+        self._build_phases(publish_dir, publish_branch)
+
+    def fetch_project_branches(self) -> bool:
+        """Actualizar las ramas origin/docs/* del repositorio base
+
+        Con el lector clone también se actualizan las ramas locales docs/*,
+        que son las que clona checkout_branch.
+        """
+        refspecs = [["--prune", "+refs/heads/docs/*:refs/remotes/origin/docs/*"]]
+        if self.reader == 'clone':
+            refspecs.append(["+refs/heads/docs/*:refs/heads/docs/*"])
+
+        for refspec in refspecs:
+            result = run_command(
+                ["git", "fetch", "--quiet", "origin"] + refspec,
+                cwd=self.base_dir,
+                timeout=self.git_timeout,
+                retries=self.retries
+            )
+            if result.returncode != 0:
+                logger.error(f"Error al actualizar las ramas de documentación: {result.stderr}")
+                return False
+
+        self.branch_shas.clear()
+        self.branch_trees.clear()
+        self.branch_dates.clear()
+        return True
+
+    def build_catalog(self) -> ProjectCatalog:
+        """Construir el catálogo de proyectos y guardarlo en proyectos/catalog.json"""
+        self.catalog = ProjectCatalog.from_projects(self.projects)
+        if self.projects:
+            self.catalog.save(self.projects_dir / "catalog.json")
+        return self.catalog
+
+    def generate_projects_nav(self) -> List[Dict]:
+        """Generar navegación de proyectos"""
+        catalog = self.catalog or self.build_catalog()
+        nav_items = [
+            {'Índice de Proyectos': 'proyectos/index.md'},
+            {'Etiquetas': 'proyectos/etiquetas.md'},
+            {'Cambios Recientes': 'proyectos/recientes.md'},
+        ]
 
-                category_items.append(project_nav)
+        # Categorías en orden de su proyecto más prioritario
+        for category, entries in catalog.by_category.items():
+            category_items = []
+            for entry in entries:
+                title = f"{STATUS_EMOJI.get(entry.status, '⚪')} {entry.name}"
+                sections = [{'Resumen': f'proyectos/{entry.slug}/index.md'}]
+                for section in entry.sections:
+                    sections.append({section.title: f"proyectos/{entry.slug}/{section.nav_target}"})
+                category_items.append({title: sections})
 
             nav_items.append({f"📁 {category}": category_items})
 
@@ -381,92 +4029,128 @@ Utiliza la barra de búsqueda superior para encontrar información específica e
 
 """
 
-        # Estadísticas
-        total_projects = len(self.projects)
-        by_status = {}
-        by_category = {}
-
-        for project in self.projects:
-            status = project['project'].get('status', 'development')
-            category = project.get('aggregator', {}).get('category', 'General')
+        catalog = self.catalog or self.build_catalog()
 
-            by_status[status] = by_status.get(status, 0) + 1
-            by_category[category] = by_category.get(category, 0) + 1
-
-        index_content += f"- **Total de Proyectos:** {total_projects}\n"
+        # Estadísticas
+        index_content += f"- **Total de Proyectos:** {len(catalog)}\n"
         index_content += f"- **Por Estado:** "
-        index_content += ", ".join([f"{k}: {v}" for k, v in by_status.items()])
+        index_content += ", ".join([f"{k}: {len(v)}" for k, v in sorted(catalog.by_status.items())])
         index_content += "\n"
         index_content += f"- **Por Categoría:** "
-        index_content += ", ".join([f"{k}: {v}" for k, v in by_category.items()])
-        index_content += "\n\n"
+        index_content += ", ".join([f"{k}: {len(v)}" for k, v in sorted(catalog.by_category.items())])
+        index_content += "\n"
+        page_stats = self.page_index.project_stats() if self.page_index else {}
+        if page_stats:
+            pages = sum(count for count, words in page_stats.values())
+            words = sum(words for count, words in page_stats.values())
+            index_content += f"- **Páginas:** {pages} ({words} palabras)\n"
+        index_content += "\n"
 
         # Proyectos destacados
-        featured = [p for p in self.projects if p.get('aggregator', {}).get('featured', False)]
-        if featured:
+        if catalog.featured:
             index_content += "## ⭐ Proyectos Destacados\n\n"
-            for project in featured:
-                info = project['project']
-                index_content += f"### [{info['name']}](./{info['slug']}/index.md)\n"
-                index_content += f"{info.get('description', 'Sin descripción')}\n\n"
-                index_content += f"- **Estado:** {info.get('status', 'development')}\n"
-                index_content += f"- **Versión:** {info.get('version', '0.0.0')}\n"
-                index_content += f"- **[Ver Documentación →](./{info['slug']}/index.md)**\n\n"
+            for entry in catalog.featured:
+                index_content += f"### [{entry.name}](./{entry.slug}/index.md)\n"
+                index_content += f"{entry.description or 'Sin descripción'}\n\n"
+                index_content += f"- **Estado:** {entry.status}\n"
+                index_content += f"- **Versión:** {entry.version}\n"
+                index_content += f"- **[Ver Documentación →](./{entry.slug}/index.md)**\n\n"
 
         # Lista completa por categoría
         index_content += "## 📂 Todos los Proyectos\n\n"
 
-        # Agrupar por categoría
-        categories = {}
-        for project in self.projects:
-            category = project.get('aggregator', {}).get('category', 'General')
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(project)
-
-        for category in sorted(categories.keys()):
+        for category in sorted(catalog.by_category):
             index_content += f"### {category}\n\n"
 
-            for project in sorted(categories[category], key=lambda p: p['project']['name']):
-                info = project['project']
-                status_badge = {
-                    'production': '![Production](https://img.shields.io/badge/Production-green)',
-                    'beta': '![Beta](https://img.shields.io/badge/Beta-blue)',
-                    'development': '![Development](https://img.shields.io/badge/Development-yellow)',
-                    'deprecated': '![Deprecated](https://img.shields.io/badge/Deprecated-red)'
-                }.get(info.get('status', 'development'), '')
-
-                index_content += f"#### [{info['name']}](./{info['slug']}/index.md) {status_badge}\n\n"
-                index_content += f"{info.get('description', 'Sin descripción')}\n\n"
-
-                # Tecnologías
-                techs = info.get('technologies', [])
-                if techs:
-                    tech_list = []
-                    for tech in techs[:5]:  # Limitar a 5 tecnologías
-                        if isinstance(tech, dict):
-                            tech_list.append(tech.get('name', 'Unknown'))
-                        else:
-                            tech_list.append(str(tech))
+            for entry in sorted(catalog.by_category[category], key=lambda e: (e.name, e.slug)):
+                status_badge = STATUS_BADGES.get(entry.status, '')
+
+                index_content += f"#### [{entry.name}](./{entry.slug}/index.md) {status_badge}\n\n"
+                index_content += f"{entry.description or 'Sin descripción'}\n\n"
+
+                # Tecnologías (máximo 5)
+                if entry.technologies:
+                    tech_list = [name for name, version in entry.technologies[:5]]
                     index_content += f"**Tecnologías:** {', '.join(tech_list)}\n\n"
 
-                index_content += f"[📖 Ver Documentación](./{info['slug']}/index.md) | "
-                index_content += f"[🔗 Repositorio]({info.get('repository', '#')})\n\n"
+                if f"proyectos/{entry.slug}" in page_stats:
+                    pages, words = page_stats[f"proyectos/{entry.slug}"]
+                    index_content += f"**Páginas:** {pages} · **Palabras:** {words}\n\n"
+
+                index_content += f"[📖 Ver Documentación](./{entry.slug}/index.md) | "
+                index_content += f"[🔗 Repositorio]({entry.repository or '#'})\n\n"
                 index_content += "---\n\n"
 
         # Guardar archivo
         index_file = self.projects_dir / "index.md"
-        index_file.write_text(index_content, encoding='utf-8')
+        write_text_if_changed(index_file, index_content)
         logger.info(f"Índice guardado en {index_file}")
 
+    def update_page_index(self) -> PageIndex:
+        """Actualizar el índice SQLite de páginas con el contenido actual de docs/"""
+        if self.page_index is None:
+            self.page_index = PageIndex(self.page_index_path, self.docs_dir)
+
+        sources: Dict[str, Tuple[Optional[str], Optional[int]]] = {}
+        for config in self.projects:
+            slug = config['project']['slug']
+            entry = self.manifest.get(slug, {})
+            date = self.branch_dates.get(entry.get('branch')) or self.source_dates.get(slug)
+            sources[f"proyectos/{slug}"] = (entry.get('sha'), date)
+        for entry in self.external_projects:
+            sources[f"proyectos-externos/{entry['slug']}"] = (entry.get('sha'), entry.get('last_import'))
+
+        now = int(os.environ.get('SOURCE_DATE_EPOCH', 0)) if self.reproducible else int(time.time())
+        stats = self.page_index.update(sources, now, follow_sources=self.reproducible)
+        logger.info(
+            f"Índice de páginas: {stats['updated']} actualizadas, {stats['touched']} sin cambios de contenido, "
+            f"{stats['unchanged']} sin cambios, {stats['removed']} eliminadas"
+        )
+        return self.page_index
+
+    def generate_page_reports(self):
+        """Generar las páginas de etiquetas y de cambios recientes a partir del índice de páginas"""
+        page_index = self.page_index or self.update_page_index()
+
+        def link(path: str) -> str:
+            return posixpath.relpath(path, 'proyectos')
+
+        projects = {f"proyectos/{config['project']['slug']}": config['project']['name'] for config in self.projects}
+        projects.update({f"proyectos-externos/{entry['slug']}": entry['name'] for entry in self.external_projects})
+
+        content = "# 🏷️ Etiquetas\n\nPáginas de la documentación agrupadas por etiqueta.\n\n"
+        tagged = page_index.pages_by_tag()
+        if not tagged:
+            content += "_No hay páginas etiquetadas._\n"
+        for tag, pages in tagged.items():
+            content += f"## {tag}\n\n"
+            by_project: Dict[str, List[Tuple[str, str]]] = {}
+            for path, title, project in pages:
+                by_project.setdefault(project, []).append((path, title))
+            for project, project_pages in by_project.items():
+                name = projects.get(project, project.split('/')[-1])
+                links = ", ".join(f"[{title}]({link(path)})" for path, title in project_pages)
+                content += f"- **{name}:** {links}\n"
+            content += "\n"
+        write_text_if_changed(self.projects_dir / "etiquetas.md", content)
+
+        content = "# 🕒 Cambios Recientes\n\nÚltimas páginas modificadas en la documentación.\n\n"
+        content += "| Página | Proyecto | Fecha |\n|--------|----------|-------|\n"
+        for path, title, project, changed_at in page_index.recent(RECENT_PAGES):
+            name = projects.get(project, project.split('/')[-1])
+            date = datetime.fromtimestamp(changed_at, tz=timezone.utc).strftime('%Y-%m-%d')
+            content += f"| [{title}]({link(path)}) | {name} | {date} |\n"
+        write_text_if_changed(self.projects_dir / "recientes.md", content)
+
     def validate_documentation(self):
         """Validar la documentación agregada"""
         logger.info("Validando documentación agregada...")
 
         issues = []
 
-        for project in self.projects:
-            project_slug = project['project']['slug']
+        catalog = self.catalog or self.build_catalog()
+        for entry in catalog:
+            project_slug = entry.slug
             project_dir = self.projects_dir / project_slug
 
             # Verificar que existe el directorio del proyecto
@@ -480,6 +4164,20 @@ Utiliza la barra de búsqueda superior para encontrar información específica e
                 if not (project_dir / req_file).exists():
                     issues.append(f"Archivo requerido {req_file} no encontrado en {project_slug}")
 
+        for entry in self.external_projects:
+            if not (self.external_dir / entry['slug'] / "index.md").exists():
+                issues.append(f"Archivo requerido index.md no encontrado en el proyecto externo {entry['slug']}")
+
+        # Enlaces, imágenes, anclas y navegación contra el índice de páginas
+        errors, warnings = LinkChecker(self.docs_dir, self.jobs).check(self.nav)
+        for group in sorted(set(errors) | set(warnings)):
+            group_errors = errors.get(group, [])
+            group_warnings = warnings.get(group, [])
+            logger.info(f"  {group}: {len(group_errors)} enlaces rotos, {len(group_warnings)} avisos")
+            for warning in group_warnings:
+                logger.warning(f"    {warning}")
+            issues.extend(group_errors)
+
         if issues:
             logger.warning("Problemas encontrados durante la validación:")
             for issue in issues:
@@ -493,52 +4191,674 @@ Utiliza la barra de búsqueda superior para encontrar información específica e
         """Construir el sitio MkDocs"""
         logger.info("Construyendo sitio MkDocs...")
 
-        result = subprocess.run(
-            ["mkdocs", "build", "--strict"],
-            capture_output=True,
-            text=True,
-            cwd=self.output_dir / "docs"
+        config_hash = self._mkdocs_config_hash()
+        build_state = self._load_build_state()
+        pending = sorted(
+            [f"proyectos/{slug}" for slug in self.changed_slugs | self.removed_slugs]
+            + [f"proyectos-externos/{slug}" for slug in self.changed_external_slugs]
         )
+        search_index_path = self.site_dir / "search" / "search_index.json"
 
-        if result.returncode == 0:
-            logger.info("✅ Sitio construido exitosamente")
-            return True
-        else:
+        sharded = self.sharded_build
+        if sharded and self._has_tag_listings():
+            # Un listado de etiquetas necesita las páginas de todos los sub-sitios
+            logger.warning("Hay páginas con listados de etiquetas (<!-- material/tags -->): build único en lugar de sub-sitios")
+            sharded = False
+
+        if sharded:
+            return self._finish_build(self.build_sharded_site(config_hash, build_state), config_hash)
+
+        incremental = (
+            self.incremental
+            and build_state.get('config_hash') == config_hash
+            and self.search_index_path.exists()
+        )
+
+        command = ["mkdocs", "build", "--strict"]
+        previous_docs, previous_tags = [], None
+        if incremental:
+            logger.info(f"Build incremental: {len(pending)} proyectos modificados")
+            previous_docs = json.loads(self.search_index_path.read_text(encoding='utf-8')).get('docs', [])
+            previous_tags = self._load_tag_mappings()
+
+            # Eliminar la salida de los proyectos modificados para que MkDocs
+            # regenere todas sus páginas; el resto se reutiliza con --dirty
+            for prefix in pending:
+                shutil.rmtree(self.site_dir / prefix, ignore_errors=True)
+
+            # MkDocs emite siempre un aviso con --dirty, incompatible con --strict;
+            # la validación estricta queda para los builds completos
+            command = ["mkdocs", "build", "--dirty"]
+        elif self.incremental:
+            logger.info("La configuración o la navegación cambió: build completo")
+
+        with self.tracer.span('mkdocs build', 'build', incremental=incremental):
+            result = run_command(command, cwd=self.output_dir / "docs", timeout=self.build_timeout)
+
+        if result.returncode != 0:
             logger.error(f"Error al construir sitio: {result.stderr}")
+            return self._finish_build(None, config_hash)
+
+        if incremental:
+            with self.tracer.span('merge search index', 'build'):
+                self._merge_dirty_build(search_index_path, previous_docs, previous_tags, pending)
+        return self._finish_build({}, config_hash)
+
+    def _mkdocs_config_hash(self) -> str:
+        return hashlib.sha256((self.output_dir / "docs" / "mkdocs.yml").read_bytes()).hexdigest()
+
+    def _finish_build(self, state: Optional[Dict[str, Any]], config_hash: str) -> bool:
+        """Fragmentar la búsqueda y guardar el estado del build (None: el build falló)"""
+        if state is None:
+            # Tras un fallo, site/ queda en un estado desconocido: el próximo build será completo
+            self._save_build_state({'config_hash': None})
+            return False
+
+        with self.tracer.span('search shards', 'build'):
+            self.build_search_shards(self.site_dir / "search" / "search_index.json", config_hash)
+        self._save_build_state(dict(state, config_hash=config_hash))
+        logger.info("✅ Sitio construido exitosamente")
+        return True
+
+    def build_sharded_site(self, config_hash: str, build_state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Construir el sitio como sub-sitios por categoría en paralelo y unirlos en site/
+
+        Cada sub-sitio es un `mkdocs build` del árbol completo con la misma
+        navegación, pero con exclude_docs limitado a sus páginas: MkDocs
+        resuelve los enlaces y la navegación hacia páginas excluidas con su
+        URL final, así que el resultado unido equivale a un build único. Solo
+        se reconstruyen los sub-sitios con proyectos modificados (el núcleo,
+        con las páginas generales, siempre). Devuelve el estado del build o
+        None si algún sub-sitio falla.
+        """
+        shards = self._build_shard_plan()
+        previous = build_state.get('shards', {}) if build_state.get('config_hash') == config_hash else {}
+        changed = (
+            {f"proyectos/{slug}/" for slug in self.changed_slugs | self.removed_slugs}
+            | ({"proyectos-externos/"} if self.changed_external_slugs else set())
+        )
+
+        pending = [
+            shard_id for shard_id, prefixes in shards.items()
+            if shard_id == 'core'
+            or previous.get(shard_id) != prefixes
+            or changed & set(prefixes)
+            or not (self.build_shards_dir / shard_id / "site").is_dir()
+        ]
+        logger.info(f"Build por sub-sitios: {len(pending)} de {len(shards)} a reconstruir con {self.jobs} procesos")
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            results = dict(zip(pending, executor.map(
+                lambda shard_id: self._build_shard(shard_id, shards), pending
+            )))
+
+        failed = [shard_id for shard_id, ok in results.items() if not ok]
+        if failed:
+            logger.error(f"Error al construir los sub-sitios: {', '.join(failed)}")
+            return None
+
+        with self.tracer.span('stitch site', 'build', shards=len(shards)):
+            self._stitch_shards(shards)
+
+        # Eliminar sub-sitios de categorías que ya no existen
+        if self.build_shards_dir.is_dir():
+            for path in self.build_shards_dir.iterdir():
+                if path.name not in shards:
+                    shutil.rmtree(path, ignore_errors=True)
+
+        return {'shards': shards}
+
+    def _build_shard_plan(self) -> Dict[str, List[str]]:
+        """Sub-sitios y los prefijos de ruta que aporta cada uno ('core' aporta el resto)"""
+        shards: Dict[str, List[str]] = {'core': []}
+        catalog = self.catalog or self.build_catalog()
+        for position, category in enumerate(sorted(catalog.by_category)):
+            name = re.sub(r'[^a-z0-9]+', '-', category.lower()).strip('-') or 'general'
+            shards[f"cat-{position:03d}-{name}"] = sorted(
+                f"proyectos/{entry.slug}/" for entry in catalog.by_category[category]
+            )
+        if self.external_projects:
+            shards['externos'] = ["proyectos-externos/"]
+        return shards
+
+    def _build_shard(self, shard_id: str, shards: Dict[str, List[str]]) -> bool:
+        """Ejecutar `mkdocs build` de un sub-sitio con exclude_docs limitado a sus páginas"""
+        if shard_id == 'core':
+            exclude = [f"/{prefix}" for other in shards.values() for prefix in other]
+            exclude = ["/proyectos/*/" if prefix.startswith("/proyectos/") else prefix for prefix in exclude]
+            exclude = sorted(set(exclude))
+        else:
+            exclude = ["/*"]
+            for prefix in shards[shard_id]:
+                parts = prefix.strip('/').split('/')
+                for depth in range(1, len(parts)):
+                    parent = '/'.join(parts[:depth])
+                    exclude += [f"!/{parent}/", f"/{parent}/*"]
+                exclude.append(f"!/{prefix}")
+            exclude = list(dict.fromkeys(exclude))
+
+        docs_root = self.output_dir / "docs"
+        config_path = docs_root / f".shard-{shard_id}.yml"
+        config_path.write_text(yaml.dump({
+            'INHERIT': 'mkdocs.yml',
+            'site_dir': str((self.build_shards_dir / shard_id / "site").resolve()),
+            'exclude_docs': "\n".join(exclude) + "\n",
+        }, allow_unicode=True, sort_keys=True), encoding='utf-8')
+
+        try:
+            with self.tracer.span(f"mkdocs build {shard_id}", 'build', shard=shard_id):
+                result = run_command(
+                    ["mkdocs", "build", "--strict", "-f", config_path.name],
+                    cwd=docs_root,
+                    timeout=self.build_timeout
+                )
+        finally:
+            config_path.unlink(missing_ok=True)
+
+        if result.returncode != 0:
+            logger.error(f"Error al construir el sub-sitio {shard_id}: {result.stderr}")
+            return False
+        logger.info(f"  Sub-sitio construido: {shard_id}")
+        return True
+
+    def _has_tag_listings(self) -> bool:
+        """Comprobar si alguna página incluye un listado de etiquetas del plugin tags"""
+        for page in self.docs_dir.rglob('*.md'):
+            with page.open(encoding='utf-8', errors='replace') as f:
+                if any(TAGS_LISTING.search(line) for line in f):
+                    return True
+        return False
+
+    def _page_url_order(self) -> Dict[str, int]:
+        """Posición de cada URL de página en el orden en que MkDocs recorre docs/"""
+        order: Dict[str, int] = {}
+        for root, dirs, files in os.walk(self.docs_dir, followlinks=True):
+            dirs.sort()
+            files.sort(key=lambda name: (os.path.splitext(name)[0] not in ('index', 'README'), name))
+            for name in files:
+                if not name.endswith('.md'):
+                    continue
+                rel = Path(root, name).relative_to(self.docs_dir).with_suffix('').as_posix()
+                parent, _, stem = rel.rpartition('/')
+                url = (f"{parent}/" if parent else "") if stem in ('index', 'README') else f"{rel}/"
+                order.setdefault(url, len(order))
+        return order
+
+    def _write_tags_export(self, mappings: List[Dict[str, Any]]) -> Path:
+        """Escribir tags.json en el orden de páginas de un build único (mismo formato que el plugin)"""
+        order = self._page_url_order()
+        mappings = sorted(mappings, key=lambda mapping: order.get(mapping['item']['url'], len(order)))
+        tags_path = self.site_dir / TAGS_EXPORT
+        write_text_if_changed(tags_path, json.dumps({'mappings': mappings}))
+        return tags_path
+
+    def _stitch_shards(self, shards: Dict[str, List[str]]):
+        """Unir los sub-sitios en site/ con índice de búsqueda, sitemap y etiquetas combinados"""
+        self.site_dir.mkdir(parents=True, exist_ok=True)
+        keep = set()
+        search = {'config': {}, 'docs': []}
+        sitemap_urls: Dict[str, str] = {}
+        tag_mappings: List[Dict[str, Any]] = []
+
+        for shard_id, prefixes in shards.items():
+            shard_site = self.build_shards_dir / shard_id / "site"
+            owned = tuple(prefixes)
+            others = tuple(prefix for other in shards.values() for prefix in other)
+
+            def belongs(rel: str) -> bool:
+                return rel.startswith(owned) if owned else not rel.startswith(others)
+
+            for path in sorted(shard_site.rglob('*')):
+                rel = path.relative_to(shard_site).as_posix()
+                if path.is_file() and belongs(rel) and not rel.startswith(('search/', 'sitemap.xml')) and rel != TAGS_EXPORT:
+                    keep.update(self.synchronizer.sync_file(path, self.site_dir / rel))
+
+            index_path = shard_site / "search" / "search_index.json"
+            if index_path.exists():
+                index = json.loads(index_path.read_text(encoding='utf-8'))
+                if shard_id == 'core':
+                    search['config'] = index.get('config', {})
+                search['docs'].extend(doc for doc in index.get('docs', []) if belongs(doc['location']))
+
+            sitemap_path = shard_site / "sitemap.xml"
+            if sitemap_path.exists():
+                for block in re.findall(r'<url>.*?</url>', sitemap_path.read_text(encoding='utf-8'), re.S):
+                    loc = re.search(r'<loc>(.*?)</loc>', block)
+                    if loc and loc.group(1) not in sitemap_urls:
+                        sitemap_urls[loc.group(1)] = block
+
+            # Cada sub-sitio solo exporta las etiquetas de sus propias páginas
+            tags_path = shard_site / TAGS_EXPORT
+            if tags_path.exists():
+                mappings = json.loads(tags_path.read_text(encoding='utf-8')).get('mappings', [])
+                tag_mappings.extend(mapping for mapping in mappings if belongs(mapping['item']['url']))
+
+        search_path = self.site_dir / "search" / "search_index.json"
+        search_path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_if_changed(search_path, json.dumps(search, ensure_ascii=False))
+        keep.add(search_path)
+
+        sitemap = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            + "".join(f"    {sitemap_urls[loc].strip()}\n" for loc in sorted(sitemap_urls))
+            + '</urlset>\n'
+        )
+        sitemap_path = self.site_dir / "sitemap.xml"
+        if write_text_if_changed(sitemap_path, sitemap) or not sitemap_path.with_suffix('.xml.gz').exists():
+            sitemap_path.with_suffix('.xml.gz').write_bytes(gzip.compress(sitemap.encode('utf-8'), 9, mtime=0))
+        keep.update({sitemap_path, sitemap_path.with_suffix('.xml.gz')})
+
+        if tag_mappings:
+            keep.add(self._write_tags_export(tag_mappings))
+
+        # Los fragmentos de búsqueda se regeneran a continuación desde su caché
+        keep.update(path for path in (self.site_dir / "search").rglob('*') if path.is_file())
+        self.synchronizer.remove_extra(self.site_dir, keep)
+
+    def build_search_shards(self, index_path: Path, config_hash: str, changed: Optional[set] = None):
+        """Fragmentar el índice de búsqueda en un archivo por proyecto más un manifiesto
+
+        El manifiesto lleva, por fragmento, un filtro de Bloom con los
+        prefijos de sus términos: el worker de búsqueda (SEARCH_WORKER_JS)
+        solo descarga los fragmentos que pueden contener los términos de cada
+        consulta. Cada fragmento lleva su hash en el nombre, así que tras un
+        despliegue solo se vuelven a descargar los de los proyectos
+        modificados. Los fragmentos de proyectos sin cambios (o fuera de
+        `changed`) se reutilizan del build anterior sin volver a serializarlos.
+        El search_index.json completo se guarda en el estado para el build
+        incremental; en site/ queda uno con la configuración y sin documentos,
+        que es lo único que descarga el bundle de Material.
+        """
+        if not index_path.exists():
+            return
+
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+        stub = not index.get('docs') and self.search_index_path.exists()
+        if stub:
+            # site/ ya tiene el índice sin documentos de un build anterior
+            index = json.loads(self.search_index_path.read_text(encoding='utf-8'))
+        metadata = self._search_shard_metadata()
+        groups: Dict[str, List[Dict]] = {}
+        for doc in index.get('docs', []):
+            groups.setdefault(self._search_shard_id(doc['location'], metadata), []).append(doc)
+
+        previous = self._load_json_state(self.search_state_path)
+        previous_shards = previous.get('shards', {}) if previous.get('config_hash') == config_hash else {}
+        if changed is None:
+            changed = (
+                {f"proyectos/{slug}" for slug in self.changed_slugs}
+                | {f"proyectos-externos/{slug}" for slug in self.changed_external_slugs}
+            )
+        changed = changed | {'sitio'}
+
+        shards_dir = index_path.parent / "shards"
+        shards_dir.mkdir(parents=True, exist_ok=True)
+        self.search_cache_dir.mkdir(parents=True, exist_ok=True)
+        shards = {}
+        reused = 0
+
+        for shard_id in sorted(groups):
+            entry = previous_shards.get(shard_id)
+            if (shard_id in changed or entry is None or 'filter' not in entry
+                    or not (self.search_cache_dir / entry['file']).is_file()):
+                data = json.dumps({'docs': groups[shard_id]}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                digest = hashlib.sha256(data).hexdigest()[:12]
+                entry = {
+                    'file': f"{shard_id.replace('/', '--')}.{digest}.json",
+                    'bytes': len(data),
+                    'docs': len(groups[shard_id]),
+                    **search_prefix_filter(groups[shard_id]),
+                }
+                cached = self.search_cache_dir / entry['file']
+                if not cached.is_file():
+                    cached.write_bytes(data)
+                    # gzip sin fecha: el mismo fragmento produce siempre los mismos bytes
+                    (self.search_cache_dir / f"{entry['file']}.gz").write_bytes(gzip.compress(data, 9, mtime=0))
+            else:
+                reused += 1
+
+            for name in (entry['file'], f"{entry['file']}.gz"):
+                self.synchronizer.sync_file(self.search_cache_dir / name, shards_dir / name)
+            shards[shard_id] = entry
+
+        # Eliminar fragmentos que ya no forman parte del índice
+        keep = {name for entry in shards.values() for name in (entry['file'], f"{entry['file']}.gz")}
+        for directory in (shards_dir, self.search_cache_dir):
+            for path in directory.iterdir():
+                if path.name not in keep:
+                    path.unlink()
+
+        manifest = {
+            'config': index.get('config', {}),
+            'shards': [
+                dict(metadata.get(shard_id, {'title': shard_id}), id=shard_id,
+                     file=f"shards/{entry['file']}", bytes=entry['bytes'], docs=entry['docs'],
+                     bits=entry['bits'], filter=entry['filter'])
+                for shard_id, entry in sorted(shards.items())
+            ],
+        }
+        data = json.dumps(manifest, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        (index_path.parent / "manifest.json").write_bytes(data)
+        (index_path.parent / "manifest.json.gz").write_bytes(gzip.compress(data, 9, mtime=0))
+
+        self._save_json_state(self.search_state_path, {'config_hash': config_hash, 'shards': shards})
+
+        # El índice completo pasa al estado; el bundle solo necesita la configuración
+        if not stub:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(index_path, self.search_index_path)
+        index_path.write_text(json.dumps({'config': index.get('config', {}), 'docs': []}), encoding='utf-8')
+        logger.info(f"Índice de búsqueda: {len(shards)} fragmentos ({reused} reutilizados)")
+
+    @staticmethod
+    def _search_shard_id(location: str, projects: Dict[str, Any]) -> str:
+        """Fragmento de una entrada del índice: proyectos/<slug>, proyectos-externos/<slug> o sitio
+
+        Solo los proyectos conocidos tienen fragmento propio; las páginas
+        generadas bajo proyectos/ (etiquetas, recientes) van a 'sitio'.
+        """
+        match = re.match(r'^(proyectos(?:-externos)?/[^/#]+)/', location)
+        return match.group(1) if match and match.group(1) in projects else 'sitio'
+
+    def _search_shard_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Título, categoría y etiquetas de cada fragmento a partir de la configuración de los proyectos"""
+        metadata = {'sitio': {'title': 'Centro de Documentación', 'category': 'General', 'tags': []}}
+        for entry in self.catalog or self.build_catalog():
+            metadata[f"proyectos/{entry.slug}"] = {
+                'title': entry.name,
+                'category': entry.category,
+                'tags': list(entry.tags),
+            }
+        for entry in self.external_projects:
+            metadata[f"proyectos-externos/{entry['slug']}"] = {
+                'title': entry['name'],
+                'category': entry['metadata'].get('category', 'General'),
+                'tags': [str(tag) for tag in entry['metadata'].get('tags', [])],
+            }
+        return metadata
+
+    def _load_tag_mappings(self) -> Optional[List[Dict[str, Any]]]:
+        """Etiquetas exportadas por el último build (None si no hay tags.json)"""
+        tags_path = self.site_dir / TAGS_EXPORT
+        if not tags_path.exists():
+            return None
+        try:
+            return json.loads(tags_path.read_text(encoding='utf-8')).get('mappings', [])
+        except ValueError:
+            return None
+
+    def _merge_dirty_build(self, index_path: Path, previous_docs: List[Dict],
+                           previous_tags: Optional[List[Dict[str, Any]]], rebuilt_dirs: List[str]):
+        """Completar el índice de búsqueda y tags.json de un build --dirty con las páginas reutilizadas"""
+        rebuilt_pages = self._merge_search_index(index_path, previous_docs, rebuilt_dirs)
+        current_tags = self._load_tag_mappings()
+        if previous_tags is None or current_tags is None:
+            return
+
+        # Como el índice de búsqueda, tags.json solo lista las páginas reconstruidas
+        rebuilt_prefixes = tuple(f"{prefix}/" for prefix in rebuilt_dirs)
+        kept = [
+            mapping for mapping in previous_tags
+            if mapping['item']['url'] not in rebuilt_pages and not mapping['item']['url'].startswith(rebuilt_prefixes)
+        ]
+        self._write_tags_export(kept + current_tags)
+        logger.info(f"Etiquetas: {len(kept)} páginas reutilizadas")
+
+    def _merge_search_index(self, index_path: Path, previous_docs: List[Dict], rebuilt_dirs: List[str]) -> set:
+        """Completar el índice de búsqueda de un build --dirty con las páginas reutilizadas
+
+        Con --dirty, el plugin de búsqueda solo indexa las páginas reconstruidas,
+        así que se añaden las entradas anteriores de las páginas no tocadas.
+        Devuelve las páginas reconstruidas.
+        """
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+        rebuilt_pages = {doc['location'].split('#')[0] for doc in index.get('docs', [])}
+        rebuilt_prefixes = tuple(f"{prefix}/" for prefix in rebuilt_dirs)
+
+        kept = [
+            doc for doc in previous_docs
+            if doc['location'].split('#')[0] not in rebuilt_pages
+            and not doc['location'].startswith(rebuilt_prefixes)
+        ]
+        index['docs'] = kept + index.get('docs', [])
+        index_path.write_text(json.dumps(index, ensure_ascii=False), encoding='utf-8')
+        logger.info(f"Índice de búsqueda: {len(kept)} entradas reutilizadas")
+        return rebuilt_pages
+
+    def _load_build_state(self) -> Dict[str, Any]:
+        if not self.build_state_path.exists():
+            return {}
+        try:
+            return json.loads(self.build_state_path.read_text(encoding='utf-8'))
+        except ValueError:
+            return {}
+
+    def _save_build_state(self, state: Dict[str, Any]):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.build_state_path.write_text(json.dumps(state, indent=2, sort_keys=True), encoding='utf-8')
+
+    def publish_site(self, publish_dir: Optional[Path] = None, publish_branch: Optional[str] = None) -> bool:
+        """Publicar los cambios de site/ en un directorio o en una rama Git"""
+        if not self.site_dir.is_dir():
+            logger.error(f"No existe el sitio construido en {self.site_dir}")
+            return False
+
+        publisher = SitePublisher(self.site_dir, self.state_dir)
+        try:
+            if publish_dir:
+                publisher.publish_to_dir(publish_dir)
+            if publish_branch:
+                publisher.publish_to_branch(
+                    self.base_dir,
+                    publish_branch,
+                    f"🚀 Publicar documentación agregada ({datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')})"
+                )
+        except (OSError, RuntimeError) as e:
+            logger.error(f"Error al publicar el sitio: {e}")
             return False
+        return True
+
+    def plan(self, mode: str = 'branches') -> Dict[str, Any]:
+        """Calcular qué cambiaría en la próxima agregación, sin clonar, copiar ni construir
+
+        Las ramas docs/* se resuelven con un solo `git for-each-ref` y su árbol
+        se compara con el registrado en el manifiesto, con el mismo criterio
+        que la agregación. De los repositorios externos solo se sabe, sin
+        consultar el remoto, cuáles toca comprobar según update_schedule.
+        """
+        start = time.monotonic()
+        plan: Dict[str, Any] = {
+            'mode': mode, 'added': [], 'changed': [], 'removed': [], 'unchanged': [], 'files': {},
+            'external': {'added': [], 'due': [], 'unchanged': [], 'removed': []},
+        }
+
+        if mode in ('branches', 'all'):
+            manifest = self.load_manifest()
+            by_branch = {entry['branch']: (slug, entry) for slug, entry in manifest.items() if 'branch' in entry}
+            branches = self.resolve_project_refs()
+            changed_trees = {}
+            for branch in branches:
+                slug, entry = by_branch.get(branch, (None, None))
+                if entry is None:
+                    plan['added'].append(branch)
+                elif self._is_branch_unchanged(entry, self.branch_shas[branch], self.branch_trees[branch]):
+                    plan['unchanged'].append(branch)
+                else:
+                    plan['changed'].append(branch)
+                    changed_trees[branch] = (entry.get('tree'), self.branch_trees[branch])
+            plan['files'] = self._plan_changed_files(changed_trees)
+            plan['removed'] = sorted(
+                f"{branch} ({slug})" for branch, (slug, entry) in by_branch.items() if branch not in self.branch_shas
+            )
+
+        if mode in ('external', 'all'):
+            state = self._load_json_state(self.external_state_path)
+            now = time.time()
+            repos = self.load_external_config()
+            for repo in repos:
+                entry = state.get(repo['slug'])
+                key = 'added' if entry is None else 'due' if self._is_external_due(repo, entry, now) else 'unchanged'
+                plan['external'][key].append(repo['slug'])
+            configured = {repo['slug'] for repo in repos}
+            plan['external']['removed'] = sorted(set(state) - configured)
+
+        self._log_plan(plan, time.monotonic() - start)
+        return plan
+
+    def _plan_changed_files(self, trees: Dict[str, Tuple[Optional[str], str]]) -> Dict[str, Optional[int]]:
+        """Archivos que difieren entre el árbol registrado y el actual de cada rama
+
+        Todas las parejas se comparan con un único `git diff-tree --stdin`, que
+        escribe cada pareja como cabecera antes de sus archivos (y la omite si
+        no puede leer alguno de los árboles). None si la rama no tiene árbol
+        registrado o no se pudo comparar.
+        """
+        pairs = sorted({pair for pair in trees.values() if pair[0] is not None})
+        counts: Dict[Tuple[str, str], int] = {}
+        if pairs:
+            result = run_command(
+                ["git", "diff-tree", "--stdin", "-r", "--no-renames", "--name-only"],
+                cwd=self.base_dir,
+                input="".join(f"{old} {new}\n" for old, new in pairs),
+                timeout=self.git_timeout
+            )
+            headers = {f"{old} {new}": (old, new) for old, new in pairs}
+            current = None
+            for line in result.stdout.splitlines() if result.returncode == 0 else []:
+                if line in headers:
+                    current = headers[line]
+                    counts[current] = 0
+                elif current is not None:
+                    counts[current] += 1
+        return {branch: counts.get(pair) for branch, pair in trees.items()}
+
+    def _log_plan(self, plan: Dict[str, Any], elapsed: float):
+        logger.info("Plan de agregación (sin clonar ni construir):")
+        for branch in plan['added']:
+            logger.info(f"  + {branch}: nueva")
+        for branch in plan['changed']:
+            files = plan['files'].get(branch)
+            detail = f"{files} archivos modificados" if files is not None else "commit nuevo"
+            logger.info(f"  ~ {branch}: {detail}")
+        for removed in plan['removed']:
+            logger.info(f"  - {removed}: eliminada")
+        external = plan['external']
+        for slug in external['added']:
+            logger.info(f"  + external:{slug}: nuevo")
+        for slug in external['due']:
+            logger.info(f"  ? external:{slug}: se comprobará el remoto")
+        for slug in external['removed']:
+            logger.info(f"  - external:{slug}: eliminado")
+
+        if plan['mode'] in ('branches', 'all'):
+            logger.info(
+                f"Ramas: {len(plan['added'])} nuevas, {len(plan['changed'])} modificadas, "
+                f"{len(plan['removed'])} eliminadas, {len(plan['unchanged'])} sin cambios"
+            )
+        if any(external.values()):
+            logger.info(
+                f"Externos: {len(external['added'])} nuevos, {len(external['due'])} a comprobar, "
+                f"{len(external['removed'])} eliminados, {len(external['unchanged'])} sin importar"
+            )
+
+        # Trabajo previsto: lo que haría run() con las mismas opciones
+        fetches = len(plan['added']) + len(plan['changed'])
+        imports = len(external['added']) + len(external['due'])
+        prunes = len(plan['removed']) + len(external['removed'])
+        structural = plan['added'] or plan['removed'] or external['added'] or external['removed']
+        if not (fetches or imports or prunes):
+            build = "sin cambios de contenido"
+        elif self.incremental and not structural and not self.sharded_build:
+            build = f"incremental ({len(plan['changed'])} proyectos)"
+        else:
+            build = "completo"
+        logger.info(
+            f"Trabajo previsto: {fetches} ramas a obtener y copiar, {imports} repositorios externos a consultar, "
+            f"{prunes} proyectos a eliminar; build {build}"
+        )
+        logger.info(f"Plan calculado en {elapsed * 1000:.0f} ms")
 
-    def run(self, mode='branches', local_projects=None):
+    def run(self, mode='branches', local_projects=None, publish_dir=None, publish_branch=None):
         """Ejecutar el proceso completo de agregación"""
         logger.info("=" * 60)
         logger.info("Iniciando agregación de documentación")
         logger.info("=" * 60)
 
+        with self.tracer.span('run', mode=mode):
+            self._run_phases(mode, local_projects, publish_dir, publish_branch)
+
+        logger.info("=" * 60)
+        logger.info(
+            f"Agregación completada. Total de proyectos: {len(self.projects)}"
+            f" (+{len(self.external_projects)} externos)"
+        )
+        logger.info("=" * 60)
+        self.tracer.finish()
+
+    def _run_phases(self, mode, local_projects, publish_dir, publish_branch):
+        """Fases de run(), cada una con su span en la traza"""
         # Configurar directorios
         self.setup_directories()
 
         # Agregar documentación según el modo
-        if mode == 'local' and local_projects:
-            self.aggregate_from_local_projects(local_projects)
-        else:
-            self.aggregate_from_branches()
+        with self.tracer.span('aggregate'):
+            if mode == 'local' and local_projects:
+                self.aggregate_from_local_projects(local_projects)
+            elif mode in ('branches', 'all'):
+                self.aggregate_from_branches()
+
+            if mode in ('external', 'all'):
+                self.aggregate_from_external_repos()
+
+        stats = self.synchronizer.stats
+        logger.info(
+            f"Sincronización: {stats['written']} escritos, {stats['unchanged']} sin cambios, "
+            f"{stats['removed']} eliminados ({stats['bytes_written']} bytes)"
+        )
+
+        if not (self.projects or self.external_projects):
+            logger.warning("No se encontraron proyectos para agregar")
+            return
+
+        self._build_phases(publish_dir, publish_branch)
+
+    def _build_phases(self, publish_dir, publish_branch):
+        """Fases posteriores a la agregación: catálogo, índices, configuración, validación, build y publicación"""
+        if self.image_optimizer is not None:
+            with self.tracer.span('images'):
+                self.optimize_images()
+
+        with self.tracer.span('page index'):
+            self.update_page_index()
+
+        with self.tracer.span('catalog'):
+            self.build_catalog()
 
         # Generar índice de proyectos
-        if self.projects:
-            self.generate_projects_index()
+        with self.tracer.span('index'):
+            if self.projects:
+                self.generate_projects_index()
+                self.generate_page_reports()
+            if self.external_projects:
+                self.generate_external_index()
 
-            # Generar configuración MkDocs
+        # Generar configuración MkDocs
+        with self.tracer.span('mkdocs config'):
             self.generate_mkdocs_config()
 
-            # Validar documentación
-            if self.validate_documentation():
-                # Construir sitio
-                self.build_mkdocs_site()
-        else:
-            logger.warning("No se encontraron proyectos para agregar")
+        # Validar documentación
+        with self.tracer.span('validation'):
+            valid = self.validate_documentation()
+        if not valid:
+            return
 
-        logger.info("=" * 60)
-        logger.info(f"Agregación completada. Total de proyectos: {len(self.projects)}")
-        logger.info("=" * 60)
+        # Construir sitio y publicar los cambios
+        with self.tracer.span('build'):
+            built = self.build_mkdocs_site()
+        if built and (publish_dir or publish_branch):
+            with self.tracer.span('publish'):
+                self.publish_site(publish_dir, publish_branch)
 
 
 def main():
@@ -549,9 +4869,10 @@ def main():
 
     parser.add_argument(
         '--mode',
-        choices=['branches', 'local'],
+        choices=['branches', 'local', 'external', 'all'],
         default='branches',
-        help='Modo de agregación: branches (desde ramas Git) o local (directorios locales)'
+        help='Modo de agregación: branches (desde ramas Git), local (directorios locales), '
+             'external (repositorios de config/external_repos.yml) o all (branches + external)'
     )
 
     parser.add_argument(
@@ -575,6 +4896,173 @@ def main():
         help='Rutas a proyectos locales (solo en modo local)'
     )
 
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Número de ramas a procesar en paralelo (solo en modo branches)'
+    )
+
+    parser.add_argument(
+        '--reader',
+        choices=['clone', 'objects'],
+        default='clone',
+        help='Cómo leer las ramas: clone (git clone temporal) u objects (base de objetos local, sin clonar)'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Ignorar el manifiesto y update_schedule: reagregar todos los proyectos, incluidos los externos manuales'
+    )
+
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Reconstruir solo las páginas de los proyectos modificados (reutiliza site/)'
+    )
+
+    parser.add_argument(
+        '--reproducible',
+        action='store_true',
+        help='Salida byte a byte reproducible: fechas del commit de origen y orden estable'
+    )
+
+    parser.add_argument(
+        '--publish-dir',
+        type=Path,
+        help='Publicar los cambios del sitio construido en este directorio'
+    )
+
+    parser.add_argument(
+        '--publish-branch',
+        help='Publicar los cambios del sitio como commit en esta rama (p. ej. gh-pages)'
+    )
+
+    parser.add_argument(
+        '--publish-only',
+        action='store_true',
+        help='No agregar ni construir: solo publicar el contenido actual de site/'
+    )
+
+    parser.add_argument(
+        '--external-config',
+        type=Path,
+        help='Configuración de repositorios externos (por defecto: config/external_repos.yml)'
+    )
+
+    parser.add_argument(
+        '--external-url-template',
+        default=EXTERNAL_URL_TEMPLATE,
+        help='Plantilla de URL de clonado con {owner} y {repo} (p. ej. file:///srv/git/{owner}/{repo}.git)'
+    )
+
+    parser.add_argument(
+        '--mirror-cache',
+        type=Path,
+        help='Directorio de la caché de mirrors de repositorios externos (por defecto: .docs-aggregator/mirrors)'
+    )
+
+    parser.add_argument(
+        '--mirror-cache-size',
+        type=int,
+        default=2048,
+        help='Tamaño máximo en MB de la caché de mirrors antes de desalojar mirrors no configurados'
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Tras la agregación, observar los proyectos locales y reconstruir al detectar cambios (solo modo local)'
+    )
+
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Tras la agregación, atender eventos de actualización por HTTP y reagregar solo lo afectado'
+    )
+
+    parser.add_argument(
+        '--daemon-address',
+        default=DAEMON_ADDRESS,
+        help=f'Dirección host:puerto del modo daemon (por defecto: {DAEMON_ADDRESS})'
+    )
+
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=5.0,
+        help='Segundos sin eventos nuevos de un proyecto antes de procesarlos en modo daemon (por defecto: 5)'
+    )
+
+    parser.add_argument(
+        '--send-event',
+        metavar='EVENTO',
+        help='Enviar un evento al daemon y salir: una rama docs/*, un slug, external:<slug> o all'
+    )
+
+    parser.add_argument(
+        '--sharded-build',
+        action='store_true',
+        help='Construir el sitio en sub-sitios por categoría en paralelo (usa --jobs) y unirlos en site/'
+    )
+
+    parser.add_argument(
+        '--optimize-images',
+        action='store_true',
+        help='Recomprimir sin pérdida las imágenes PNG publicadas (en paralelo con --jobs, con caché)'
+    )
+
+    parser.add_argument(
+        '--image-widths',
+        type=int,
+        nargs='+',
+        default=[],
+        help='Anchos de las variantes redimensionadas de cada imagen, <nombre>-<ancho>w.png (requiere Pillow)'
+    )
+
+    parser.add_argument(
+        '--git-timeout',
+        type=float,
+        default=GIT_TIMEOUT,
+        help=f'Segundos máximos por operación git (por defecto: {GIT_TIMEOUT})'
+    )
+
+    parser.add_argument(
+        '--build-timeout',
+        type=float,
+        default=BUILD_TIMEOUT,
+        help=f'Segundos máximos por build de MkDocs (por defecto: {BUILD_TIMEOUT})'
+    )
+
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=2,
+        help='Reintentos, con backoff exponencial, de clones y fetches fallidos (por defecto: 2)'
+    )
+
+    parser.add_argument(
+        '--project-deadline',
+        type=float,
+        default=PROJECT_DEADLINE,
+        help=f'Segundos máximos para obtener un proyecto, reintentos incluidos; si se agota se sirve '
+             f'su última versión marcada como desactualizada (por defecto: {PROJECT_DEADLINE})'
+    )
+
+    parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='Mostrar qué proyectos cambiarían y el trabajo previsto, comparando los árboles de las '
+             'ramas docs/* con el manifiesto, sin clonar, copiar ni construir'
+    )
+
+    parser.add_argument(
+        '--trace',
+        type=Path,
+        help='Escribir una traza JSON (chrome://tracing, Perfetto) con spans por fase y proyecto'
+    )
+
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -583,14 +5071,67 @@ def main():
 
     args = parser.parse_args()
 
+    if args.send_event:
+        sys.exit(0 if send_event(args.daemon_address, args.send_event) else 1)
+
+    if args.watch and args.mode != 'local':
+        parser.error('--watch solo está disponible con --mode local')
+    if args.daemon and args.mode == 'local':
+        parser.error('--daemon no está disponible con --mode local (usa --watch)')
+    if args.plan and args.mode == 'local':
+        parser.error('--plan no está disponible con --mode local')
+
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
     # Crear agregador
-    aggregator = DocumentationAggregator(args.base_dir, args.output_dir)
+    aggregator = DocumentationAggregator(
+        args.base_dir,
+        args.output_dir,
+        jobs=args.jobs,
+        reader=args.reader,
+        force=args.force,
+        incremental=args.incremental,
+        reproducible=args.reproducible,
+        external_config=args.external_config,
+        external_url_template=args.external_url_template,
+        mirror_cache_dir=args.mirror_cache,
+        mirror_cache_size=args.mirror_cache_size,
+        trace_path=args.trace,
+        sharded_build=args.sharded_build,
+        optimize_images=args.optimize_images,
+        image_widths=args.image_widths,
+        git_timeout=args.git_timeout,
+        build_timeout=args.build_timeout,
+        retries=args.retries,
+        project_deadline=args.project_deadline
+    )
+
+    if args.publish_only:
+        sys.exit(0 if aggregator.publish_site(args.publish_dir, args.publish_branch) else 1)
+
+    if args.plan:
+        aggregator.plan(args.mode)
+        sys.exit(0)
 
     # Ejecutar agregación
-    aggregator.run(mode=args.mode, local_projects=args.local_projects)
+    aggregator.run(
+        mode=args.mode,
+        local_projects=args.local_projects,
+        publish_dir=args.publish_dir,
+        publish_branch=args.publish_branch
+    )
+
+    if args.watch:
+        aggregator.watch()
+    elif args.daemon:
+        aggregator.serve(
+            args.mode,
+            args.daemon_address,
+            debounce=args.debounce,
+            publish_dir=args.publish_dir,
+            publish_branch=args.publish_branch
+        )
 
 
 if __name__ == '__main__':
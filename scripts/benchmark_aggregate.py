@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+Benchmark sintético del agregador de documentación.
+Genera un repositorio Git local con N ramas docs/*, ejecuta aggregate_docs.py
+en modo branches y local, y mide tiempo y memoria pico por fase.
+
+Uso:
+    python scripts/benchmark_aggregate.py --projects 10 100 1000
+    python scripts/benchmark_aggregate.py --projects 100 --baseline benchmarks/baseline.json
+    python scripts/benchmark_aggregate.py --projects 100 --baseline benchmarks/baseline.json --save-baseline
+
+La línea base de CI (benchmarks/baseline.json) se genera con los mismos
+parámetros que el job de benchmark del workflow aggregate-docs.yml.
+"""
+
+import io
+import sys
+import json
+import random
+import statistics
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import resource
+import tracemalloc
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from datetime import datetime, timezone
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("benchmark")
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# Fases medidas: nombre de la fase -> métodos de DocumentationAggregator que la componen
+PHASES = {
+    'discovery': ['find_project_branches'],
+    'checkout': ['checkout_branch', 'open_branch_tree'],
+    'copy': ['copy_project_files'],
+    'index': ['create_project_index', 'generate_projects_index'],
+    'nav': ['generate_projects_nav'],
+    'validation': ['validate_documentation'],
+    'build': ['build_mkdocs_site'],
+}
+
+# Tiempos (medianos) por debajo de este valor no se comparan con la línea base:
+# en fases tan cortas la variación entre ejecuciones supera la tolerancia
+MIN_COMPARABLE_SECONDS = 0.2
+
+
+def generate_repository(repo_dir: Path, projects: int, pages: int, assets: int,
+                        asset_kb: int, seed: int = 0):
+    """Crear un repositorio con una rama docs/pNNNN por proyecto usando git fast-import"""
+    logger.info(f"Generando repositorio sintético con {projects} proyectos en {repo_dir}...")
+
+    subprocess.run(["git", "init", "-q", str(repo_dir)], check=True)
+    rng = random.Random(seed)
+    epoch = 1700000000
+
+    process = subprocess.Popen(
+        ["git", "fast-import", "--quiet"],
+        stdin=subprocess.PIPE,
+        cwd=repo_dir
+    )
+    stream = process.stdin
+
+    def blob(path: str, data: bytes):
+        stream.write(f"M 100644 inline {path}\ndata {len(data)}\n".encode('utf-8'))
+        stream.write(data)
+        stream.write(b"\n")
+
+    for number in range(projects):
+        slug = f"p{number:04d}"
+        ref = f"refs/remotes/origin/docs/{slug}"
+        message = f"docs {slug}".encode('utf-8')
+
+        stream.write(f"commit {ref}\n".encode('utf-8'))
+        stream.write(f"committer Benchmark <bench@example.com> {epoch + number} +0000\n".encode('utf-8'))
+        stream.write(f"data {len(message)}\n".encode('utf-8') + message + b"\n")
+
+        blob("docs.yaml", project_config(slug, number, assets).encode('utf-8'))
+        blob("docs/guide/index.md", guide_index(slug, pages).encode('utf-8'))
+        for page in range(pages):
+            blob(f"docs/guide/page-{page:03d}.md", page_content(slug, page, pages).encode('utf-8'))
+        blob("CHANGELOG.md", f"# Changelog {slug}\n".encode('utf-8'))
+        for asset in range(assets):
+            blob(f"assets/image-{asset:02d}.png", rng.randbytes(asset_kb * 1024))
+        stream.write(b"\n")
+
+        # Rama local equivalente, usada por el lector clone
+        stream.write(f"reset refs/heads/docs/{slug}\nfrom {ref}\n\n".encode('utf-8'))
+
+    stream.close()
+    if process.wait() != 0:
+        raise RuntimeError("git fast-import falló al generar el repositorio")
+
+
+def project_config(slug: str, number: int, assets: int) -> str:
+    """docs.yaml sintético de un proyecto"""
+    config = {
+        'project': {
+            'name': f"Proyecto {slug}",
+            'slug': slug,
+            'description': f"Proyecto sintético {number}",
+            'status': 'production',
+            'version': '1.0.0',
+            'repository': f"https://github.com/example/{slug}",
+            'technologies': [{'name': 'Python', 'version': '3.11'}, 'Docker'],
+        },
+        'documentation': {
+            'structure': [
+                {'title': 'Guía', 'source': 'docs/guide', 'type': 'directory', 'icon': '📖'},
+                {'title': 'Changelog', 'source': 'CHANGELOG.md'},
+            ],
+            'assets': ['assets'] if assets else [],
+        },
+        'aggregator': {
+            'category': f"Categoría {number % 10}",
+            'priority': number % 100,
+            'featured': number % 7 == 0,
+            'tags': [f"tag-{number % 13}", 'benchmark'],
+        },
+    }
+    return json.dumps(config, ensure_ascii=False, indent=2)
+
+
+def guide_index(slug: str, pages: int) -> str:
+    """Índice de la sección de guía (destino de su entrada de navegación)"""
+    links = "\n".join(f"- [Página {page}](page-{page:03d}.md)" for page in range(pages))
+    return f"# Guía de {slug}\n\n{links}\n"
+
+
+def page_content(slug: str, page: int, pages: int) -> str:
+    """Página Markdown sintética con enlaces entre páginas"""
+    following = f"page-{(page + 1) % pages:03d}.md"
+    paragraphs = "\n\n".join(
+        f"Texto de ejemplo {i} del proyecto {slug}, página {page}. " * 8 for i in range(5)
+    )
+    return (
+        f"# Página {page} de {slug}\n\n"
+        f"## Introducción\n\n{paragraphs}\n\n"
+        f"## Referencias\n\nVer [siguiente]({following}) y [cambios](../CHANGELOG.md).\n"
+    )
+
+
+def export_local_projects(repo_dir: Path, target_dir: Path) -> List[Path]:
+    """Extraer cada rama docs/* a un directorio para el modo local"""
+    result = subprocess.run(
+        ["git", "for-each-ref", "--format=%(refname:short)", "refs/heads/docs/"],
+        capture_output=True, text=True, cwd=repo_dir, check=True
+    )
+
+    project_dirs = []
+    for branch in result.stdout.split():
+        project_dir = target_dir / branch.split("/", 1)[1]
+        project_dir.mkdir(parents=True)
+        archive = subprocess.run(
+            ["git", "archive", "--format=tar", branch],
+            capture_output=True, cwd=repo_dir, check=True
+        )
+        with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+            tar.extractall(project_dir)
+        project_dirs.append(project_dir)
+
+    return project_dirs
+
+
+def prepare_output(output_dir: Path):
+    """Crear el sitio base mínimo que espera el agregador"""
+    docs_dir = output_dir / "docs" / "docs"
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    (docs_dir / "index.md").write_text("# Inicio\n", encoding='utf-8')
+    (docs_dir / "about-mkdocs.md").write_text("# Acerca de\n", encoding='utf-8')
+
+
+class PhaseProfiler:
+    """Medir tiempo y memoria pico de los métodos que componen cada fase
+
+    El tiempo de una fase es la suma de sus llamadas: en fases que corren en
+    el pool de workers (checkout, copy) es tiempo acumulado de los hilos, no
+    tiempo de pared. El pico de memoria (tracemalloc) cubre el intervalo de
+    las llamadas; si dos fases se solapan comparten el pico. Como cada fase
+    reinicia el pico de tracemalloc, el de toda la ejecución se acumula aparte
+    (run_peak_kb).
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, Any]] = {
+            name: {'calls': 0, 'seconds': 0.0, 'peak_kb': 0} for name in PHASES
+        }
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak_kb = 0
+
+    def instrument(self, aggregator):
+        for phase, methods in PHASES.items():
+            for method in methods:
+                if hasattr(aggregator, method):
+                    setattr(aggregator, method, self._wrap(phase, getattr(aggregator, method)))
+
+    def _wrap(self, phase: str, func):
+        def wrapper(*args, **kwargs):
+            with self.lock:
+                if self.active == 0:
+                    # El pico desde el último reinicio se perdería al reiniciarlo
+                    self.peak_kb = max(self.peak_kb, tracemalloc.get_traced_memory()[1] // 1024)
+                    tracemalloc.reset_peak()
+                self.active += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] // 1024
+                with self.lock:
+                    self.active -= 1
+                    stats = self.phases[phase]
+                    stats['calls'] += 1
+                    stats['seconds'] += elapsed
+                    stats['peak_kb'] = max(stats['peak_kb'], peak)
+        return wrapper
+
+    def run_peak_kb(self) -> int:
+        """Pico de memoria de toda la ejecución: el de antes de cada reinicio y el actual"""
+        with self.lock:
+            return max(self.peak_kb, tracemalloc.get_traced_memory()[1] // 1024)
+
+
+def run_scenario(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Ejecutar el agregador una vez y devolver las métricas (se llama en un proceso aparte)"""
+    sys.path.insert(0, str(SCRIPT_DIR))
+    import aggregate_docs
+
+    aggregate_docs.logger.setLevel(logging.WARNING)
+
+    output_dir = Path(scenario['output_dir'])
+    prepare_output(output_dir)
+
+    aggregator = aggregate_docs.DocumentationAggregator(
+        Path(scenario['repo_dir']),
+        output_dir,
+        jobs=scenario['jobs'],
+        reader=scenario['reader']
+    )
+    if scenario['skip_build']:
+        aggregator.build_mkdocs_site = lambda: True
+
+    # Resultado de las fases que pueden fallar sin lanzar excepción
+    outcomes: Dict[str, Any] = {}
+    validate = aggregator.validate_documentation
+    build = aggregator.build_mkdocs_site
+
+    def checked_validation():
+        outcomes['validation'] = validate()
+        return outcomes['validation']
+
+    def checked_build():
+        outcomes['build'] = build()
+        return outcomes['build']
+
+    aggregator.validate_documentation = checked_validation
+    aggregator.build_mkdocs_site = checked_build
+
+    profiler = PhaseProfiler()
+    profiler.instrument(aggregator)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    aggregator.run(
+        mode=scenario['mode'],
+        local_projects=[Path(p) for p in scenario.get('local_projects', [])]
+    )
+    total = time.perf_counter() - start
+    peak_kb = profiler.run_peak_kb()
+    tracemalloc.stop()
+
+    # La validación bloquea el build y un build fallido no es una medida válida: el escenario falla
+    if not outcomes.get('validation'):
+        raise RuntimeError(f"El escenario {scenario['name']} no pasó la validación de la documentación")
+    if not outcomes.get('build'):
+        raise RuntimeError(f"El escenario {scenario['name']} no construyó el sitio")
+
+    phases = profiler.phases
+    if scenario['skip_build']:
+        phases.pop('build')
+
+    return {
+        'projects': len(aggregator.projects),
+        'total_seconds': total,
+        'peak_traced_kb': peak_kb,
+        'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'children_maxrss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        'phases': phases,
+    }
+
+
+def spawn_scenario(scenario: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Lanzar un escenario en un proceso nuevo para que maxrss no se acumule entre ejecuciones"""
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), '--scenario', json.dumps(scenario)],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        logger.error(f"El escenario {scenario['name']} falló:\n{result.stderr}")
+        return None
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    """Generar los repositorios sintéticos y medir cada escenario"""
+    results = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'parameters': {
+            'pages': args.pages,
+            'assets': args.assets,
+            'asset_kb': args.asset_kb,
+            'jobs': args.jobs,
+            'reader': args.reader,
+            'skip_build': args.skip_build,
+            'repeat': args.repeat,
+        },
+        'scenarios': {},
+        'failed': [],
+    }
+
+    work_dir = Path(tempfile.mkdtemp(prefix="docs-benchmark-", dir=args.work_dir))
+    try:
+        for projects in args.projects:
+            repo_dir = work_dir / f"repo-{projects}"
+            generate_repository(repo_dir, projects, args.pages, args.assets, args.asset_kb)
+            local_projects = export_local_projects(repo_dir, work_dir / f"local-{projects}")
+
+            for mode in args.modes:
+                name = f"{mode}-{projects}"
+                logger.info(f"Ejecutando escenario {name} ({args.repeat} repeticiones)...")
+
+                runs = []
+                for run in range(args.repeat):
+                    # Cada repetición parte de una salida vacía (sin estado incremental)
+                    scenario = {
+                        'name': name,
+                        'mode': mode,
+                        'repo_dir': str(repo_dir),
+                        'output_dir': str(work_dir / f"out-{name}-{run}"),
+                        'jobs': args.jobs,
+                        'reader': args.reader,
+                        'skip_build': args.skip_build,
+                        'local_projects': [str(p) for p in local_projects] if mode == 'local' else [],
+                    }
+                    metrics = spawn_scenario(scenario)
+                    if metrics is None:
+                        break
+                    runs.append(metrics)
+
+                if len(runs) < args.repeat:
+                    results['failed'].append(name)
+                    continue
+                results['scenarios'][name] = median_metrics(runs)
+                log_scenario(name, results['scenarios'][name])
+    finally:
+        if args.keep:
+            logger.info(f"Datos del benchmark conservados en {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def median_metrics(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combinar las repeticiones de un escenario tomando la mediana de cada medida"""
+    metrics = {
+        key: statistics.median(run[key] for run in runs)
+        for key in ('total_seconds', 'peak_traced_kb', 'maxrss_kb', 'children_maxrss_kb')
+    }
+    metrics['projects'] = runs[0]['projects']
+    metrics['runs'] = len(runs)
+    metrics['phases'] = {
+        phase: {field: statistics.median(run['phases'][phase][field] for run in runs) for field in stats}
+        for phase, stats in runs[0]['phases'].items()
+    }
+    return metrics
+
+
+def log_scenario(name: str, metrics: Dict[str, Any]):
+    logger.info(
+        f"  {name}: {metrics['projects']} proyectos en {metrics['total_seconds']:.2f}s, "
+        f"pico {metrics['peak_traced_kb']} KB (maxrss {metrics['maxrss_kb']} KB)"
+    )
+    for phase, stats in metrics['phases'].items():
+        logger.info(
+            f"    {phase:<11} {stats['seconds']:8.3f}s  {stats['calls']:5d} llamadas  "
+            f"pico {stats['peak_kb']} KB"
+        )
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Devolver las regresiones de tiempo o memoria frente a la línea base"""
+    regressions = []
+
+    # Con otros parámetros los tiempos no son comparables: la línea base está desactualizada
+    if baseline.get('parameters') != results['parameters']:
+        regressions.append(
+            f"parámetros distintos de la línea base ({baseline.get('parameters')} frente a "
+            f"{results['parameters']}); regenerarla con --save-baseline"
+        )
+        return regressions
+
+    for name, metrics in results['scenarios'].items():
+        reference = baseline.get('scenarios', {}).get(name)
+        if reference is None:
+            logger.info(f"  {name}: sin línea base, no se compara")
+            continue
+
+        checks = []
+        if reference['total_seconds'] >= MIN_COMPARABLE_SECONDS:
+            checks.append(('total', metrics['total_seconds'], reference['total_seconds'], 's'))
+        for phase, stats in metrics['phases'].items():
+            previous = reference.get('phases', {}).get(phase)
+            if previous and previous['seconds'] >= MIN_COMPARABLE_SECONDS:
+                checks.append((phase, stats['seconds'], previous['seconds'], 's'))
+        checks.append(('memoria', metrics['peak_traced_kb'], reference['peak_traced_kb'], ' KB'))
+
+        for label, current, previous, unit in checks:
+            if previous and current > previous * (1 + tolerance):
+                regressions.append(
+                    f"{name} {label}: {current:.2f}{unit} frente a {previous:.2f}{unit} "
+                    f"(+{(current / previous - 1) * 100:.0f}%)"
+                )
+
+    return regressions
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark sintético del agregador de documentación'
+    )
+
+    parser.add_argument(
+        '--projects',
+        nargs='+',
+        type=int,
+        default=[10, 100],
+        help='Número de proyectos (ramas docs/*) de cada escenario'
+    )
+
+    parser.add_argument(
+        '--pages',
+        type=int,
+        default=10,
+        help='Páginas Markdown por proyecto'
+    )
+
+    parser.add_argument(
+        '--assets',
+        type=int,
+        default=2,
+        help='Assets binarios por proyecto'
+    )
+
+    parser.add_argument(
+        '--asset-kb',
+        type=int,
+        default=64,
+        help='Tamaño de cada asset en KB'
+    )
+
+    parser.add_argument(
+        '--modes',
+        nargs='+',
+        choices=['branches', 'local'],
+        default=['branches', 'local'],
+        help='Modos de agregación a medir'
+    )
+
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Valor de --jobs del agregador'
+    )
+
+    parser.add_argument(
+        '--reader',
+        choices=['clone', 'objects'],
+        default='clone',
+        help='Valor de --reader del agregador en modo branches'
+    )
+
+    parser.add_argument(
+        '--skip-build',
+        action='store_true',
+        help='No ejecutar mkdocs build (la fase build no se mide)'
+    )
+
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Repeticiones de cada escenario; se comparan las medianas'
+    )
+
+    parser.add_argument(
+        '--baseline',
+        type=Path,
+        help='Archivo JSON de línea base con el que comparar'
+    )
+
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Guardar los resultados como nueva línea base en --baseline'
+    )
+
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.25,
+        help='Empeoramiento relativo permitido frente a la línea base (0.25 = 25%%)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Archivo JSON donde escribir los resultados'
+    )
+
+    parser.add_argument(
+        '--work-dir',
+        type=Path,
+        help='Directorio donde crear los datos sintéticos (por defecto el temporal del sistema)'
+    )
+
+    parser.add_argument(
+        '--keep',
+        action='store_true',
+        help='Conservar los repositorios y salidas generados'
+    )
+
+    parser.add_argument(
+        '--scenario',
+        help=argparse.SUPPRESS
+    )
+
+    args = parser.parse_args()
+
+    # Proceso hijo: ejecutar un único escenario y devolver las métricas por stdout
+    if args.scenario:
+        print(json.dumps(run_scenario(json.loads(args.scenario))))
+        return
+
+    results = run_benchmark(args)
+    if results['failed']:
+        logger.error(f"❌ Escenarios fallidos: {', '.join(results['failed'])}")
+        sys.exit(1)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding='utf-8')
+        logger.info(f"Resultados guardados en {args.output}")
+
+    if args.baseline and args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding='utf-8')
+        logger.info(f"Línea base guardada en {args.baseline}")
+    elif args.baseline:
+        if not args.baseline.exists():
+            logger.error(f"No existe la línea base {args.baseline}")
+            sys.exit(2)
+
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            logger.error("❌ Regresiones frente a la línea base:")
+            for regression in regressions:
+                logger.error(f"  - {regression}")
+            sys.exit(1)
+        logger.info("✅ Sin regresiones frente a la línea base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Utilidades compartidas por las pruebas del agregador
+
+Los repositorios de prueba se generan con benchmark_aggregate (una rama
+docs/pNNNN por proyecto). Las pruebas que construyen el sitio necesitan
+mkdocs y mkdocs-material y se omiten si no están instalados.
+
+Uso:
+    python -m unittest discover -s tests
+    python -m pytest tests
+"""
+
+import os
+import sys
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+import subprocess
+import importlib.util
+from pathlib import Path
+from typing import Optional, Union
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import aggregate_docs  # noqa: E402
+import benchmark_aggregate  # noqa: E402
+
+aggregate_docs.logger.setLevel(logging.CRITICAL)
+benchmark_aggregate.logger.setLevel(logging.CRITICAL)
+
+HAS_MKDOCS = all(importlib.util.find_spec(name) for name in ('mkdocs', 'material'))
+requires_mkdocs = unittest.skipUnless(HAS_MKDOCS, "requiere mkdocs y mkdocs-material")
+
+GIT_IDENTITY = {
+    'GIT_AUTHOR_NAME': "Test", 'GIT_AUTHOR_EMAIL': "test@example.com",
+    'GIT_COMMITTER_NAME': "Test", 'GIT_COMMITTER_EMAIL': "test@example.com",
+}
+
+
+def git(repo: Path, *args: str, input: Union[str, bytes, None] = None, env: Optional[dict] = None) -> str:
+    if isinstance(input, str):
+        input = input.encode('utf-8')
+    result = subprocess.run(["git", *args], cwd=repo, input=input, env=dict(os.environ, **GIT_IDENTITY, **(env or {})),
+                            capture_output=True, check=True)
+    return result.stdout.decode('utf-8').strip()
+
+
+def commit_files(repo: Path, slug: str, files: dict, message: str = "edit", date: Optional[str] = None) -> str:
+    """Crear un commit en docs/<slug> que escribe (o borra, con None) los archivos indicados"""
+    ref = f"refs/remotes/origin/docs/{slug}"
+    env = {'GIT_INDEX_FILE': str(repo / ".git" / "test-index")}
+    if date:
+        env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    git(repo, "read-tree", ref, env=env)
+    for path, content in files.items():
+        if content is None:
+            git(repo, "update-index", "--remove", "--force-remove", path, env=env)
+        else:
+            blob = git(repo, "hash-object", "-w", "--stdin", input=content)
+            git(repo, "update-index", "--add", "--cacheinfo", f"100644,{blob},{path}", env=env)
+    tree = git(repo, "write-tree", env=env)
+    commit = git(repo, "commit-tree", tree, "-p", ref, "-m", message, env=env)
+    git(repo, "update-ref", ref, commit)
+    git(repo, "update-ref", f"refs/heads/docs/{slug}", commit)
+    return commit
+
+
+def delete_branch(repo: Path, slug: str):
+    git(repo, "update-ref", "-d", f"refs/remotes/origin/docs/{slug}")
+    git(repo, "update-ref", "-d", f"refs/heads/docs/{slug}")
+
+
+def read_json(path: Path):
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+class AggregatorTestCase(unittest.TestCase):
+    """Repositorio sintético y directorios de salida temporales por prueba"""
+
+    projects = 3
+    pages = 2
+    assets = 0
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="aggregate-docs-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.repo = self.tmp / "repo"
+        benchmark_aggregate.generate_repository(self.repo, self.projects, self.pages, self.assets, 1)
+
+    def aggregator(self, output: str = "out", **options) -> 'aggregate_docs.DocumentationAggregator':
+        output_dir = self.tmp / output
+        benchmark_aggregate.prepare_output(output_dir)
+        options.setdefault('reader', 'objects')
+        return aggregate_docs.DocumentationAggregator(self.repo, output_dir, **options)
+
+    def aggregate(self, output: str = "out", build: bool = False, mode: str = 'branches', **options):
+        """Ejecutar una agregación que debe validar (y construir, con `build`) el sitio"""
+        aggregator = self.aggregator(output, **options)
+        outcomes = {}
+        validate = aggregator.validate_documentation
+        build_site = aggregator.build_mkdocs_site if build else lambda: True
+
+        def checked_validation():
+            outcomes['validation'] = validate()
+            return outcomes['validation']
+
+        def checked_build():
+            outcomes['build'] = build_site()
+            return outcomes['build']
+
+        aggregator.validate_documentation = checked_validation
+        aggregator.build_mkdocs_site = checked_build
+        aggregator.run(mode=mode)
+        del aggregator.validate_documentation, aggregator.build_mkdocs_site
+        self.assertTrue(outcomes.get('validation'), "la documentación agregada no pasó la validación")
+        self.assertTrue(outcomes.get('build'), "el sitio no se construyó")
+        return aggregator
+
+    def manifest(self, output: str = "out") -> dict:
+        return read_json(self.tmp / output / ".docs-aggregator" / "manifest.json")['projects']
+
+    def docs_dir(self, output: str = "out") -> Path:
+        return self.tmp / output / "docs" / "docs"
+
+    def project_dir(self, slug: str, output: str = "out") -> Path:
+        return self.docs_dir(output) / "proyectos" / slug
+
+    def site(self, output: str = "out") -> Path:
+        return self.tmp / output / "docs" / "site"
+
+    def tags_export(self, output: str = "out") -> dict:
+        return read_json(self.site(output) / "tags.json")
+
+    def search_docs(self, output: str = "out") -> list:
+        """Índice de búsqueda completo del último build, ordenado por ubicación"""
+        index = read_json(self.tmp / output / ".docs-aggregator" / "search_index.json")
+        return sorted(index['docs'], key=lambda doc: doc['location'])
@@ -0,0 +1,85 @@
+"""Agregación de ramas: la salida no depende del paralelismo, del lector ni del momento de ejecución"""
+
+import time
+
+from support import AggregatorTestCase, commit_files, requires_mkdocs
+
+
+class OutputTestCase(AggregatorTestCase):
+    """Comparación del contenido completo de dos salidas"""
+
+    projects = 6
+    assets = 1
+
+    def output_files(self, output: str = "out") -> dict:
+        docs_root = self.tmp / output / "docs"
+        files = {"mkdocs.yml": (docs_root / "mkdocs.yml").read_bytes()}
+        for path in sorted((docs_root / "docs").rglob("*")):
+            if path.is_file():
+                files[path.relative_to(docs_root).as_posix()] = path.read_bytes()
+        return files
+
+    def assert_same_output(self, first: str, second: str):
+        files, other = self.output_files(first), self.output_files(second)
+        self.assertEqual(sorted(files), sorted(other))
+        for rel, data in files.items():
+            self.assertEqual(data, other[rel], rel)
+
+
+class ParallelAggregationTest(OutputTestCase):
+    """Con --jobs, las ramas se procesan en paralelo con el mismo resultado"""
+
+    def test_parallel_output_matches_serial(self):
+        serial = self.aggregate("serial", jobs=1, reproducible=True)
+        parallel = self.aggregate("parallel", jobs=4, reproducible=True)
+
+        self.assertEqual([project['project']['slug'] for project in parallel.projects],
+                         [project['project']['slug'] for project in serial.projects])
+        self.assertEqual(self.manifest("parallel"), self.manifest("serial"))
+        self.assert_same_output("serial", "parallel")
+
+    def test_failing_branch_does_not_stop_the_others(self):
+        commit_files(self.repo, "p0003", {"docs.yaml": "project: {slug: ["})
+
+        aggregator = self.aggregate(jobs=4)
+
+        self.assertEqual(sorted(self.manifest()), ["p0000", "p0001", "p0002", "p0004", "p0005"])
+        self.assertEqual(len(aggregator.projects), 5)
+
+
+class ReaderTest(OutputTestCase):
+    """El lector de objetos (sin clonar) produce lo mismo que el lector clone"""
+
+    def test_objects_reader_matches_clone_reader(self):
+        self.aggregate("clone", reader='clone', reproducible=True)
+        self.aggregate("objects", reader='objects', reproducible=True)
+
+        self.assertEqual(self.manifest("objects"), self.manifest("clone"))
+        self.assert_same_output("clone", "objects")
+
+
+class ReproducibleOutputTest(OutputTestCase):
+    """Con --reproducible dos ejecuciones en frío producen los mismos bytes"""
+
+    def site_files(self, output: str) -> dict:
+        return {path.relative_to(self.site(output)).as_posix(): path.read_bytes()
+                for path in sorted(self.site(output).rglob("*")) if path.is_file()}
+
+    def test_runs_are_byte_identical(self):
+        self.aggregate("first", reproducible=True)
+        time.sleep(1.1)
+        self.aggregate("second", reproducible=True)
+
+        self.assert_same_output("first", "second")
+        self.assertIn("*Última actualización: 2023-11-14 22:13:21 UTC*",
+                      (self.project_dir("p0001", "first") / "index.md").read_text(encoding='utf-8'))
+
+    @requires_mkdocs
+    def test_built_sites_are_byte_identical(self):
+        self.aggregate("first", build=True, reproducible=True)
+        time.sleep(1.1)
+        self.aggregate("second", build=True, reproducible=True)
+
+        first, second = self.site_files("first"), self.site_files("second")
+        self.assertEqual(sorted(first), sorted(second))
+        self.assertEqual([rel for rel in first if first[rel] != second[rel]], [])
@@ -0,0 +1,59 @@
+"""Almacén de assets direccionado por contenido"""
+
+import shutil
+
+from support import AggregatorTestCase, commit_files
+
+PAGE = "# Página con logo\n\n![logo](../../assets/shared.png)\n"
+
+
+class AssetStoreTest(AggregatorTestCase):
+    """Los assets referenciados se guardan una vez en docs/_assets y se recuperan si faltan"""
+
+    assets = 1
+
+    def setUp(self):
+        super().setUp()
+        for slug in ("p0000", "p0001"):
+            commit_files(self.repo, slug, {"assets/shared.png": b"\x89PNG mismo contenido", "docs/guide/page-000.md": PAGE})
+
+    def store_files(self) -> list:
+        store = self.docs_dir() / "_assets"
+        return sorted(path.relative_to(store).as_posix() for path in store.rglob("*") if path.is_file())
+
+    def test_shared_asset_is_stored_once(self):
+        self.aggregate()
+
+        manifest = self.manifest()
+        names = manifest["p0000"]['assets']
+        self.assertEqual(len(names), 1)
+        self.assertEqual(manifest["p0001"]['assets'], names)
+        self.assertEqual(self.store_files(), names)
+
+        page = (self.project_dir("p0000") / "guide" / "page-000.md").read_text(encoding='utf-8')
+        self.assertIn(f"](../../../_assets/{names[0]})", page)
+        self.assertFalse((self.project_dir("p0000") / "assets" / "shared.png").exists())
+        # El asset no referenciado sigue en el directorio del proyecto
+        self.assertTrue((self.project_dir("p0000") / "assets" / "image-00.png").is_file())
+
+    def test_unreferenced_blobs_are_collected(self):
+        self.aggregate()
+        for slug in ("p0000", "p0001"):
+            commit_files(self.repo, slug, {"docs/guide/page-000.md": "# Sin logo\n"})
+
+        self.aggregate()
+
+        self.assertEqual(self.store_files(), [])
+        self.assertEqual(self.manifest()["p0000"]['assets'], [])
+
+    def test_missing_store_is_restored_for_unchanged_branches(self):
+        self.aggregate()
+        names = self.store_files()
+        shutil.rmtree(self.docs_dir() / "_assets")
+
+        aggregator = self.aggregate()
+
+        self.assertEqual(self.store_files(), names)
+        self.assertTrue(aggregator.validate_documentation())
+        self.assertIn("p0000", aggregator.changed_slugs)
+        self.assertNotIn("p0002", aggregator.changed_slugs)
@@ -0,0 +1,99 @@
+"""Medidas del benchmark y comparación con la línea base"""
+
+import unittest
+import tracemalloc
+
+from support import benchmark_aggregate
+
+
+class FakeAggregator:
+    """Métodos de dos fases: la primera reserva mucha memoria, la segunda poca"""
+
+    def find_project_branches(self):
+        buffer = bytearray(8 * 1024 * 1024)
+        return len(buffer)
+
+    def generate_projects_nav(self):
+        return len(bytearray(1024))
+
+
+class PhaseProfilerTest(unittest.TestCase):
+    """Tiempo, llamadas y pico de memoria por fase y de toda la ejecución"""
+
+    def setUp(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        self.profiler = benchmark_aggregate.PhaseProfiler()
+        self.aggregator = FakeAggregator()
+        self.profiler.instrument(self.aggregator)
+
+    def test_phases_are_measured(self):
+        self.aggregator.find_project_branches()
+        self.aggregator.generate_projects_nav()
+        self.aggregator.generate_projects_nav()
+
+        phases = self.profiler.phases
+        self.assertEqual(phases['discovery']['calls'], 1)
+        self.assertEqual(phases['nav']['calls'], 2)
+        self.assertEqual(phases['copy']['calls'], 0)
+        self.assertGreaterEqual(phases['discovery']['peak_kb'], 8 * 1024)
+        self.assertLess(phases['nav']['peak_kb'], 8 * 1024)
+
+    def test_run_peak_covers_earlier_phases(self):
+        self.aggregator.find_project_branches()
+        self.aggregator.generate_projects_nav()
+
+        self.assertGreaterEqual(self.profiler.run_peak_kb(), 8 * 1024)
+
+
+class BaselineComparisonTest(unittest.TestCase):
+    """Medianas de las repeticiones y regresiones frente a la línea base"""
+
+    PARAMETERS = {'pages': 10, 'repeat': 3}
+
+    def metrics(self, total: float, copy: float, nav: float, peak_kb: int = 1000) -> dict:
+        return {
+            'projects': 10, 'total_seconds': total, 'peak_traced_kb': peak_kb,
+            'maxrss_kb': 40000, 'children_maxrss_kb': 0,
+            'phases': {
+                'copy': {'calls': 10, 'seconds': copy, 'peak_kb': peak_kb},
+                'nav': {'calls': 1, 'seconds': nav, 'peak_kb': 10},
+            },
+        }
+
+    def results(self, metrics: dict, **parameters) -> dict:
+        return {'parameters': dict(self.PARAMETERS, **parameters), 'scenarios': {'branches-10': metrics}}
+
+    def test_median_ignores_outlier_run(self):
+        metrics = benchmark_aggregate.median_metrics([
+            self.metrics(1.0, 0.5, 0.01), self.metrics(9.0, 8.0, 0.02), self.metrics(1.2, 0.6, 0.03),
+        ])
+
+        self.assertEqual(metrics['runs'], 3)
+        self.assertEqual(metrics['total_seconds'], 1.2)
+        self.assertEqual(metrics['phases']['copy'], {'calls': 10, 'seconds': 0.6, 'peak_kb': 1000})
+        self.assertEqual(metrics['phases']['nav']['seconds'], 0.02)
+
+    def test_regressions_above_tolerance(self):
+        baseline = self.results(self.metrics(1.0, 0.5, 0.01))
+        current = self.results(self.metrics(1.2, 0.9, 0.05, peak_kb=2000))
+
+        regressions = benchmark_aggregate.compare_with_baseline(current, baseline, 0.25)
+
+        self.assertEqual([regression.split(":")[0] for regression in regressions],
+                         ["branches-10 copy", "branches-10 memoria"])
+
+    def test_short_timings_are_not_compared(self):
+        baseline = self.results(self.metrics(0.1, 0.05, 0.01))
+        current = self.results(self.metrics(0.3, 0.15, 0.03))
+
+        self.assertEqual(benchmark_aggregate.compare_with_baseline(current, baseline, 0.25), [])
+
+    def test_different_parameters_fail(self):
+        baseline = self.results(self.metrics(1.0, 0.5, 0.01))
+        current = self.results(self.metrics(1.0, 0.5, 0.01), pages=20)
+
+        regressions = benchmark_aggregate.compare_with_baseline(current, baseline, 0.25)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("--save-baseline", regressions[0])
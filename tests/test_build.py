@@ -0,0 +1,144 @@
+"""Builds del sitio: incrementales (--dirty) y por sub-sitios de categoría"""
+
+import re
+
+from support import AggregatorTestCase, commit_files, delete_branch, git, requires_mkdocs
+
+TAGGED_PAGE = "---\ntags:\n  - nueva-etiqueta\n---\n# Página etiquetada\n\nContenido nuevo.\n"
+
+
+@requires_mkdocs
+class DirtyBuildTest(AggregatorTestCase):
+    """Con --incremental solo se regeneran las páginas de los proyectos modificados"""
+
+    def page_mtimes(self) -> dict:
+        """mtime de la primera página de guía de cada proyecto"""
+        return {
+            path.parts[-4]: path.stat().st_mtime_ns
+            for path in self.site().glob("proyectos/*/guide/page-000/index.html")
+        }
+
+    def test_unchanged_projects_are_not_rebuilt(self):
+        self.aggregate(build=True, incremental=True)
+        before = self.page_mtimes()
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": "# Página reconstruida\n"})
+
+        self.aggregate(build=True, incremental=True)
+
+        after = self.page_mtimes()
+        self.assertEqual(sorted(slug for slug in after if after[slug] != before[slug]), ["p0001"])
+        page = self.site() / "proyectos" / "p0001" / "guide" / "page-000" / "index.html"
+        self.assertIn("Página reconstruida", page.read_text(encoding='utf-8'))
+
+    def test_navigation_change_rebuilds_everything(self):
+        self.aggregate(build=True, incremental=True)
+        before = self.page_mtimes()
+        git(self.repo, "update-ref", "refs/remotes/origin/docs/p0009", "refs/remotes/origin/docs/p0000")
+        commit_files(self.repo, "p0009", {"docs.yaml": git(self.repo, "show", "origin/docs/p0000:docs.yaml")
+                                          .replace('"p0000"', '"p0009"')})
+
+        self.aggregate(build=True, incremental=True)
+
+        after = self.page_mtimes()
+        self.assertEqual(sorted(after), ["p0000", "p0001", "p0002", "p0009"])
+        self.assertTrue(all(after[slug] != before[slug] for slug in before))
+
+
+@requires_mkdocs
+class IncrementalBuildTest(AggregatorTestCase):
+    """Un build incremental deja el mismo índice de búsqueda y tags.json que uno completo"""
+
+    projects = 4
+
+    def assert_matches_full_build(self):
+        self.aggregate("full", build=True, reproducible=True)
+        self.assertEqual(self.tags_export("incremental"), self.tags_export("full"))
+        self.assertEqual(self.search_docs("incremental"), self.search_docs("full"))
+
+    def test_changed_project(self):
+        self.aggregate("incremental", build=True, incremental=True, reproducible=True)
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": TAGGED_PAGE})
+
+        aggregator = self.aggregate("incremental", build=True, incremental=True, reproducible=True)
+
+        self.assertEqual(aggregator.changed_slugs, {"p0001"})
+        mappings = self.tags_export("incremental")['mappings']
+        self.assertEqual(len({mapping['item']['url'] for mapping in mappings}), len(mappings))
+        self.assertIn("nueva-etiqueta", [tag for mapping in mappings for tag in mapping['tags']])
+        self.assert_matches_full_build()
+
+    def test_removed_page_and_unchanged_projects(self):
+        self.aggregate("incremental", build=True, incremental=True, reproducible=True)
+        commit_files(self.repo, "p0002", {
+            "docs/guide/page-001.md": None,
+            "docs/guide/page-000.md": "# Página 0\n\nSin enlaces.\n",
+            "docs/guide/index.md": "# Guía\n\n- [Página 0](page-000.md)\n",
+        })
+
+        self.aggregate("incremental", build=True, incremental=True, reproducible=True)
+
+        urls = [mapping['item']['url'] for mapping in self.tags_export("incremental")['mappings']]
+        self.assertNotIn("proyectos/p0002/guide/page-001/", urls)
+        self.assertIn("proyectos/p0000/guide/page-001/", urls)
+        self.assert_matches_full_build()
+
+    def test_deleted_project_is_removed(self):
+        self.aggregate("incremental", build=True, incremental=True, reproducible=True)
+        delete_branch(self.repo, "p0003")
+
+        self.aggregate("incremental", build=True, incremental=True, reproducible=True)
+
+        urls = [mapping['item']['url'] for mapping in self.tags_export("incremental")['mappings']]
+        self.assertFalse([url for url in urls if url.startswith("proyectos/p0003/")])
+        self.assertFalse((self.site("incremental") / "proyectos" / "p0003").exists())
+        self.assert_matches_full_build()
+
+
+@requires_mkdocs
+class ShardedBuildTest(AggregatorTestCase):
+    """El build por sub-sitios debe producir el mismo sitio que el build único"""
+
+    projects = 4
+
+    def sitemap_locs(self, output: str) -> set:
+        return set(re.findall(r'<loc>(.*?)</loc>', (self.site(output) / "sitemap.xml").read_text(encoding='utf-8')))
+
+    def test_sharded_build_matches_single_build(self):
+        single = self.aggregate("single", build=True, reproducible=True)
+        sharded = self.aggregate("sharded", build=True, reproducible=True, sharded_build=True)
+        self.assertEqual(sorted(single.manifest), sorted(sharded.manifest))
+
+        self.assertEqual(
+            (self.site("single") / "tags.json").read_text(encoding='utf-8'),
+            (self.site("sharded") / "tags.json").read_text(encoding='utf-8'),
+        )
+        self.assertTrue(self.tags_export("sharded")['mappings'])
+
+        pages = sorted(path.relative_to(self.site("single")) for path in self.site("single").rglob("*.html"))
+        sharded_pages = sorted(path.relative_to(self.site("sharded")) for path in self.site("sharded").rglob("*.html"))
+        self.assertEqual(pages, sharded_pages)
+        for rel in pages:
+            self.assertEqual((self.site("single") / rel).read_bytes(), (self.site("sharded") / rel).read_bytes(),
+                             str(rel))
+
+        self.assertEqual(self.search_docs("single"), self.search_docs("sharded"))
+        self.assertEqual(self.sitemap_locs("single"), self.sitemap_locs("sharded"))
+
+    def shard_builds(self, output: str) -> dict:
+        shards_dir = self.tmp / output / ".docs-aggregator" / "build-shards"
+        return {path.name: (path / "site" / "sitemap.xml").stat().st_mtime_ns for path in shards_dir.iterdir()}
+
+    def test_incremental_sharded_build_rebuilds_changed_categories(self):
+        self.aggregate("sharded", build=True, reproducible=True, sharded_build=True, incremental=True)
+        before = self.shard_builds("sharded")
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": TAGGED_PAGE})
+
+        self.aggregate("sharded", build=True, reproducible=True, sharded_build=True, incremental=True)
+        self.aggregate("single", build=True, reproducible=True)
+
+        after = self.shard_builds("sharded")
+        rebuilt = sorted(shard for shard in after if after[shard] != before.get(shard))
+        self.assertEqual(len(after), self.projects + 1)
+        self.assertEqual(rebuilt, ["cat-001-categor-a-1", "core"])
+        self.assertEqual(self.tags_export("single"), self.tags_export("sharded"))
+        self.assertEqual(self.search_docs("single"), self.search_docs("sharded"))
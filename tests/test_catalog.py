@@ -0,0 +1,106 @@
+"""Catálogo de proyectos: normalización, índices y catalog.json"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import AggregatorTestCase, aggregate_docs, read_json
+
+
+def config(slug: str, priority: int = 50, **aggregator) -> dict:
+    return {
+        'project': {'name': f"Proyecto {slug}", 'slug': slug},
+        'aggregator': dict(aggregator, priority=priority),
+    }
+
+
+class CatalogEntryTest(unittest.TestCase):
+    """Valores por defecto y normalización de un docs.yaml"""
+
+    def test_defaults(self):
+        entry = aggregate_docs.CatalogEntry.from_config({'project': {'name': "A", 'slug': "a"}})
+
+        self.assertEqual(entry, aggregate_docs.CatalogEntry(slug="a", name="A"))
+        self.assertEqual((entry.status, entry.category, entry.priority, entry.version),
+                         ('development', 'General', 50, '0.0.0'))
+
+    def test_normalization(self):
+        entry = aggregate_docs.CatalogEntry.from_config({
+            'project': {'name': "A", 'slug': "a", 'version': 2.1,
+                        'technologies': [{'name': "Python", 'version': 3.11}, "Docker", {'version': 1}]},
+            'aggregator': {'tags': ["x", 7], 'featured': 1},
+            'documentation': {'structure': [
+                {'title': "Guía", 'source': "docs/guide", 'type': "directory"},
+                {'title': "Cambios", 'source': "CHANGELOG.md", 'icon': "📝"},
+            ]},
+        })
+
+        self.assertEqual(entry.version, "2.1")
+        self.assertEqual(entry.technologies, (("Python", "3.11"), ("Docker", None), ("Unknown", "1")))
+        self.assertEqual(entry.tags, ("x", "7"))
+        self.assertIs(entry.featured, True)
+        self.assertEqual([section.nav_target for section in entry.sections], ["guide/index.md", "CHANGELOG.md"])
+        self.assertEqual(entry.sections[0].icon, '📄')
+
+
+class ProjectCatalogTest(unittest.TestCase):
+    """Índices ordenados por prioridad y serialización"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="catalog-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.catalog = aggregate_docs.ProjectCatalog.from_projects([
+            config("c", 10, category="Web", tags=["ui"]),
+            config("a", 90, category="Datos", tags=["ui", "etl"], featured=True),
+            config("b", 90, category="Web"),
+            dict(config("d", 10, category="Datos", featured=True), project={'name': "D", 'slug': "d", 'status': "beta"}),
+        ])
+
+    def slugs(self, entries) -> list:
+        return [entry.slug for entry in entries]
+
+    def test_indexes(self):
+        self.assertEqual(self.slugs(self.catalog), ["a", "b", "d", "c"])
+        self.assertEqual(len(self.catalog), 4)
+        self.assertEqual(list(self.catalog.by_category), ["Datos", "Web"])
+        self.assertEqual({key: self.slugs(value) for key, value in self.catalog.by_category.items()},
+                         {"Datos": ["a", "d"], "Web": ["b", "c"]})
+        self.assertEqual({key: self.slugs(value) for key, value in self.catalog.by_status.items()},
+                         {"development": ["a", "b", "c"], "beta": ["d"]})
+        self.assertEqual({key: self.slugs(value) for key, value in self.catalog.by_tag.items()},
+                         {"ui": ["a", "c"], "etl": ["a"]})
+        self.assertEqual(self.slugs(self.catalog.featured), ["a", "d"])
+        self.assertEqual(self.catalog.by_slug["d"].name, "D")
+
+    def test_save_and_load(self):
+        path = self.tmp / "catalog.json"
+
+        self.assertTrue(self.catalog.save(path))
+        self.assertFalse(self.catalog.save(path))
+
+        loaded = aggregate_docs.ProjectCatalog.load(path)
+        self.assertEqual(loaded.entries, self.catalog.entries)
+        self.assertEqual(read_json(path)['indexes']['featured'], ["a", "d"])
+
+    def test_load_rejects_other_versions(self):
+        path = self.tmp / "catalog.json"
+        self.assertIsNone(aggregate_docs.ProjectCatalog.load(path))
+        path.write_text('{"version": 0, "projects": []}', encoding='utf-8')
+        self.assertIsNone(aggregate_docs.ProjectCatalog.load(path))
+
+
+class CatalogOutputTest(AggregatorTestCase):
+    """La agregación publica catalog.json y la navegación sigue su orden"""
+
+    def test_catalog_json_and_nav(self):
+        aggregator = self.aggregate()
+
+        catalog = read_json(self.docs_dir() / "proyectos" / "catalog.json")
+        self.assertEqual([project['slug'] for project in catalog['projects']], ["p0002", "p0001", "p0000"])
+        self.assertEqual(catalog['indexes']['featured'], ["p0000"])
+        self.assertEqual(catalog['indexes']['tag']['benchmark'], ["p0002", "p0001", "p0000"])
+        self.assertEqual(aggregate_docs.ProjectCatalog.load(self.docs_dir() / "proyectos" / "catalog.json").entries,
+                         aggregator.catalog.entries)
+        categories = [next(iter(item)) for item in aggregator.generate_projects_nav()[3:]]
+        self.assertEqual(categories, ["📁 Categoría 2", "📁 Categoría 1", "📁 Categoría 0"])
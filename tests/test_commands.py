@@ -0,0 +1,73 @@
+"""Subprocesos con límite de tiempo, plazo total y reintentos con backoff"""
+
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import aggregate_docs
+
+# Falla (código 3) hasta la tercera ejecución; el contador vive en un archivo
+FLAKY = """
+import sys
+from pathlib import Path
+counter = Path(sys.argv[1])
+count = int(counter.read_text()) + 1 if counter.exists() else 1
+counter.write_text(str(count))
+print(count)
+sys.exit(0 if count >= 3 else 3)
+"""
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+class RunCommandTest(unittest.TestCase):
+    """run_command devuelve los fallos y timeouts como resultado, sin excepciones"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="run-command-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.counter = self.tmp / "counter"
+
+    def flaky(self, **options):
+        return aggregate_docs.run_command([sys.executable, "-c", FLAKY, str(self.counter)], backoff=0.01, **options)
+
+    def test_timeout_is_reported_as_exit_code(self):
+        start = time.monotonic()
+        result = aggregate_docs.run_command(SLEEP, timeout=0.5)
+
+        self.assertEqual(result.returncode, aggregate_docs.TIMEOUT_EXIT_CODE)
+        self.assertIn("sin respuesta", result.stderr)
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_retries_until_success(self):
+        cleanups = []
+        result = self.flaky(retries=3, before_retry=lambda: cleanups.append(True))
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout.strip(), "3")
+        self.assertEqual(len(cleanups), 2)
+
+    def test_gives_up_after_retries(self):
+        result = self.flaky(retries=1)
+
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual(self.counter.read_text(), "2")
+
+    def test_deadline_bounds_attempts(self):
+        start = time.monotonic()
+        result = aggregate_docs.run_command(SLEEP, timeout=60, retries=5, deadline=time.monotonic() + 0.5)
+
+        self.assertEqual(result.returncode, aggregate_docs.TIMEOUT_EXIT_CODE)
+        self.assertLess(time.monotonic() - start, 10)
+
+        expired = self.flaky(deadline=time.monotonic() - 1)
+        self.assertEqual(expired.returncode, aggregate_docs.TIMEOUT_EXIT_CODE)
+        self.assertFalse(self.counter.exists())
+
+    def test_input_is_passed_on_stdin(self):
+        result = aggregate_docs.run_command([sys.executable, "-c", "import sys; print(sys.stdin.read().upper())"],
+                                            input="hola")
+        self.assertEqual(result.stdout.strip(), "HOLA")
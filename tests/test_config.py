@@ -0,0 +1,93 @@
+"""Validación de docs.yaml contra el esquema y caché de configuraciones"""
+
+import json
+import unittest
+
+from support import AggregatorTestCase, aggregate_docs, git, read_json
+
+
+class SchemaValidationTest(unittest.TestCase):
+    """Errores del validador compilado a partir de DOCS_SCHEMA"""
+
+    def config(self, **project) -> dict:
+        return {
+            'project': {'name': "Proyecto", 'slug': "proyecto", **project},
+            'documentation': {'structure': [{'title': "Guía", 'source': "docs/guide", 'type': "directory"}]},
+        }
+
+    def test_valid_config_has_no_errors(self):
+        config = self.config(version=2, technologies=["Docker", {'name': "Python", 'version': 3.11}])
+        self.assertEqual(aggregate_docs.validate_docs_config(config), [])
+
+    def test_errors_name_the_field(self):
+        config = self.config(slug="../fuera", extra=True)
+        config['documentation']['structure'].append({'title': "Fuera", 'source': "../secreto", 'type': "enlace"})
+        del config['project']['name']
+        config['aggregator'] = {'priority': True}
+
+        self.assertEqual(sorted(aggregate_docs.validate_docs_config(config)), sorted([
+            "project.name: campo requerido faltante",
+            "project.slug: valor '../fuera' no válido",
+            "project.extra: campo desconocido",
+            "documentation.structure[1].source: valor '../secreto' no válido",
+            "documentation.structure[1].type: valor 'enlace' no permitido (file, directory)",
+            "aggregator.priority: se esperaba int, se obtuvo bool",
+        ]))
+
+    def test_fingerprint_follows_schema(self):
+        schema = {'type': dict, 'properties': {'name': {'type': (str, int)}}}
+        changed = {'type': dict, 'properties': {'name': {'type': str}}}
+
+        self.assertEqual(aggregate_docs.schema_fingerprint(schema), aggregate_docs.schema_fingerprint(dict(schema)))
+        self.assertNotEqual(aggregate_docs.schema_fingerprint(schema), aggregate_docs.schema_fingerprint(changed))
+
+
+class ConfigCacheTest(AggregatorTestCase):
+    """configs.json se reutiliza por SHA del blob solo con el mismo esquema"""
+
+    def cache_path(self):
+        return self.tmp / "out" / ".docs-aggregator" / "configs.json"
+
+    def poison_cache(self, slug: str, schema: str):
+        """Sustituir el resultado guardado del docs.yaml de `slug` por uno inválido"""
+        config_hash = git(self.repo, "rev-parse", f"origin/docs/{slug}:docs.yaml")
+        cache = read_json(self.cache_path())
+        cache['configs'][config_hash] = {'config': None, 'errors': ["error de la caché"]}
+        cache['schema'] = schema
+        self.cache_path().write_text(json.dumps(cache), encoding='utf-8')
+
+    def test_cache_records_schema_and_used_configs(self):
+        self.aggregate()
+
+        cache = read_json(self.cache_path())
+        self.assertEqual(cache['schema'], aggregate_docs.DOCS_SCHEMA_FINGERPRINT)
+        self.assertEqual(sorted(cache['configs']), sorted(
+            git(self.repo, "rev-parse", f"origin/docs/p{number:04d}:docs.yaml") for number in range(self.projects)
+        ))
+
+    def test_cached_result_is_reused(self):
+        self.aggregate()
+        self.poison_cache("p0001", aggregate_docs.DOCS_SCHEMA_FINGERPRINT)
+
+        aggregator = self.aggregate(force=True)
+
+        self.assertEqual(list(aggregator.stale_slugs), ["p0001"])
+
+    def test_cache_from_another_schema_is_dropped(self):
+        self.aggregate()
+        self.poison_cache("p0001", "otro-esquema")
+
+        aggregator = self.aggregate(force=True)
+
+        self.assertFalse(aggregator.stale_slugs)
+        self.assertEqual(aggregator.changed_slugs, {"p0000", "p0001", "p0002"})
+        self.assertEqual(read_json(self.cache_path())['schema'], aggregate_docs.DOCS_SCHEMA_FINGERPRINT)
+
+    def test_cache_without_schema_is_dropped(self):
+        self.aggregate()
+        config_hash = git(self.repo, "rev-parse", "origin/docs/p0001:docs.yaml")
+        self.cache_path().write_text(json.dumps({config_hash: {'config': None, 'errors': ["viejo"]}}), encoding='utf-8')
+
+        aggregator = self.aggregate(force=True)
+
+        self.assertFalse(aggregator.stale_slugs)
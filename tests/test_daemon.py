@@ -0,0 +1,218 @@
+"""Modo daemon: eventos de actualización, endpoint HTTP y traza por lote"""
+
+import sys
+import json
+import time
+import signal
+import socket
+import threading
+import unittest
+import subprocess
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from support import (AggregatorTestCase, SCRIPTS_DIR, aggregate_docs, benchmark_aggregate, commit_files, git,
+                     read_json, requires_mkdocs)
+
+
+def wait_for(condition, timeout: float = 120.0, interval: float = 0.2):
+    """Esperar a que condition() devuelva un valor verdadero y devolverlo"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(interval)
+    raise AssertionError("se agotó la espera")
+
+
+def free_address() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+class UpdateEventsTest(unittest.TestCase):
+    """Agrupación y debounce de los eventos del modo daemon"""
+
+    def test_repeated_events_are_coalesced(self):
+        events = aggregate_docs.UpdateEvents(debounce=0.05, max_delay=1.0)
+        for _ in range(3):
+            events.add("docs/p0000")
+        events.add("docs/p0001")
+
+        self.assertEqual(events.take(timeout=0.0), [])
+        ready = []
+        deadline = time.monotonic() + 2.0
+        while len(ready) < 2 and time.monotonic() < deadline:
+            ready.extend(events.take(timeout=0.5))
+
+        self.assertEqual(ready, ["docs/p0000", "docs/p0001"])
+        snapshot = events.snapshot()
+        self.assertEqual(snapshot['received'], 4)
+        self.assertEqual(snapshot['coalesced'], 2)
+        self.assertEqual(snapshot['batches'], 1)
+        self.assertEqual(snapshot['pending'], [])
+
+    def test_key_waits_for_quiet_period(self):
+        events = aggregate_docs.UpdateEvents(debounce=0.2, max_delay=5.0)
+        events.add("docs/p0000")
+        time.sleep(0.1)
+        events.add("docs/p0000")
+
+        start = time.monotonic()
+        self.assertEqual(events.take(timeout=0.05), [])
+        self.assertEqual(events.take(timeout=1.0), ["docs/p0000"])
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_continuous_burst_is_bounded_by_max_delay(self):
+        events = aggregate_docs.UpdateEvents(debounce=0.1, max_delay=0.3)
+        stop = threading.Event()
+
+        def burst():
+            while not stop.is_set():
+                events.add("docs/p0000")
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=burst)
+        start = time.monotonic()
+        thread.start()
+        try:
+            ready = []
+            while not ready and time.monotonic() - start < 3.0:
+                ready = events.take(timeout=0.5)
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertEqual(ready, ["docs/p0000"])
+        self.assertLess(time.monotonic() - start, 1.5)
+
+
+class EventEndpointTest(unittest.TestCase):
+    """POST /events y GET /status del daemon, y --send-event como cliente"""
+
+    def setUp(self):
+        self.events = aggregate_docs.UpdateEvents(debounce=60, max_delay=60)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), aggregate_docs.EventRequestHandler)
+        self.server.events = self.events
+        self.server.status = {'updates': 3, 'failures': 0, 'last_update': None}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.address = f"127.0.0.1:{self.server.server_address[1]}"
+
+    def request(self, path: str, body: bytes = None):
+        request = urllib.request.Request(f"http://{self.address}{path}", data=body,
+                                         method='GET' if body is None else 'POST')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_events_are_queued_by_key(self):
+        self.assertEqual(self.request("/events", b'{"ref": "refs/heads/docs/p0001"}'), (202, {'queued': "branch:docs/p0001"}))
+        self.assertEqual(self.request("/events/", b'{"slug": "p0002"}'), (202, {'queued': "slug:p0002"}))
+        self.assertEqual(self.request("/events", b'{"slug": "p0002"}')[0], 202)
+
+        status, body = self.request("/status")
+        self.assertEqual(status, 200)
+        self.assertEqual(body['pending'], ["branch:docs/p0001", "slug:p0002"])
+        self.assertEqual((body['received'], body['coalesced'], body['updates']), (3, 1, 3))
+
+    def test_invalid_requests_are_rejected(self):
+        self.assertEqual(self.request("/events", b'{no es json')[0], 400)
+        self.assertEqual(self.request("/events", b'{"otro": 1}')[0], 400)
+        self.assertEqual(self.request("/otra", b'{}')[0], 404)
+        self.assertEqual(self.request("/otra")[0], 404)
+        self.assertEqual(self.events.snapshot()['received'], 0)
+
+    def test_send_event(self):
+        for event in ("docs/p0001", "external:externo", "all", "p0002"):
+            self.assertTrue(aggregate_docs.send_event(self.address, event))
+
+        self.assertEqual(self.events.snapshot()['pending'],
+                         ["all", "branch:docs/p0001", "external:externo", "slug:p0002"])
+        self.assertFalse(aggregate_docs.send_event(free_address(), "all"))
+
+
+@requires_mkdocs
+class DaemonTest(AggregatorTestCase):
+    """Daemon real en un subproceso, alimentado con --send-event"""
+
+    def setUp(self):
+        super().setUp()
+        # Remoto origin del que el daemon hace fetch en cada lote
+        self.origin = self.tmp / "origin.git"
+        git(self.tmp, "init", "-q", "--bare", str(self.origin))
+        git(self.repo, "remote", "add", "origin", str(self.origin))
+        git(self.repo, "push", "-q", "origin", "refs/remotes/origin/docs/*:refs/heads/docs/*")
+        self.output = self.tmp / "out"
+        benchmark_aggregate.prepare_output(self.output)
+        self.address = free_address()
+        self.trace = self.tmp / "trace.json"
+
+    def cli(self, *args: str) -> list:
+        return [sys.executable, str(SCRIPTS_DIR / "aggregate_docs.py"), *args]
+
+    def start_daemon(self) -> subprocess.Popen:
+        daemon = subprocess.Popen(
+            self.cli("--mode", "branches", "--reader", "objects", "--base-dir", str(self.repo),
+                     "--output-dir", str(self.output), "--daemon", "--daemon-address", self.address,
+                     "--debounce", "0.1", "--trace", str(self.trace)),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        def stop():
+            daemon.send_signal(signal.SIGINT)
+            try:
+                daemon.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                daemon.kill()
+                daemon.wait()
+        self.addCleanup(stop)
+        return daemon
+
+    def status(self):
+        try:
+            with urllib.request.urlopen(f"http://{self.address}/status", timeout=5) as response:
+                return json.loads(response.read())
+        except OSError:
+            return None
+
+    def send(self, event: str):
+        subprocess.run(self.cli("--send-event", event, "--daemon-address", self.address),
+                       check=True, capture_output=True)
+
+    def spans(self) -> list:
+        try:
+            trace = read_json(self.trace)
+        except (OSError, ValueError):
+            return []
+        return [event for event in trace['traceEvents'] if event['ph'] == 'X']
+
+    def batch_traced(self, events: list):
+        return [span for span in self.spans() if span['name'] == 'update' and span['args']['events'] == events]
+
+    def test_batches_update_site_and_write_one_trace_each(self):
+        daemon = self.start_daemon()
+        wait_for(self.status)
+        self.assertIn('run', [span['name'] for span in self.spans()])
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": "# Página del daemon\n"})
+        git(self.repo, "push", "-q", "origin", "refs/heads/docs/p0001")
+
+        self.send("docs/p0001")
+        wait_for(lambda: self.batch_traced(["branch:docs/p0001"]))
+        self.send("p0002")
+        wait_for(lambda: self.batch_traced(["slug:p0002"]))
+
+        self.assertIsNone(daemon.poll())
+        self.assertEqual((self.status()['updates'], self.status()['failures']), (2, 0))
+        self.assertIn("# Página del daemon",
+                      (self.project_dir("p0001") / "guide" / "page-000.md").read_text(encoding='utf-8'))
+        # Cada lote reinicia la traza: solo queda el último, sin la agregación inicial ni el lote anterior
+        names = [span['name'] for span in self.spans()]
+        self.assertEqual(names.count('update'), 1)
+        self.assertNotIn('run', names)
@@ -0,0 +1,191 @@
+"""Importación de repositorios externos según import_strategy y update_schedule"""
+
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import yaml
+
+from support import aggregate_docs, git, read_json
+
+
+class ExternalTestCase(unittest.TestCase):
+    """Repositorios "remotos" locales en remotes/<owner>/<repo> y un agregador que los importa"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="external-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.config = self.tmp / "external_repos.yml"
+        self.output = self.tmp / "out"
+
+    def upstream(self, owner: str, repo: str, files: dict, message: str = "docs") -> Path:
+        """Crear (o actualizar) un repositorio remoto con un commit que escribe los archivos"""
+        path = self.tmp / "remotes" / owner / repo
+        if not path.exists():
+            git(self.tmp, "init", "-q", "-b", "main", str(path))
+        for rel, text in files.items():
+            (path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (path / rel).write_text(text, encoding='utf-8')
+        git(path, "add", "-A")
+        git(path, "commit", "-q", "-m", message)
+        return path
+
+    def configure(self, *repositories: dict):
+        self.config.write_text(yaml.safe_dump({'repositories': list(repositories)}), encoding='utf-8')
+
+    def aggregator(self, **options) -> 'aggregate_docs.DocumentationAggregator':
+        return aggregate_docs.DocumentationAggregator(
+            self.tmp, self.output,
+            external_config=self.config,
+            external_url_template=str(self.tmp / "remotes" / "{owner}" / "{repo}"),
+            **options
+        )
+
+    def import_external(self, **options) -> 'aggregate_docs.DocumentationAggregator':
+        aggregator = self.aggregator(**options)
+        aggregator.aggregate_from_external_repos()
+        return aggregator
+
+    def imported(self, slug: str) -> list:
+        root = self.output / "docs" / "docs" / "proyectos-externos" / slug
+        return sorted(path.relative_to(root).as_posix() for path in root.rglob("*") if path.is_file())
+
+    def state(self) -> dict:
+        return read_json(self.output / ".docs-aggregator" / "external.json")
+
+
+class ImportStrategyTest(ExternalTestCase):
+    """full_docs, readme_only y selective copian solo las rutas correspondientes"""
+
+    def setUp(self):
+        super().setUp()
+        self.upstream("acme", "tools", {
+            "README.md": "# Tools\n",
+            "CHANGELOG.md": "# Cambios\n",
+            "docs/guide.md": "# Guía\n",
+            "docs/api/index.md": "# API\n",
+            "src/main.py": "print(1)\n",
+        })
+
+    def test_strategies(self):
+        self.configure(
+            {'name': "Full", 'owner': "acme", 'repo': "tools", 'metadata': {'description': "Todo"}},
+            {'name': "Readme", 'owner': "acme", 'repo': "tools", 'import_strategy': "readme_only"},
+            {'name': "Selective", 'owner': "acme", 'repo': "tools", 'import_strategy': "selective",
+             'files': ["CHANGELOG.md", "docs/guide.md"]},
+        )
+
+        aggregator = self.import_external()
+
+        self.assertEqual([entry['slug'] for entry in aggregator.external_projects], ["full", "readme", "selective"])
+        self.assertEqual(self.imported("full"), ["docs/api/index.md", "docs/guide.md", "index.md"])
+        self.assertEqual(self.imported("readme"), ["index.md", "overview.md"])
+        self.assertEqual(self.imported("selective"), ["CHANGELOG.md", "guide.md", "index.md"])
+        self.assertEqual(aggregator.changed_external_slugs, {"full", "readme", "selective"})
+        index = (self.output / "docs" / "docs" / "proyectos-externos" / "full" / "index.md").read_text(encoding='utf-8')
+        self.assertIn("**Descripción:** Todo", index)
+        self.assertIn("- [docs/guide.md](./docs/guide.md)", index)
+
+    def test_full_docs_without_docs_dir_imports_readme(self):
+        self.configure({'name': "Full", 'owner': "acme", 'repo': "tools", 'docs_dir': "documentation"})
+
+        self.import_external()
+
+        self.assertEqual(self.imported("full"), ["index.md", "overview.md"])
+
+    def test_removed_upstream_files_are_pruned(self):
+        self.configure({'name': "Full", 'owner': "acme", 'repo': "tools"})
+        self.import_external()
+        path = self.tmp / "remotes" / "acme" / "tools"
+        git(path, "rm", "-q", "docs/guide.md")
+        git(path, "commit", "-q", "-m", "borrar guía")
+
+        self.import_external()
+
+        self.assertEqual(self.imported("full"), ["docs/api/index.md", "index.md"])
+        self.assertEqual(self.state()['full']['files'], ["docs/api/index.md", "index.md"])
+
+    def test_repository_removed_from_config_is_pruned(self):
+        self.configure({'name': "Full", 'owner': "acme", 'repo': "tools"},
+                       {'name': "Readme", 'owner': "acme", 'repo': "tools", 'import_strategy': "readme_only"})
+        self.import_external()
+        self.configure({'name': "Full", 'owner': "acme", 'repo': "tools"})
+
+        self.import_external()
+
+        self.assertEqual(sorted(self.state()), ["full"])
+        self.assertFalse((self.output / "docs" / "docs" / "proyectos-externos" / "readme").exists())
+
+
+class UpdateScheduleTest(ExternalTestCase):
+    """Solo se vuelve a importar un repositorio cuando expira su ventana de update_schedule"""
+
+    def setUp(self):
+        super().setUp()
+        self.upstream("acme", "tools", {"docs/guide.md": "# Guía\n"})
+        self.configure(
+            {'name': "Always", 'owner': "acme", 'repo': "tools"},
+            {'name': "Daily", 'owner': "acme", 'repo': "tools", 'update_schedule': "daily"},
+            {'name': "Manual", 'owner': "acme", 'repo': "tools", 'update_schedule': "manual"},
+        )
+        self.import_external()
+        self.upstream("acme", "tools", {"docs/guide.md": "# Guía nueva\n"})
+
+    def guide(self, slug: str) -> str:
+        path = self.output / "docs" / "docs" / "proyectos-externos" / slug / "docs" / "guide.md"
+        return path.read_text(encoding='utf-8')
+
+    def test_schedule_windows(self):
+        aggregator = self.import_external()
+
+        self.assertEqual(aggregator.changed_external_slugs, {"always"})
+        self.assertEqual(self.guide("always"), "# Guía nueva\n")
+        self.assertEqual(self.guide("daily"), "# Guía\n")
+        self.assertEqual(self.guide("manual"), "# Guía\n")
+        # Los que no tocaba importar siguen publicados con su estado anterior
+        self.assertEqual([entry['slug'] for entry in aggregator.external_projects], ["always", "daily", "manual"])
+
+    def test_expired_window_is_imported(self):
+        state_path = self.output / ".docs-aggregator" / "external.json"
+        state = self.state()
+        state['daily']['last_import'] = int(time.time()) - 25 * 3600
+        state['manual']['last_import'] = 0
+        state_path.write_text(json.dumps(state), encoding='utf-8')
+
+        aggregator = self.import_external()
+
+        self.assertEqual(aggregator.changed_external_slugs, {"always", "daily"})
+        self.assertEqual(self.guide("manual"), "# Guía\n")
+
+    def test_force_ignores_schedule(self):
+        aggregator = self.import_external(force=True)
+
+        self.assertEqual(aggregator.changed_external_slugs, {"always", "daily", "manual"})
+        self.assertEqual(self.guide("manual"), "# Guía nueva\n")
+
+    def test_unchanged_commit_is_not_rewritten(self):
+        self.import_external()
+        aggregator = self.import_external()
+
+        self.assertEqual(aggregator.changed_external_slugs, set())
+
+
+class FailedImportTest(ExternalTestCase):
+    """Si falla la actualización se sirve la importación anterior marcada como desactualizada"""
+
+    def test_unreachable_repository_serves_previous_import(self):
+        path = self.upstream("acme", "tools", {"docs/guide.md": "# Guía\n"})
+        self.configure({'name': "Tools", 'owner': "acme", 'repo': "tools"})
+        self.import_external()
+        shutil.rmtree(path)
+
+        aggregator = self.import_external(retries=0)
+
+        self.assertTrue(self.state()['tools']['stale'])
+        self.assertEqual(self.imported("tools"), ["docs/guide.md", "index.md"])
+        index = self.output / "docs" / "docs" / "proyectos-externos" / "tools" / "index.md"
+        self.assertIn("Contenido desactualizado", index.read_text(encoding='utf-8'))
+        self.assertEqual(aggregator.changed_external_slugs, {"tools"})
@@ -0,0 +1,77 @@
+"""Lectura de ramas desde la base de objetos con un único `git cat-file --batch`"""
+
+import gc
+import warnings
+import subprocess
+
+from support import AggregatorTestCase, aggregate_docs, commit_files, git
+
+
+class GitObjectReaderTest(AggregatorTestCase):
+    """GitObjectReader y GitTreePath frente a lo que devuelve git"""
+
+    projects = 1
+
+    def setUp(self):
+        super().setUp()
+        commit_files(self.repo, "p0000", {"docs/guide/ñandú.md": "# Ñandú\n"})
+        # Symlink dentro del árbol: no se materializa
+        env = {'GIT_INDEX_FILE': str(self.repo / ".git" / "test-index")}
+        git(self.repo, "read-tree", "origin/docs/p0000", env=env)
+        target = git(self.repo, "hash-object", "-w", "--stdin", input="index.md")
+        git(self.repo, "update-index", "--add", "--cacheinfo", f"120000,{target},docs/guide/enlace.md", env=env)
+        commit = git(self.repo, "commit-tree", git(self.repo, "write-tree", env=env), "-p", "origin/docs/p0000",
+                     "-m", "symlink")
+        git(self.repo, "update-ref", "refs/remotes/origin/docs/p0000", commit)
+
+        self.reader = aggregate_docs.GitObjectReader(self.repo)
+        self.addCleanup(self.reader.close)
+        self.root = aggregate_docs.GitTreePath(self.reader, "origin/docs/p0000")
+
+    def test_read_objects(self):
+        sha = git(self.repo, "rev-parse", "origin/docs/p0000:docs.yaml")
+
+        content = subprocess.run(["git", "cat-file", "blob", sha], cwd=self.repo, capture_output=True, check=True).stdout
+
+        self.assertEqual(self.reader.read_object(sha), (sha, 'blob', content))
+        self.assertIsNone(self.reader.read_object("0" * 40))
+        self.assertEqual(self.reader.read_object("origin/docs/p0000")[1], 'commit')
+        names = [entry[3] for entry in self.reader.read_tree("origin/docs/p0000^{tree}")]
+        self.assertEqual(names, git(self.repo, "ls-tree", "--name-only", "origin/docs/p0000").splitlines())
+        self.assertIsNone(self.reader.read_tree(sha))
+
+    def test_tree_paths(self):
+        guide = self.root / "docs" / "guide"
+
+        self.assertTrue(guide.is_dir())
+        self.assertFalse(guide.is_file())
+        self.assertTrue((guide / "ñandú.md").is_file())
+        self.assertEqual((guide / "ñandú.md").read_text(), "# Ñandú\n")
+        self.assertEqual((self.root / "docs/./guide/../guide/index.md").read_bytes(), (guide / "index.md").read_bytes())
+        self.assertFalse((self.root / "../fuera").exists())
+        self.assertFalse((guide / "falta.md").exists())
+        with self.assertRaises(FileNotFoundError):
+            guide.read_bytes()
+
+    def test_walk_files_skips_symlinks(self):
+        files = dict((self.root / "docs").walk_files())
+
+        self.assertEqual(sorted(files), ["guide/index.md", "guide/page-000.md", "guide/page-001.md", "guide/ñandú.md"])
+        self.assertEqual(files["guide/index.md"], git(self.repo, "rev-parse", "origin/docs/p0000:docs/guide/index.md"))
+
+    def test_object_sha_matches_blob_hash(self):
+        path = self.tmp / "docs.yaml"
+        path.write_bytes((self.root / "docs.yaml").read_bytes())
+
+        self.assertEqual((self.root / "docs.yaml").object_sha(), aggregate_docs.git_blob_hash(path))
+
+    def test_close_releases_the_process(self):
+        self.reader.read_object("origin/docs/p0000")
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.reader.close()
+            gc.collect()
+
+        self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+        # Se puede volver a usar: el proceso se relanza
+        self.assertEqual(self.reader.read_object("origin/docs/p0000")[1], 'commit')
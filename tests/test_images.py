@@ -0,0 +1,126 @@
+"""Recompresión de PNG y caché de la etapa de optimización de imágenes"""
+
+import zlib
+import shutil
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import aggregate_docs
+
+
+def png(width: int, height: int, idat_chunks: int = 2, extra: tuple = ()) -> bytes:
+    """PNG RGB sin comprimir (nivel 0) con los IDAT repartidos en varios chunks"""
+    def chunk(chunk_type: bytes, body: bytes) -> bytes:
+        return struct.pack('>I', len(body)) + chunk_type + body + struct.pack('>I', zlib.crc32(chunk_type + body))
+
+    rows = b''.join(b'\x00' + bytes((x * 7 + y * 3) % 256 for x in range(width * 3)) for y in range(height))
+    data = zlib.compress(rows, 0)
+    size = -(-len(data) // idat_chunks)
+    parts = [data[i:i + size] for i in range(0, len(data), size)]
+    return (
+        aggregate_docs.PNG_SIGNATURE
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'tEXt', b'Comment\x00prueba')
+        + b''.join(chunk(chunk_type, body) for chunk_type, body in extra)
+        + b''.join(chunk(b'IDAT', part) for part in parts)
+        + chunk(b'IEND', b'')
+    )
+
+
+class RecompressPngTest(unittest.TestCase):
+    """La recompresión de PNG no cambia los píxeles ni los chunks auxiliares"""
+
+    def decoded(self, data: bytes):
+        chunks = list(aggregate_docs.png_chunks(data))
+        pixels = zlib.decompress(b''.join(body for chunk_type, body in chunks if chunk_type == b'IDAT'))
+        others = [(chunk_type, body) for chunk_type, body in chunks if chunk_type not in (b'IDAT', b'iDOT')]
+        return pixels, others
+
+    def test_recompression_is_lossless(self):
+        original = png(64, 48, idat_chunks=3, extra=[(b'iDOT', b'\x00' * 28)])
+        recompressed = aggregate_docs.recompress_png(original)
+
+        self.assertLess(len(recompressed), len(original))
+        self.assertEqual(self.decoded(recompressed), self.decoded(original))
+        types = [chunk_type for chunk_type, _ in aggregate_docs.png_chunks(recompressed)]
+        self.assertEqual(types, [b'IHDR', b'tEXt', b'IDAT', b'IEND'])
+
+    def test_chunk_crcs_are_valid(self):
+        recompressed = aggregate_docs.recompress_png(png(32, 32))
+        pos = len(aggregate_docs.PNG_SIGNATURE)
+        while pos < len(recompressed):
+            length, = struct.unpack('>I', recompressed[pos:pos + 4])
+            body = recompressed[pos + 4:pos + 8 + length]
+            crc, = struct.unpack('>I', recompressed[pos + 8 + length:pos + 12 + length])
+            self.assertEqual(crc, zlib.crc32(body))
+            pos += 12 + length
+        self.assertEqual(pos, len(recompressed))
+
+    def test_already_compressed_and_invalid_data_are_kept(self):
+        recompressed = aggregate_docs.recompress_png(png(32, 32))
+        self.assertEqual(aggregate_docs.recompress_png(recompressed), recompressed)
+        self.assertEqual(aggregate_docs.recompress_png(b'no es un png'), b'no es un png')
+
+
+class ImageOptimizerTest(unittest.TestCase):
+    """Las imágenes se optimizan una vez por contenido y se reutilizan entre ejecuciones"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="images-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.site = self.tmp / "site"
+        self.cache = self.tmp / "cache"
+        (self.site / "p0000").mkdir(parents=True)
+        (self.site / "p0001").mkdir(parents=True)
+        self.original = png(48, 32)
+        for rel, data in (("p0000/a.png", self.original), ("p0001/a.png", self.original), ("p0001/b.png", png(20, 20))):
+            (self.site / rel).write_bytes(data)
+
+    def optimize(self, jobs: int = 1) -> 'aggregate_docs.ImageOptimizer':
+        optimizer = aggregate_docs.ImageOptimizer(self.cache, jobs=jobs)
+        optimizer.optimize([self.site, self.tmp / "no-existe"])
+        return optimizer
+
+    def images(self) -> dict:
+        return {path.relative_to(self.site).as_posix(): path.read_bytes() for path in sorted(self.site.rglob("*.png"))}
+
+    def test_duplicates_are_processed_once(self):
+        stats = self.optimize().stats
+
+        self.assertEqual((stats['images'], stats['processed'], stats['cached']), (3, 2, 0))
+        images = self.images()
+        self.assertEqual(images["p0000/a.png"], images["p0001/a.png"])
+        self.assertEqual(images["p0000/a.png"], aggregate_docs.recompress_png(self.original))
+        self.assertEqual(stats['bytes_saved'], 2 * (len(self.original) - len(images["p0000/a.png"])) + (
+            len(png(20, 20)) - len(images["p0001/b.png"])))
+
+    def test_next_run_uses_the_cache(self):
+        self.optimize()
+        optimized = self.images()
+
+        stats = self.optimize().stats
+
+        self.assertEqual((stats['images'], stats['processed'], stats['cached']), (3, 0, 3))
+        self.assertEqual(self.images(), optimized)
+
+    def test_unpublished_images_leave_the_cache(self):
+        self.optimize()
+        (self.site / "p0001" / "b.png").unlink()
+
+        optimizer = self.optimize()
+
+        self.assertEqual(len(optimizer.index), 1)
+        self.assertEqual(len(list(self.cache.glob("*.png"))), 1)
+
+    def test_parallel_matches_serial(self):
+        self.optimize(jobs=2)
+        parallel = self.images()
+        shutil.rmtree(self.cache)
+        for rel, data in parallel.items():
+            (self.site / rel).write_bytes(self.original if rel.endswith("a.png") else png(20, 20))
+
+        self.optimize(jobs=1)
+
+        self.assertEqual(self.images(), parallel)
@@ -0,0 +1,122 @@
+"""Comprobación de enlaces, anclas y navegación antes del build"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import AggregatorTestCase, aggregate_docs, commit_files
+
+PAGES = {
+    "index.md": "# Inicio\n\n[Proyecto A](proyectos/a/index.md)\n",
+    "proyectos/a/index.md": """---
+title: "[no](es-un-enlace.md)"
+---
+# Proyecto A
+
+Ver la [guía](guide.md#instalacion), la [API](api/) y el [logo](img/logo.png).
+
+[ref]: guide.md#uso-avanzado
+[externo](https://example.com/falta.md) y [correo](mailto:a@example.com)
+
+```markdown
+[dentro de un bloque](no-existe.md)
+```
+
+`[en línea](tampoco.md)`
+""",
+    "proyectos/a/guide.md": """# Guía
+
+## Instalación
+
+Uso avanzado
+------------
+
+## Instalación
+
+<a id="manual"></a>
+## Configuración {#config}
+
+[Arriba](#guia) [Repetida](#instalacion_1) [Manual](#manual) [Config](#config)
+""",
+    "proyectos/a/api/index.md": "# API\n",
+    "proyectos/a/img/logo.png": "",
+    "proyectos/b/index.md": """# Proyecto B
+
+[roto](missing.md) [ancla](../a/guide.md#no-existe) [fuera](../../../fuera.md)
+<img src="img/falta.png">
+
+[carpeta](vacia/)
+""",
+    "proyectos/b/vacia/dato.txt": "",
+}
+
+
+class LinkCheckerTest(unittest.TestCase):
+    """Errores y avisos agrupados por proyecto sobre un árbol docs/ de prueba"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="links-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        for rel, text in PAGES.items():
+            path = self.tmp / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding='utf-8')
+
+    def check(self, nav=None):
+        return aggregate_docs.LinkChecker(self.tmp, jobs=2).check(nav)
+
+    def test_broken_links_are_errors_per_project(self):
+        errors, warnings = self.check()
+
+        self.assertEqual(sorted(errors), ["proyectos/b"])
+        self.assertEqual(errors["proyectos/b"], [
+            "proyectos/b/index.md:3: enlace roto missing.md",
+            "proyectos/b/index.md:3: el enlace ../../../fuera.md apunta fuera de la documentación",
+            "proyectos/b/index.md:4: enlace roto img/falta.png",
+        ])
+        self.assertEqual(warnings, {"proyectos/b": [
+            "proyectos/b/index.md:3: el ancla #no-existe no existe en proyectos/a/guide.md",
+            "proyectos/b/index.md:6: el enlace vacia/ apunta a un directorio sin index.md",
+        ]})
+
+    def test_heading_anchors(self):
+        checker = aggregate_docs.LinkChecker(self.tmp)
+        checker.check()
+
+        self.assertEqual(checker.anchors["proyectos/a/guide.md"],
+                         {"guia", "instalacion", "uso-avanzado", "instalacion_1", "manual", "config"})
+        self.assertEqual(aggregate_docs.LinkChecker.slugify("¿Qué es `docs.yaml`? [Ver](x.md)"), "que-es-docsyaml-ver")
+
+    def test_nav_targets(self):
+        nav = [
+            {'Inicio': 'index.md'},
+            {'Proyectos': [{'A': 'proyectos/a/index.md'}, {'C': 'proyectos/c/index.md'}, 'proyectos/b/index.md']},
+            {'Repositorio': 'https://example.com'},
+        ]
+
+        errors, _ = self.check(nav)
+
+        self.assertEqual(errors["proyectos/c"], ["navegación 'C': la página proyectos/c/index.md no existe"])
+
+    def test_group(self):
+        group = aggregate_docs.LinkChecker.group
+        self.assertEqual(group("proyectos/a/guide/x.md"), "proyectos/a")
+        self.assertEqual(group("proyectos-externos/tools/index.md"), "proyectos-externos/tools")
+        self.assertEqual(group("index.md"), "raíz")
+        self.assertEqual(group("tags/index.md"), "tags")
+
+
+class ValidationTest(AggregatorTestCase):
+    """Un enlace roto en un proyecto hace fallar la validación antes del build"""
+
+    def test_broken_link_fails_validation(self):
+        aggregator = self.aggregate()
+        self.assertTrue(aggregator.validate_documentation())
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": "# Página\n\n[roto](no-existe.md)\n"})
+
+        aggregator = self.aggregator()
+        aggregator.build_mkdocs_site = lambda: self.fail("no debe construirse un sitio con enlaces rotos")
+        aggregator.run()
+
+        self.assertFalse(aggregator.validate_documentation())
@@ -0,0 +1,115 @@
+"""Manifiesto de agregación: ramas sin cambios, poda y versión anterior servida"""
+
+import json
+
+from support import AggregatorTestCase, commit_files, git
+
+
+class UnchangedBranchTest(AggregatorTestCase):
+    """Las ramas en el mismo commit (o árbol) que en el manifiesto no se vuelven a copiar"""
+
+    def project_files(self, output: str = "out") -> dict:
+        return {
+            path.relative_to(self.docs_dir(output)).as_posix(): path.read_bytes()
+            for slug in self.manifest(output)
+            for path in sorted(self.project_dir(slug, output).rglob("*.md"))
+        }
+
+    def test_unchanged_branches_are_skipped(self):
+        self.aggregate()
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": "# Página nueva\n"})
+
+        aggregator = self.aggregate()
+
+        self.assertEqual(aggregator.changed_slugs, {"p0001"})
+        self.assertEqual(
+            (self.project_dir("p0001") / "guide" / "page-000.md").read_text(encoding='utf-8').splitlines()[-1],
+            "# Página nueva"
+        )
+        self.assertEqual(self.manifest()["p0001"]['sha'], git(self.repo, "rev-parse", "origin/docs/p0001"))
+
+    def test_force_reaggregates_everything(self):
+        self.aggregate()
+        aggregator = self.aggregate(force=True)
+        self.assertEqual(aggregator.changed_slugs, {"p0000", "p0001", "p0002"})
+
+    def test_missing_output_file_reaggregates_branch(self):
+        self.aggregate()
+        (self.project_dir("p0002") / "guide" / "page-001.md").unlink()
+
+        aggregator = self.aggregate()
+
+        self.assertEqual(aggregator.changed_slugs, {"p0002"})
+        self.assertTrue((self.project_dir("p0002") / "guide" / "page-001.md").is_file())
+
+    def test_same_tree_new_commit_matches_cold_run(self):
+        self.aggregate(reproducible=True)
+        tree = git(self.repo, "rev-parse", "origin/docs/p0000^{tree}")
+        commit = git(self.repo, "commit-tree", tree, "-p", "origin/docs/p0000", "-m", "rebase",
+                     env={'GIT_COMMITTER_DATE': "2027-01-15T08:00:00Z"})
+        git(self.repo, "update-ref", "refs/remotes/origin/docs/p0000", commit)
+        git(self.repo, "update-ref", "refs/heads/docs/p0000", commit)
+
+        warm = self.aggregate(reproducible=True)
+        self.aggregate("cold", reproducible=True)
+
+        self.assertEqual(warm.changed_slugs, {"p0000"})
+        self.assertEqual(self.manifest()["p0000"]['sha'], commit)
+        self.assertIn("2027-01-15 08:00:00", (self.project_dir("p0000") / "index.md").read_text(encoding='utf-8'))
+        self.assertEqual(self.project_files(), self.project_files("cold"))
+
+
+class ManifestPruneTest(AggregatorTestCase):
+    """Poda de proyectos y versión anterior servida cuando falla una rama"""
+
+    def test_slug_rename_prunes_old_slug(self):
+        self.aggregate()
+        config = json.loads(git(self.repo, "show", "origin/docs/p0001:docs.yaml"))
+        config['project']['slug'] = "p0001b"
+        commit_files(self.repo, "p0001", {"docs.yaml": json.dumps(config, ensure_ascii=False)})
+
+        aggregator = self.aggregate()
+
+        manifest = self.manifest()
+        self.assertIn("p0001b", manifest)
+        self.assertNotIn("p0001", manifest)
+        self.assertNotIn("p0001", aggregator.stale_slugs)
+        self.assertFalse(self.project_dir("p0001").exists())
+        self.assertTrue((self.project_dir("p0001b") / "index.md").is_file())
+
+    def test_invalid_config_serves_previous_version(self):
+        self.aggregate()
+        previous = self.manifest()["p0001"]
+        commit_files(self.repo, "p0001", {"docs.yaml": "project: {slug: ["})
+
+        aggregator = self.aggregate()
+
+        entry = self.manifest()["p0001"]
+        self.assertTrue(entry.get('stale'))
+        self.assertEqual(entry['sha'], previous['sha'])
+        self.assertIn("p0001", aggregator.stale_slugs)
+        for rel in previous['files']:
+            self.assertTrue((self.project_dir("p0001") / rel).is_file(), rel)
+
+    def test_incomplete_previous_version_is_pruned(self):
+        self.aggregate()
+        previous = self.manifest()["p0001"]
+        missing = next(rel for rel in previous['files'] if rel != "index.md")
+        (self.project_dir("p0001") / missing).unlink()
+        commit_files(self.repo, "p0001", {"docs.yaml": "project: {slug: ["})
+
+        aggregator = self.aggregate()
+
+        self.assertNotIn("p0001", self.manifest())
+        self.assertNotIn("p0001", aggregator.stale_slugs)
+        self.assertFalse(self.project_dir("p0001").exists())
+
+    def test_deleted_branch_is_pruned(self):
+        self.aggregate()
+        git(self.repo, "update-ref", "-d", "refs/remotes/origin/docs/p0002")
+        git(self.repo, "update-ref", "-d", "refs/heads/docs/p0002")
+
+        self.aggregate()
+
+        self.assertNotIn("p0002", self.manifest())
+        self.assertFalse(self.project_dir("p0002").exists())
@@ -0,0 +1,142 @@
+"""Transform de páginas Markdown al copiarlas: enlaces, assets y front matter"""
+
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from support import AggregatorTestCase, aggregate_docs, commit_files
+
+PATHS = [("docs/guide", "guide"), ("CHANGELOG.md", "CHANGELOG.md"), ("assets", "assets")]
+ASSETS = {"assets/logo.png": "ab/abc.png"}
+FRONT_MATTER = {'project': "a", 'project_name': "Proyecto A", 'tags': ["x", "y"]}
+
+PAGE = """# Intro
+
+Ver [cambios](../../CHANGELOG.md), [otra](page.md#sec) y [fuera](https://example.com/a.md).
+![logo](../../assets/logo.png) <img src="../../assets/logo.png" alt="logo">
+Sin origen conocido: [raíz](../../README.md) y `[código](../../CHANGELOG.md)`.
+
+```markdown
+[bloque](../../CHANGELOG.md)
+```
+
+[ref]: ../../CHANGELOG.md?v=1#top
+"""
+
+EXPECTED = """---
+project: a
+project_name: Proyecto A
+tags:
+- x
+- y
+---
+# Intro
+
+Ver [cambios](../CHANGELOG.md), [otra](page.md#sec) y [fuera](https://example.com/a.md).
+![logo](../../../_assets/ab/abc.png) <img src="../../../_assets/ab/abc.png" alt="logo">
+Sin origen conocido: [raíz](../../README.md) y `[código](../../CHANGELOG.md)`.
+
+```markdown
+[bloque](../../CHANGELOG.md)
+```
+
+[ref]: ../CHANGELOG.md?v=1#top
+"""
+
+
+class MarkdownTransformerTest(unittest.TestCase):
+    """Reescritura de una página de proyecto en una sola pasada"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="markdown-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.docs = self.tmp / "docs"
+        self.project = self.docs / "proyectos" / "a"
+
+    def transformer(self, front_matter=FRONT_MATTER, cache=None) -> 'aggregate_docs.MarkdownTransformer':
+        return aggregate_docs.MarkdownTransformer(self.project, self.docs, self.docs / "_assets", ASSETS,
+                                                  PATHS, front_matter, cache=cache)
+
+    def transform(self, text: str, page: str = "guide/intro.md", **options) -> str:
+        return self.transformer(**options)(self.project / page, text.encode('utf-8')).decode('utf-8')
+
+    def test_links_and_assets_are_rewritten(self):
+        transformer = self.transformer()
+
+        output = transformer(self.project / "guide" / "intro.md", PAGE.encode('utf-8')).decode('utf-8')
+
+        self.assertEqual(output, EXPECTED)
+        self.assertEqual(transformer.referenced, {"assets/logo.png"})
+        self.assertEqual(transformer.page_meta(self.project / "guide" / "intro.md"), {'assets': ["assets/logo.png"]})
+
+    def test_asset_from_project_root_page(self):
+        output = self.transform("![logo](assets/logo.png)\n", page="CHANGELOG.md", front_matter={})
+        self.assertEqual(output, "![logo](../../_assets/ab/abc.png)\n")
+
+    def test_existing_front_matter_is_merged(self):
+        output = self.transform("---\ntitle: Intro\ntags: [z, x]\nproject: otro\n---\n# Intro\n")
+
+        self.assertEqual(output, "---\ntitle: Intro\ntags:\n- z\n- x\n- y\nproject: otro\n"
+                                 "project_name: Proyecto A\n---\n# Intro\n")
+
+    def test_invalid_front_matter_is_kept(self):
+        text = "---\n- una\n- lista\n---\n[cambios](../../CHANGELOG.md)\n"
+
+        self.assertEqual(self.transform(text), "---\n- una\n- lista\n---\n[cambios](../CHANGELOG.md)\n")
+
+    def test_binary_pages_are_not_touched(self):
+        data = b"\xff\xfe[cambios](../../CHANGELOG.md)"
+        self.assertEqual(self.transformer()(self.project / "guide" / "intro.md", data), data)
+
+    def test_unchanged_pages_come_from_the_cache(self):
+        source = self.tmp / "intro.md"
+        source.write_text(PAGE, encoding='utf-8')
+        dest = self.project / "guide" / "intro.md"
+        cache = aggregate_docs.TransformCache(self.tmp / "markdown.json", self.docs)
+        synchronizer = aggregate_docs.FileSynchronizer()
+        synchronizer.sync_file(source, dest, transform=self.transformer(cache=cache))
+        cache.save()
+
+        cache = aggregate_docs.TransformCache(self.tmp / "markdown.json", self.docs)
+        cached = self.transformer(cache=cache)
+        synchronizer.sync_file(source, dest, transform=cached)
+
+        self.assertEqual(cached.stats, {'transformed': 0, 'cached': 1})
+        self.assertEqual(cached.referenced, {"assets/logo.png"})
+        self.assertEqual(dest.read_text(encoding='utf-8'), EXPECTED)
+
+        # Otro contexto (front matter distinto) invalida la entrada
+        changed = self.transformer(front_matter=dict(FRONT_MATTER, project_name="Otro"), cache=cache)
+        synchronizer.sync_file(source, dest, transform=changed)
+        self.assertEqual(changed.stats, {'transformed': 1, 'cached': 0})
+        self.assertIn("project_name: Otro", dest.read_text(encoding='utf-8'))
+
+
+class ProjectTransformTest(AggregatorTestCase):
+    """Las páginas agregadas enlazan a las rutas de proyectos/<slug>/ y al almacén de assets"""
+
+    assets = 1
+
+    def test_repository_relative_links(self):
+        commit_files(self.repo, "p0001", {"docs/guide/page-001.md": (
+            "# Página\n\n[Cambios](../../CHANGELOG.md)\n\n![Imagen](../../assets/image-00.png)\n"
+        )})
+
+        self.aggregate()
+
+        text = (self.project_dir("p0001") / "guide" / "page-001.md").read_text(encoding='utf-8')
+        self.assertIn("project: p0001\nproject_name: Proyecto p0001\ntags:\n- tag-1\n- benchmark\n---\n", text)
+        self.assertIn("[Cambios](../CHANGELOG.md)", text)
+        self.assertRegex(text, r"!\[Imagen\]\(\.\./\.\./\.\./_assets/[0-9a-f]{2}/[0-9a-f]{40}\.png\)")
+
+    def test_second_run_reuses_transformed_pages(self):
+        self.aggregate()
+        with unittest.mock.patch.object(aggregate_docs.MarkdownTransformer, '__call__', autospec=True,
+                                        side_effect=aggregate_docs.MarkdownTransformer.__call__) as transform:
+            commit_files(self.repo, "p0001", {"docs/guide/page-001.md": "# Página cambiada\n"})
+            self.aggregate()
+
+        self.assertEqual([call.args[1].relative_to(self.docs_dir()).as_posix() for call in transform.call_args_list],
+                         ["proyectos/p0001/guide/page-001.md"])
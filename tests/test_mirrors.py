@@ -0,0 +1,93 @@
+"""Caché de mirrors bare: fetch incremental de una rama y desalojo LRU"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import aggregate_docs, git, read_json
+
+
+class MirrorCacheTest(unittest.TestCase):
+    """Mirrors de repositorios locales en una caché temporal"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="mirror-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.cache_dir = self.tmp / "mirrors"
+
+    def upstream(self, name: str, text: str = "# Docs\n") -> str:
+        """Crear (o actualizar) un repositorio con ramas main y otra; devuelve su URL"""
+        path = self.tmp / "remotes" / name
+        if not path.exists():
+            git(self.tmp, "init", "-q", "-b", "main", str(path))
+        (path / "README.md").write_text(text, encoding='utf-8')
+        git(path, "add", "-A")
+        git(path, "commit", "-q", "-m", text)
+        git(path, "branch", "-f", "otra")
+        return str(path)
+
+    def cache(self, max_bytes: int = 1024 * 1024 * 1024) -> 'aggregate_docs.MirrorCache':
+        return aggregate_docs.MirrorCache(self.cache_dir, max_bytes)
+
+    def test_fetch_updates_only_the_branch(self):
+        url = self.upstream("tools")
+        cache = self.cache()
+
+        sha = cache.fetch(url, "main")
+
+        mirror = cache.path_for(url)
+        self.assertEqual(sha, git(Path(url), "rev-parse", "main"))
+        self.assertEqual(git(mirror, "for-each-ref", "--format=%(refname)").splitlines(), ["refs/heads/main"])
+        self.assertEqual(git(mirror, "rev-parse", "--is-bare-repository"), "true")
+
+        self.upstream("tools", "# Docs nuevos\n")
+        self.assertEqual(cache.fetch(url, "main"), git(Path(url), "rev-parse", "main"))
+        self.assertEqual(git(mirror, "show", "main:README.md"), "# Docs nuevos")
+
+    def test_failed_fetch_returns_none(self):
+        cache = self.cache()
+
+        self.assertIsNone(cache.fetch(str(self.tmp / "remotes" / "missing"), "main"))
+        url = self.upstream("tools")
+        self.assertIsNone(cache.fetch(url, "no-existe"))
+
+    def test_index_is_persisted(self):
+        url = self.upstream("tools")
+        cache = self.cache()
+        cache.fetch(url, "main")
+        cache.save()
+
+        index = read_json(self.cache_dir / "index.json")
+
+        self.assertEqual(index[cache.path_for(url).name]['url'], url)
+        self.assertEqual(self.cache().index, index)
+
+    def test_same_repository_name_from_different_urls(self):
+        cache = self.cache()
+        self.assertNotEqual(cache.path_for("https://a.example/x/tools.git"), cache.path_for("https://b.example/y/tools"))
+        self.assertTrue(cache.path_for("https://a.example/x/tools.git").name.startswith("tools-"))
+        self.assertIs(cache.lock("https://a.example/x/tools.git"), cache.lock("https://a.example/x/tools.git"))
+
+    def test_evicts_unconfigured_mirrors_by_lru(self):
+        urls = [self.upstream(name) for name in ("old", "recent", "configured")]
+        cache = self.cache()
+        for url in urls:
+            cache.fetch(url, "main")
+        cache.index[cache.path_for(urls[0]).name]['last_used'] = 1
+        cache.index[cache.path_for(urls[1]).name]['last_used'] = 2
+        sizes = {url: sum(f.stat().st_size for f in cache.path_for(url).rglob('*') if f.is_file()) for url in urls}
+
+        # Cabe todo menos el mirror más antiguo sin configurar
+        cache.max_bytes = sizes[urls[1]] + sizes[urls[2]]
+        cache.evict([urls[2]])
+
+        self.assertFalse(cache.path_for(urls[0]).exists())
+        self.assertTrue(cache.path_for(urls[1]).exists())
+        self.assertNotIn(cache.path_for(urls[0]).name, cache.index)
+
+        # Los mirrors configurados nunca se desalojan, aunque se supere el límite
+        cache.max_bytes = 0
+        cache.evict([urls[2]])
+
+        self.assertEqual(sorted(path.name for path in self.cache_dir.glob("*.git")), [cache.path_for(urls[2]).name])
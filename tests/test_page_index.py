@@ -0,0 +1,126 @@
+"""Índice SQLite de páginas y páginas de etiquetas y cambios recientes"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import AggregatorTestCase, aggregate_docs, commit_files, git
+
+PAGE = """---
+title: Título del front matter
+tags: [redes, Seguridad]
+---
+# Cabecera principal
+
+Dos palabras.
+
+```python
+# no es una cabecera
+codigo = 1
+```
+
+## Sección `con código`
+"""
+
+
+class PageIndexTest(unittest.TestCase):
+    """Actualización incremental y consultas del índice"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="page-index-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.docs_dir = self.tmp / "docs"
+        self.index = aggregate_docs.PageIndex(self.tmp / "pages.sqlite", self.docs_dir)
+        self.addCleanup(self.index.close)
+
+    def write(self, rel: str, text: str, mtime: int = 1_700_000_000):
+        path = self.docs_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        os.utime(path, (mtime, mtime))
+
+    def test_parse_page(self):
+        meta = aggregate_docs.PageIndex.parse_page(PAGE, "fallback")
+
+        self.assertEqual(meta['title'], "Título del front matter")
+        self.assertEqual(meta['headings'], [(1, "Cabecera principal"), (2, "Sección `con código`")])
+        self.assertEqual(meta['tags'], ["Seguridad", "redes"])
+        self.assertEqual(meta['word_count'], 5)
+        self.assertEqual(aggregate_docs.PageIndex.parse_page("Sin cabeceras\n", "pagina")['title'], "pagina")
+
+    def test_update_is_incremental(self):
+        sources = {'proyectos/a': ("sha-1", 100), 'proyectos/b': ("sha-2", 200)}
+        self.write("proyectos/a/index.md", PAGE)
+        self.write("proyectos/a/guia.md", "# Guía\n")
+        self.write("proyectos/b/index.md", "# B\n")
+
+        self.assertEqual(self.index.update(sources, now=999),
+                         {'unchanged': 0, 'touched': 0, 'updated': 3, 'removed': 0})
+
+        self.write("proyectos/a/guia.md", "# Guía\n", mtime=1_700_000_100)
+        self.write("proyectos/b/index.md", "# B modificada\n", mtime=1_700_000_100)
+        (self.docs_dir / "proyectos/a/index.md").unlink()
+        stats = self.index.update({'proyectos/a': ("sha-1", 100), 'proyectos/b': ("sha-3", 300)}, now=999)
+
+        self.assertEqual(stats, {'unchanged': 0, 'touched': 1, 'updated': 1, 'removed': 1})
+        self.assertEqual(self.index.recent(10), [
+            ("proyectos/b/index.md", "B modificada", "proyectos/b", 300),
+            ("proyectos/a/guia.md", "Guía", "proyectos/a", 100),
+        ])
+        self.assertEqual(self.index.pages_by_tag(), {})
+        self.assertEqual(self.index.project_stats(), {'proyectos/a': (1, 1), 'proyectos/b': (1, 2)})
+
+    def test_pages_by_tag(self):
+        self.write("proyectos/a/index.md", PAGE)
+        self.write("proyectos/b/index.md", "---\ntags: redes\n---\n# B\n")
+        self.index.update({}, now=5)
+
+        self.assertEqual(self.index.pages_by_tag(), {
+            'redes': [("proyectos/a/index.md", "Título del front matter", "proyectos/a"),
+                      ("proyectos/b/index.md", "B", "proyectos/b")],
+            'Seguridad': [("proyectos/a/index.md", "Título del front matter", "proyectos/a")],
+        })
+        self.assertEqual([row[3] for row in self.index.recent(10)], [5, 5])
+
+    def test_follow_sources_dates_unchanged_pages(self):
+        self.write("proyectos/a/index.md", "# A\n")
+        self.index.update({'proyectos/a': ("sha-1", 100)}, now=999)
+
+        self.index.update({'proyectos/a': ("sha-2", 200)}, now=999)
+        self.assertEqual(self.index.recent(1)[0][3], 100)
+        self.index.update({'proyectos/a': ("sha-2", 200)}, now=999, follow_sources=True)
+        self.assertEqual(self.index.recent(1)[0][3], 200)
+
+
+class PageReportsTest(AggregatorTestCase):
+    """Páginas generadas a partir del índice"""
+
+    def generated(self, output: str = "out") -> dict:
+        projects_dir = self.docs_dir(output) / "proyectos"
+        return {name: (projects_dir / name).read_text(encoding='utf-8') for name in ("etiquetas.md", "recientes.md")}
+
+    def test_reports_list_tags_and_recent_pages(self):
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": "---\ntags: [propia]\n---\n# Con etiqueta\n"},
+                     date="2030-01-01T00:00:00Z")
+        self.aggregate()
+
+        reports = self.generated()
+        self.assertIn("propia", reports["etiquetas.md"])
+        self.assertIn("p0001/guide/page-000.md", reports["etiquetas.md"])
+        first = next(line for line in reports["recientes.md"].splitlines() if line.startswith("| ["))
+        self.assertIn("p0001/", first)
+
+    def test_reproducible_reports_do_not_depend_on_history(self):
+        self.aggregate(reproducible=True)
+        commit_files(self.repo, "p0000", {"docs/guide/page-000.md": "# Página nueva\n"}, date="2030-01-01T00:00:00Z")
+        tree = git(self.repo, "rev-parse", "origin/docs/p0001^{tree}")
+        commit = git(self.repo, "commit-tree", tree, "-p", "origin/docs/p0001", "-m", "rebase",
+                     env={'GIT_COMMITTER_DATE': "2029-01-01T00:00:00Z"})
+        git(self.repo, "update-ref", "refs/remotes/origin/docs/p0001", commit)
+
+        self.aggregate(reproducible=True)
+        self.aggregate("cold", reproducible=True)
+
+        self.assertEqual(self.generated(), self.generated("cold"))
@@ -0,0 +1,91 @@
+"""Pipeline de etapas en streaming con colas acotadas"""
+
+import time
+import threading
+import unittest
+
+from support import aggregate_docs
+
+
+class StagePipelineTest(unittest.TestCase):
+    """Orden de las etapas, descartes, errores y límite de elementos en vuelo"""
+
+    def test_items_go_through_every_stage(self):
+        pipeline = aggregate_docs.StagePipeline(queue_size=2)
+        pipeline.add_stage("doble", lambda item: item * 2, workers=3)
+        pipeline.add_stage("texto", lambda item: f"<{item}>", workers=2)
+
+        results = pipeline.run(range(50))
+
+        self.assertEqual(sorted(results), sorted(f"<{item * 2}>" for item in range(50)))
+
+    def test_none_drops_the_item(self):
+        pipeline = aggregate_docs.StagePipeline()
+        pipeline.add_stage("pares", lambda item: item if item % 2 == 0 else None)
+        pipeline.add_stage("identidad", lambda item: item)
+
+        self.assertEqual(sorted(pipeline.run(range(10))), [0, 2, 4, 6, 8])
+
+    def test_errors_are_reported_and_do_not_stop_the_pipeline(self):
+        errors = []
+
+        def parse(item):
+            if item == 3:
+                raise ValueError("mal")
+            return item
+
+        pipeline = aggregate_docs.StagePipeline()
+        pipeline.add_stage("parse", parse, workers=2)
+        pipeline.add_stage("copia", lambda item: item)
+
+        results = pipeline.run(range(6), on_error=lambda stage, item, error: errors.append((stage, item, str(error))))
+
+        self.assertEqual(sorted(results), [0, 1, 2, 4, 5])
+        self.assertEqual(errors, [("parse", 3, "mal")])
+
+    def test_later_stage_starts_before_earlier_stage_finishes(self):
+        first_seen = threading.Event()
+        waits = []
+
+        def fetch(item):
+            if item > 0:
+                # Solo sigue cuando la última etapa ya ha recibido el primer elemento
+                waits.append(first_seen.wait(5))
+            return item
+
+        def generate(item):
+            first_seen.set()
+            return item
+
+        pipeline = aggregate_docs.StagePipeline()
+        pipeline.add_stage("fetch", fetch)
+        pipeline.add_stage("generate", generate)
+
+        self.assertEqual(sorted(pipeline.run(range(3))), [0, 1, 2])
+        self.assertEqual(waits, [True, True])
+
+    def test_bounded_queues_limit_items_in_flight(self):
+        release = threading.Event()
+        consumed, results = [], []
+
+        def items():
+            for item in range(100):
+                consumed.append(item)
+                yield item
+
+        def slow(item):
+            release.wait(10)
+            return item
+
+        pipeline = aggregate_docs.StagePipeline(queue_size=2)
+        pipeline.add_stage("rápida", lambda item: item)
+        pipeline.add_stage("lenta", slow)
+        runner = threading.Thread(target=lambda: results.extend(pipeline.run(items())))
+        runner.start()
+        time.sleep(0.3)
+
+        # Dos colas de 2, un elemento en cada etapa y el que espera para entrar
+        self.assertLessEqual(len(consumed), 7)
+        release.set()
+        runner.join(10)
+        self.assertEqual(sorted(results), list(range(100)))
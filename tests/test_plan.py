@@ -0,0 +1,55 @@
+"""--plan: clasificación de ramas frente al manifiesto sin tocar la salida"""
+
+import json
+import unittest.mock
+
+from support import AggregatorTestCase, aggregate_docs, commit_files, git
+
+
+class PlanTest(AggregatorTestCase):
+    """--plan frente a un manifiesto conocido"""
+
+    def test_plan_classifies_branches(self):
+        self.aggregate()
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": "# Página nueva\n"})
+        git(self.repo, "update-ref", "-d", "refs/remotes/origin/docs/p0002")
+        git(self.repo, "update-ref", "refs/remotes/origin/docs/p0009", "refs/remotes/origin/docs/p0000")
+        # Commit nuevo con el mismo árbol: cuenta como sin cambios
+        tree = git(self.repo, "rev-parse", "origin/docs/p0000^{tree}")
+        commit = git(self.repo, "commit-tree", tree, "-p", "origin/docs/p0000", "-m", "rebase")
+        git(self.repo, "update-ref", "refs/remotes/origin/docs/p0000", commit)
+
+        aggregator = aggregate_docs.DocumentationAggregator(self.repo, self.tmp / "out")
+        plan = aggregator.plan()
+
+        self.assertEqual(plan['added'], ["docs/p0009"])
+        self.assertEqual(plan['changed'], ["docs/p0001"])
+        self.assertEqual(plan['files'], {"docs/p0001": 1})
+        self.assertEqual(plan['removed'], ["docs/p0002 (p0002)"])
+        self.assertEqual(plan['unchanged'], ["docs/p0000"])
+
+    def test_plan_does_not_touch_output(self):
+        self.aggregate()
+        state_dir = self.tmp / "out" / ".docs-aggregator"
+        before = {path: path.stat().st_mtime_ns for path in state_dir.rglob("*")}
+
+        aggregate_docs.DocumentationAggregator(self.repo, self.tmp / "out").plan()
+
+        self.assertEqual(before, {path: path.stat().st_mtime_ns for path in state_dir.rglob("*")})
+
+    def test_changed_files_use_one_diff_tree(self):
+        self.aggregate()
+        commit_files(self.repo, "p0000", {"docs/guide/page-000.md": "# A\n", "docs/guide/page-001.md": "# B\n"})
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": "# C\n"})
+        commit_files(self.repo, "p0002", {"docs/guide/page-000.md": "# D\n"})
+        manifest_path = self.tmp / "out" / ".docs-aggregator" / "manifest.json"
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        # Árbol registrado que ya no existe en el repositorio
+        manifest['projects']["p0002"]['tree'] = "0" * 40
+        manifest_path.write_text(json.dumps(manifest), encoding='utf-8')
+
+        with unittest.mock.patch.object(aggregate_docs, 'run_command', wraps=aggregate_docs.run_command) as run:
+            plan = aggregate_docs.DocumentationAggregator(self.repo, self.tmp / "out").plan()
+
+        self.assertEqual(plan['files'], {"docs/p0000": 2, "docs/p0001": 1, "docs/p0002": None})
+        self.assertEqual([call.args[0][:2] for call in run.call_args_list].count(["git", "diff-tree"]), 1)
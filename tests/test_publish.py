@@ -0,0 +1,149 @@
+"""Publicación incremental del sitio en un directorio o en una rama Git"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from support import GIT_IDENTITY, AggregatorTestCase, aggregate_docs, git, requires_mkdocs
+
+OLD_MTIME = 1_600_000_000
+
+
+class PublisherTestCase(unittest.TestCase):
+    """Sitio construido de prueba y su directorio de estado"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="publish-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.site = self.tmp / "site"
+        self.write("index.html", "<h1>Inicio</h1>")
+        self.write("proyectos/a/index.html", "<h1>A</h1>")
+        self.write("proyectos/b/index.html", "<h1>B</h1>")
+        self.write("assets/app.js", "console.log(1);")
+        self.publisher = aggregate_docs.SitePublisher(self.site, self.tmp / "state")
+
+    def write(self, rel: str, text: str):
+        path = self.site / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+
+    def change_site(self):
+        """Un archivo modificado, uno nuevo y un directorio eliminado"""
+        self.write("index.html", "<h1>Inicio nuevo</h1>")
+        self.write("proyectos/c/index.html", "<h1>C</h1>")
+        shutil.rmtree(self.site / "proyectos" / "b")
+
+    def site_files(self, root: Path) -> dict:
+        return {path.relative_to(root).as_posix(): path.read_bytes()
+                for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+class PublishToDirTest(PublisherTestCase):
+    """Solo se copian o eliminan los archivos que difieren de lo último publicado"""
+
+    def test_publishes_only_changes(self):
+        target = self.tmp / "public"
+        self.publisher.publish_to_dir(target)
+        self.assertEqual(self.site_files(target), self.site_files(self.site))
+        for path in target.rglob("*"):
+            os.utime(path, (OLD_MTIME, OLD_MTIME))
+        self.change_site()
+
+        self.publisher.publish_to_dir(target)
+
+        self.assertEqual(self.site_files(target), self.site_files(self.site))
+        self.assertFalse((target / "proyectos" / "b").exists())
+        self.assertEqual((target / "assets" / "app.js").stat().st_mtime, OLD_MTIME)
+        self.assertEqual((target / "proyectos" / "a" / "index.html").stat().st_mtime, OLD_MTIME)
+
+    def test_manifest_reuses_hashes_of_unchanged_files(self):
+        self.publisher.build_manifest()
+        with unittest.mock.patch.object(aggregate_docs, 'git_blob_hash', wraps=aggregate_docs.git_blob_hash) as hashed:
+            self.write("index.html", "<h1>Otro</h1>")
+            manifest = self.publisher.build_manifest()
+
+        self.assertEqual([call.args[0].name for call in hashed.call_args_list], ["index.html"])
+        self.assertEqual(manifest["index.html"], aggregate_docs.git_blob_hash(self.site / "index.html"))
+
+    def test_diff(self):
+        self.assertEqual(
+            aggregate_docs.SitePublisher.diff({'a': "1", 'b': "2", 'c': "3"}, {'a': "1", 'b': "9", 'd': "4"}),
+            (["d"], ["b"], ["c"])
+        )
+
+
+class PublishToBranchTest(PublisherTestCase):
+    """Cada publicación es un commit sobre la rama con solo los blobs cambiados"""
+
+    def setUp(self):
+        super().setUp()
+        self.repo = self.tmp / "repo"
+        git(self.tmp, "init", "-q", str(self.repo))
+        patcher = unittest.mock.patch.dict(os.environ, GIT_IDENTITY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tree(self, ref: str = "gh-pages") -> dict:
+        """{ruta: sha del blob} de una revisión"""
+        entries = {}
+        for line in git(self.repo, "ls-tree", "-r", ref).splitlines():
+            meta, rel = line.split("\t")
+            entries[rel] = meta.split()[2]
+        return entries
+
+    def site_hashes(self) -> dict:
+        return {rel: aggregate_docs.git_blob_hash(self.site / rel) for rel in self.site_files(self.site)}
+
+    def test_commits_only_changes(self):
+        self.publisher.publish_to_branch(self.repo, "gh-pages", "primera")
+        first = git(self.repo, "rev-parse", "gh-pages")
+        self.assertEqual(self.tree(), self.site_hashes())
+        self.change_site()
+
+        self.publisher.publish_to_branch(self.repo, "gh-pages", "segunda")
+
+        self.assertEqual(git(self.repo, "rev-parse", "gh-pages^"), first)
+        self.assertEqual(self.tree(), self.site_hashes())
+        self.assertEqual(
+            git(self.repo, "diff-tree", "-r", "--no-renames", "--name-status", first, "gh-pages").splitlines(),
+            ["M\tindex.html", "D\tproyectos/b/index.html", "A\tproyectos/c/index.html"]
+        )
+        self.assertEqual(git(self.repo, "log", "-1", "--format=%s", "gh-pages"), "segunda")
+
+    def test_unchanged_site_makes_no_commit(self):
+        self.publisher.publish_to_branch(self.repo, "gh-pages", "primera")
+        first = git(self.repo, "rev-parse", "gh-pages")
+
+        self.assertTrue(self.publisher.publish_to_branch(self.repo, "gh-pages", "segunda"))
+
+        self.assertEqual(git(self.repo, "rev-parse", "gh-pages"), first)
+
+    def test_continues_from_remote_branch(self):
+        self.publisher.publish_to_branch(self.repo, "gh-pages", "remota")
+        remote = git(self.repo, "rev-parse", "gh-pages")
+        git(self.repo, "update-ref", "refs/remotes/origin/gh-pages", remote)
+        git(self.repo, "update-ref", "-d", "refs/heads/gh-pages")
+        self.write("index.html", "<h1>Local</h1>")
+
+        self.publisher.publish_to_branch(self.repo, "gh-pages", "local")
+
+        self.assertEqual(git(self.repo, "rev-parse", "gh-pages^"), remote)
+        self.assertEqual(self.tree(), self.site_hashes())
+
+
+@requires_mkdocs
+class PublishSiteTest(AggregatorTestCase):
+    """--publish-branch tras un build deja en la rama el sitio construido"""
+
+    def test_publish_built_site_to_branch(self):
+        aggregator = self.aggregate(build=True)
+        with unittest.mock.patch.dict(os.environ, GIT_IDENTITY):
+            self.assertTrue(aggregator.publish_site(publish_branch="gh-pages"))
+
+        files = git(self.repo, "ls-tree", "-r", "--name-only", "gh-pages").splitlines()
+        site = sorted(path.relative_to(self.site()).as_posix() for path in self.site().rglob("*") if path.is_file())
+        self.assertEqual(sorted(files), site)
+        self.assertIn("proyectos/p0001/guide/page-000/index.html", files)
@@ -0,0 +1,139 @@
+"""Índice de búsqueda fragmentado por proyecto con filtros de prefijos"""
+
+import json
+import base64
+import shutil
+import unittest
+import subprocess
+
+from support import AggregatorTestCase, aggregate_docs, commit_files, read_json, requires_mkdocs
+
+# Ejecuta SEARCH_WORKER_JS con el worker de Material en un contexto de worker
+# simulado: fetch lee de site/ y se registran las URL pedidas
+WORKER_HARNESS = r"""
+const fs = require('fs'), vm = require('vm'), path = require('path');
+const [site, worker, ...queries] = process.argv.slice(2);
+const origin = 'http://sitio/';
+const fetched = [], replies = [];
+const events = new EventTarget();
+const context = {console, URL, TextEncoder, Promise, Object, Array, String, Math, JSON, Uint8Array,
+                 setTimeout, atob, MessageEvent, EventTarget, Event};
+context.self = context;
+context.addEventListener = events.addEventListener.bind(events);
+context.dispatchEvent = events.dispatchEvent.bind(events);
+context.postMessage = message => replies.push(message);
+context.fetch = async url => {
+  const file = path.join(site, new URL(String(url)).pathname);
+  fetched.push(new URL(String(url)).pathname.slice(1));
+  return {ok: fs.existsSync(file), json: async () => JSON.parse(fs.readFileSync(file))};
+};
+context.location = {href: origin + 'assets/javascripts/workers/search-shards.js?worker='
+  + encodeURIComponent(origin + worker) + '&manifest=' + encodeURIComponent(origin + 'search/manifest.json')};
+context.importScripts = (...urls) => urls.forEach(url => {
+  const file = path.join(site, new URL(url, context.location.href).pathname);
+  vm.runInContext(fs.readFileSync(file, 'utf8'), context, {filename: file});
+});
+vm.createContext(context);
+console.warn = () => {};
+vm.runInContext(fs.readFileSync(path.join(site, 'assets/javascripts/workers/search-shards.js'), 'utf8'), context);
+
+const send = data => events.dispatchEvent(new MessageEvent('message', {data}));
+const index = JSON.parse(fs.readFileSync(path.join(site, 'search/search_index.json')));
+send({type: 0, data: {config: index.config, docs: index.docs, options: {suggest: false}}});
+(async () => {
+  const results = [];
+  for (const query of queries) {
+    const before = fetched.length, count = replies.length;
+    send({type: 2, data: query});
+    while (!replies.slice(count).some(reply => reply.type === 3)) await new Promise(r => setTimeout(r, 10));
+    const items = replies.slice(count).find(reply => reply.type === 3).data.items;
+    results.push({fetched: fetched.slice(before), locations: items.map(group => group[0].location)});
+  }
+  process.stdout.write(JSON.stringify({ready: replies.filter(reply => reply.type === 1).length, results}));
+})();
+"""
+
+
+class SearchFilterTest(unittest.TestCase):
+    """Filtro de Bloom de prefijos de un fragmento"""
+
+    @staticmethod
+    def contains(search_filter: dict, key: str) -> bool:
+        mask = base64.b64decode(search_filter['filter'])
+        return all(mask[bit >> 3] >> (bit & 7) & 1 for bit in aggregate_docs.search_filter_bits(key, search_filter['bits']))
+
+    def test_terms_ignore_case_and_accents(self):
+        self.assertEqual(aggregate_docs.search_terms("Guía de INSTALACIÓN_rápida"), {"guia", "de", "instalacion", "rapida"})
+
+    def test_filter_contains_prefixes_of_title_text_and_tags(self):
+        search_filter = aggregate_docs.search_prefix_filter([
+            {'title': "Configuración", 'text': "<p>Despliegue &amp; <code>kubernetes</code></p>", 'tags': ["Redes"]},
+        ])
+
+        self.assertEqual(search_filter['bits'] % 8, 0)
+        for key in ("c", "co", "con", "d", "des", "kub", "red"):
+            self.assertTrue(self.contains(search_filter, key), key)
+        for key in ("amp", "cod", "zzq", "xyz"):
+            self.assertFalse(self.contains(search_filter, key), key)
+
+
+@requires_mkdocs
+class SearchShardsTest(AggregatorTestCase):
+    """Fragmentos, manifiesto y worker de búsqueda del sitio construido"""
+
+    projects = 4
+
+    def search_manifest(self) -> dict:
+        return read_json(self.site() / "search" / "manifest.json")
+
+    def test_search_shards_follow_catalog(self):
+        self.aggregate(build=True)
+        search_dir = self.site() / "search"
+
+        self.assertEqual(read_json(search_dir / "search_index.json")['docs'], [])
+        self.assertTrue(self.search_docs())
+        ids = [shard['id'] for shard in self.search_manifest()['shards']]
+        self.assertEqual(ids, [f"proyectos/p{number:04d}" for number in range(self.projects)] + ["sitio"])
+        for shard in self.search_manifest()['shards']:
+            self.assertTrue((search_dir / shard['file']).is_file())
+            self.assertIn('filter', shard)
+        self.assertTrue((self.site() / "assets" / "javascripts" / "workers" / "search-shards.js").is_file())
+
+    def test_incremental_build_rewrites_only_changed_shards(self):
+        self.aggregate(build=True, incremental=True)
+        before = {shard['id']: shard['file'] for shard in self.search_manifest()['shards']}
+        commit_files(self.repo, "p0001", {"docs/guide/page-000.md": "# Página nueva\n\nZorroplateado\n"})
+
+        self.aggregate(build=True, incremental=True)
+
+        after = {shard['id']: shard['file'] for shard in self.search_manifest()['shards']}
+        self.assertNotEqual(after.pop("proyectos/p0001"), before.pop("proyectos/p0001"))
+        after.pop("sitio"), before.pop("sitio")
+        self.assertEqual(after, before)
+        self.assertTrue(any("Zorroplateado" in doc['text'] for doc in self.search_docs()))
+
+    @unittest.skipUnless(shutil.which("node"), "requiere node")
+    def test_worker_loads_only_matching_shards(self):
+        commit_files(self.repo, "p0002", {"docs/guide/page-000.md": "# Página\n\nZorroplateado escondido\n"})
+        self.aggregate(build=True)
+        worker = next((self.site() / "assets" / "javascripts" / "workers").glob("search.*.min.js"))
+        harness = self.tmp / "harness.js"
+        harness.write_text(WORKER_HARNESS, encoding='utf-8')
+
+        result = subprocess.run(
+            ["node", str(harness), str(self.site()), worker.relative_to(self.site()).as_posix(),
+             "zorroplateado", "zorroplateado", "texto"],
+            capture_output=True, text=True, timeout=60, check=True
+        )
+        output = json.loads(result.stdout)
+
+        shards = {shard['id']: f"search/{shard['file']}" for shard in self.search_manifest()['shards']}
+        first, repeated, common = output['results']
+        self.assertEqual(output['ready'], 1)
+        self.assertEqual(first['fetched'], ["search/manifest.json", shards["proyectos/p0002"]])
+        self.assertEqual(first['locations'], ["proyectos/p0002/guide/page-000/"])
+        self.assertEqual(repeated['fetched'], [])
+        self.assertEqual(sorted(common['fetched']), sorted(
+            file for shard_id, file in shards.items() if shard_id not in ("proyectos/p0002", "sitio")
+        ))
+        self.assertTrue(common['locations'])
@@ -0,0 +1,103 @@
+"""Copia por hash de contenido: los archivos sin cambios no se reescriben"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import AggregatorTestCase, aggregate_docs, commit_files
+
+OLD_MTIME = 1_600_000_000
+
+
+class FileSynchronizerTest(unittest.TestCase):
+    """sync_dir y sync_file desde archivos en disco"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="sync-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.source = self.tmp / "source"
+        self.dest = self.tmp / "dest"
+        self.write(self.source / "a.md", "# A\n")
+        self.write(self.source / "sub" / "b.md", "# B\n")
+        self.write(self.source / "sub" / "c.bin", "c" * 100)
+
+    @staticmethod
+    def write(path: Path, text: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+
+    def sync(self, **options) -> dict:
+        synchronizer = aggregate_docs.FileSynchronizer()
+        synchronizer.sync_dir(self.source, self.dest, **options)
+        return synchronizer.stats
+
+    def age_dest(self):
+        for path in self.dest.rglob("*"):
+            os.utime(path, (OLD_MTIME, OLD_MTIME))
+
+    def test_only_changed_files_are_written(self):
+        self.assertEqual(self.sync(), {'written': 3, 'unchanged': 0, 'removed': 0, 'bytes_written': 108})
+        self.age_dest()
+        self.write(self.source / "sub" / "b.md", "# b\n")
+
+        self.assertEqual(self.sync(), {'written': 1, 'unchanged': 2, 'removed': 0, 'bytes_written': 4})
+        self.assertEqual((self.dest / "sub" / "b.md").read_text(encoding='utf-8'), "# b\n")
+        self.assertEqual((self.dest / "a.md").stat().st_mtime, OLD_MTIME)
+        self.assertEqual((self.dest / "sub" / "c.bin").stat().st_mtime, OLD_MTIME)
+
+    def test_removed_files_and_empty_dirs_are_deleted(self):
+        self.sync()
+        shutil.rmtree(self.source / "sub")
+
+        self.assertEqual(self.sync()['removed'], 2)
+        self.assertEqual(sorted(path.name for path in self.dest.rglob("*")), ["a.md"])
+
+    def test_skip_and_transform(self):
+        def transform(dest, data):
+            return data.upper()
+        transform.suffixes = ('.md',)
+
+        self.sync(transform=transform, skip=lambda dest: dest.suffix == '.bin')
+
+        self.assertEqual((self.dest / "sub" / "b.md").read_text(encoding='utf-8'), "# B\n".upper())
+        self.assertFalse((self.dest / "sub" / "c.bin").exists())
+        self.assertEqual(self.sync(transform=transform)['unchanged'], 2)
+
+    def test_large_files_are_linked(self):
+        synchronizer = aggregate_docs.FileSynchronizer()
+        synchronizer.LINK_THRESHOLD = 50
+        dest = self.tmp / "linked.bin"
+
+        synchronizer.sync_file(self.source / "sub" / "c.bin", dest)
+        synchronizer.sync_file(self.source / "sub" / "c.bin", dest)
+
+        self.assertEqual(dest.read_bytes(), (self.source / "sub" / "c.bin").read_bytes())
+        self.assertEqual((synchronizer.stats['written'], synchronizer.stats['unchanged']), (1, 1))
+
+    def test_directory_replaced_by_file(self):
+        (self.dest / "a.md").mkdir(parents=True)
+
+        aggregate_docs.FileSynchronizer().sync_file(self.source / "a.md", self.dest / "a.md")
+
+        self.assertEqual((self.dest / "a.md").read_text(encoding='utf-8'), "# A\n")
+
+
+class BranchSyncTest(AggregatorTestCase):
+    """Al reagregar una rama solo se reescriben sus archivos modificados"""
+
+    def test_reaggregation_keeps_unchanged_files(self):
+        self.aggregate(reproducible=True)
+        project_dir = self.project_dir("p0001")
+        for path in project_dir.rglob("*"):
+            os.utime(path, (OLD_MTIME, OLD_MTIME))
+        commit_files(self.repo, "p0001", {"docs/guide/page-001.md": "# Página cambiada\n"})
+
+        aggregator = self.aggregate(reproducible=True)
+
+        self.assertEqual(aggregator.changed_slugs, {"p0001"})
+        changed = sorted(path.relative_to(project_dir).as_posix() for path in project_dir.rglob("*.md")
+                         if path.stat().st_mtime != OLD_MTIME)
+        # index.md lleva la fecha del commit nuevo
+        self.assertEqual(changed, ["guide/page-001.md", "index.md"])
@@ -0,0 +1,98 @@
+"""Traza de ejecución en formato Chrome Trace Event y resumen por proyecto"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import AggregatorTestCase, aggregate_docs, read_json
+
+
+class TracerTest(unittest.TestCase):
+    """Spans, estadísticas por proyecto y archivo de traza"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="trace-test-"))
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.path = self.tmp / "trace" / "trace.json"
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = aggregate_docs.Tracer()
+
+        with tracer.span('copy', 'project', project="docs/a", slug="a") as span:
+            span['bytes'] = 10
+        tracer.finish()
+
+        self.assertEqual((tracer.events, tracer.projects), ([], {}))
+        self.assertFalse(self.path.exists())
+
+    def test_trace_file(self):
+        tracer = aggregate_docs.Tracer(self.path)
+        with tracer.span('run', mode='branches'):
+            for project, size in (("docs/a", 10), ("docs/b", 300), ("docs/a", 5)):
+                with tracer.span('copy', 'project', project=project) as span:
+                    span['bytes'] = size
+
+        tracer.finish()
+
+        trace = read_json(self.path)
+        events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual([event['name'] for event in events], ['run', 'copy', 'copy', 'copy'])
+        self.assertEqual(events[0]['args'], {'mode': 'branches'})
+        self.assertEqual(events[1]['args'], {'bytes': 10, 'project': "docs/a"})
+        self.assertEqual(events[1]['cat'], 'project')
+        run = events[0]
+        for event in events[1:]:
+            self.assertGreaterEqual(event['ts'], run['ts'])
+            self.assertLessEqual(event['ts'] + event['dur'], run['ts'] + run['dur'])
+        self.assertEqual([event['args']['name'] for event in trace['traceEvents'] if event['ph'] == 'M'],
+                         ["MainThread"])
+        self.assertEqual(trace['otherData']['bytes_copied'], 315)
+        self.assertEqual({project['project']: project['bytes'] for project in trace['otherData']['slowest_projects']},
+                         {"docs/a": 15, "docs/b": 300})
+
+    def test_summary_is_limited_to_slowest_projects(self):
+        tracer = aggregate_docs.Tracer(self.path)
+        for index in range(tracer.SUMMARY_SIZE + 5):
+            tracer.projects[f"docs/p{index:02d}"] = {'seconds': float(index), 'bytes': 0}
+
+        slowest = tracer.slowest_projects()
+
+        self.assertEqual(len(slowest), tracer.SUMMARY_SIZE)
+        self.assertEqual(slowest[0][0], f"docs/p{tracer.SUMMARY_SIZE + 4:02d}")
+
+    def test_reset_starts_a_new_trace(self):
+        tracer = aggregate_docs.Tracer(self.path)
+        with tracer.span('update', 'project', project="docs/a"):
+            pass
+
+        tracer.reset()
+        with tracer.span('update', events=["docs/b"]):
+            pass
+        tracer.finish()
+
+        events = [event for event in read_json(self.path)['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual([event['args'] for event in events], [{'events': ["docs/b"]}])
+        self.assertEqual(tracer.projects, {})
+
+
+class RunTraceTest(AggregatorTestCase):
+    """run() con trace_path registra sus fases y las etapas de cada proyecto"""
+
+    def test_run_writes_phase_and_project_spans(self):
+        trace_path = self.tmp / "trace.json"
+
+        self.aggregate(jobs=2, trace_path=trace_path)
+
+        trace = read_json(trace_path)
+        events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        names = {event['name'] for event in events if event['cat'] == 'phase'}
+        self.assertTrue({'run', 'aggregate', 'validate configs', 'catalog', 'index',
+                         'mkdocs config', 'validation', 'build'} <= names)
+        branches = [f"docs/p{index:04d}" for index in range(self.projects)]
+        for stage in ('fetch', 'copy', 'pages'):
+            self.assertEqual(sorted(event['args']['project'] for event in events if event['name'] == stage), branches)
+        summary = trace['otherData']['slowest_projects']
+        self.assertEqual(sorted(project['project'] for project in summary), branches)
+        self.assertTrue(all(project['bytes'] > 0 for project in summary))
+        self.assertEqual(trace['otherData']['bytes_copied'], sum(project['bytes'] for project in summary))
@@ -0,0 +1,145 @@
+"""Modo watch: los cambios de los proyectos locales se recopian y reconstruyen por partes"""
+
+import io
+import json
+import tarfile
+import subprocess
+import unittest.mock
+
+from support import AggregatorTestCase, aggregate_docs, requires_mkdocs
+
+
+class WatchTestCase(AggregatorTestCase):
+    """Proyectos locales extraídos de las ramas del repositorio de prueba"""
+
+    projects = 2
+
+    def setUp(self):
+        super().setUp()
+        self.local_dirs = []
+        for index in range(self.projects):
+            path = self.tmp / "local" / f"p{index:04d}"
+            path.mkdir(parents=True)
+            data = subprocess.run(["git", "archive", f"docs/p{index:04d}"], cwd=self.repo,
+                                  capture_output=True, check=True).stdout
+            with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+                tar.extractall(path)
+            self.local_dirs.append(path)
+
+    def local_aggregator(self, build: bool = False):
+        aggregator = self.aggregator()
+        if not build:
+            aggregator.build_mkdocs_site = lambda: True
+        aggregator.run(mode='local', local_projects=self.local_dirs)
+        if not build:
+            del aggregator.build_mkdocs_site
+        return aggregator
+
+    def edit(self, slug: str, rel: str, text: str):
+        (self.tmp / "local" / slug / rel).write_text(text, encoding='utf-8')
+
+    def edit_config(self, slug: str, **project):
+        path = self.tmp / "local" / slug / "docs.yaml"
+        config = json.loads(path.read_text(encoding='utf-8'))
+        config['project'].update(project)
+        path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+
+    def mtimes(self, root) -> dict:
+        return {path.relative_to(root).as_posix(): path.stat().st_mtime_ns for path in root.rglob("*") if path.is_file()}
+
+
+class WatchChangesTest(WatchTestCase):
+    """Detección de cambios y actualización de solo lo afectado"""
+
+    def setUp(self):
+        super().setUp()
+        self.aggregator = self.local_aggregator()
+        self.builds = []
+        self.aggregator._watch_build = lambda full, changed: self.builds.append((full, sorted(changed))) or True
+
+    def test_snapshot_covers_only_copied_paths(self):
+        before = self.aggregator._watch_snapshot("p0000")
+        self.assertIn("docs.yaml", before)
+        self.assertIn("docs/guide/page-000.md", before)
+
+        self.edit("p0000", "notas-sin-copiar.md", "# Notas\n")
+        self.assertEqual(self.aggregator._watch_snapshot("p0000"), before)
+
+        self.edit("p0000", "docs/guide/page-000.md", "# Página editada\n")
+        after = self.aggregator._watch_snapshot("p0000")
+        self.assertEqual([rel for rel in after if after[rel] != before.get(rel)], ["docs/guide/page-000.md"])
+
+    def test_page_change_copies_only_that_page(self):
+        project_dir = self.project_dir("p0000")
+        before = self.mtimes(project_dir)
+        mkdocs_yml = (self.tmp / "out" / "docs" / "mkdocs.yml").stat().st_mtime_ns
+        self.edit("p0000", "docs/guide/page-001.md", "# Página editada\n")
+
+        self.aggregator._apply_watch_changes({"p0000": {"docs/guide/page-001.md"}})
+
+        after = self.mtimes(project_dir)
+        self.assertEqual([rel for rel in after if after[rel] != before[rel]], ["guide/page-001.md"])
+        self.assertIn("# Página editada\n", (project_dir / "guide" / "page-001.md").read_text(encoding='utf-8'))
+        self.assertEqual((self.tmp / "out" / "docs" / "mkdocs.yml").stat().st_mtime_ns, mkdocs_yml)
+        self.assertEqual(self.builds, [(False, ["proyectos/p0000"])])
+
+    def test_config_change_regenerates_nav(self):
+        self.edit_config("p0001", name="Proyecto renombrado")
+
+        self.aggregator._apply_watch_changes({"p0001": {"docs.yaml"}})
+
+        self.assertIn("Proyecto renombrado", (self.tmp / "out" / "docs" / "mkdocs.yml").read_text(encoding='utf-8'))
+        self.assertIn("Proyecto renombrado", (self.docs_dir() / "proyectos" / "index.md").read_text(encoding='utf-8'))
+        self.assertEqual(self.builds, [(True, ["proyectos/p0001"])])
+
+    def test_invalid_config_keeps_previous_version(self):
+        self.edit("p0001", "docs.yaml", "project: {slug: [")
+
+        self.aggregator._apply_watch_changes({"p0001": {"docs.yaml"}})
+
+        self.assertEqual(self.aggregator._local_config("p0001")['project']['name'], "Proyecto p0001")
+        self.assertIn("Proyecto p0001", (self.tmp / "out" / "docs" / "mkdocs.yml").read_text(encoding='utf-8'))
+
+    def test_removed_page_is_pruned(self):
+        (self.tmp / "local" / "p0000" / "docs" / "guide" / "page-001.md").unlink()
+
+        self.aggregator._apply_watch_changes({"p0000": {"docs/guide/page-001.md"}})
+
+        self.assertFalse((self.project_dir("p0000") / "guide" / "page-001.md").exists())
+        self.assertNotIn("guide/page-001.md", self.aggregator.local_sources["p0000"]['files'])
+        self.assertEqual(self.builds, [(True, ["proyectos/p0000"])])
+
+    def test_watch_loop_debounces_changes(self):
+        iterations = []
+
+        def sleep(seconds):
+            iterations.append(seconds)
+            if len(iterations) == 1:
+                self.edit("p0000", "docs/guide/page-000.md", "# Uno\n")
+            elif len(iterations) == 2:
+                self.edit("p0001", "docs/guide/page-000.md", "# Dos\n")
+            elif len(iterations) == 4:
+                raise KeyboardInterrupt
+
+        with unittest.mock.patch.object(aggregate_docs.time, 'sleep', side_effect=sleep):
+            self.aggregator.watch(interval=0.01, debounce=0)
+
+        # Los dos cambios llegan en sondeos distintos y cada uno se aplica al vencer su debounce
+        self.assertEqual(self.builds, [(False, ["proyectos/p0000"]), (False, ["proyectos/p0001"])])
+        self.assertIn("# Dos\n", (self.project_dir("p0001") / "guide" / "page-000.md").read_text(encoding='utf-8'))
+
+
+@requires_mkdocs
+class WatchBuildTest(WatchTestCase):
+    """El build tras un cambio de página es --dirty y actualiza la página en el sitio"""
+
+    def test_page_change_updates_site(self):
+        aggregator = self.local_aggregator(build=True)
+        site_page = self.site() / "proyectos" / "p0000" / "guide" / "page-000" / "index.html"
+        self.edit("p0000", "docs/guide/page-000.md", "# Página editada en vivo\n")
+
+        with unittest.mock.patch.object(aggregate_docs, 'run_command', wraps=aggregate_docs.run_command) as command:
+            aggregator._apply_watch_changes({"p0000": {"docs/guide/page-000.md"}})
+
+        self.assertIn("Página editada en vivo", site_page.read_text(encoding='utf-8'))
+        self.assertIn(["mkdocs", "build", "--dirty"], [call.args[0] for call in command.call_args_list])